@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Benchmark of free room lookups: in-memory interval index against SQL
+
+Usage:
+    python bench_free_rooms.py [--rooms 3000] [--groups 600] [--weeks 16]
+"""
+
+from database.models import Database
+from utils.room_index import FreeRoomIndex
+from datetime import date, datetime, timedelta
+import argparse
+import os
+import random
+import tempfile
+import time
+
+FREE_ROOMS_SQL = """
+    SELECT DISTINCT location FROM lessons
+    WHERE location IS NOT NULL AND location NOT IN (
+        SELECT location FROM lessons
+        WHERE start_time < ? AND end_time > ? AND location IS NOT NULL
+    )
+"""
+
+
+def populate(db: Database, rooms: int, groups: int, weeks: int) -> int:
+    """Add 4 lessons a day, 6 days a week for every group in random rooms"""
+    rng = random.Random(1)
+    semester_start = date(2025, 9, 1)
+    subject_ids = [db.add_subject(f"Предмет {n}", f"S{n}") for n in range(60)]
+    teacher_ids = [db.add_teacher(f"Преподаватель {n}", "") for n in range(150)]
+    group_ids = [db.add_group(f"М8О-{100 + n}БВ-24", "") for n in range(groups)]
+    total = 0
+    for week in range(weeks):
+        week_start = semester_start + timedelta(weeks=week)
+        batch = {}
+        for group_id in group_ids:
+            lessons = []
+            for slot in range(24):
+                day = week_start + timedelta(days=slot // 4)
+                start = datetime.combine(day, datetime.min.time()) + timedelta(
+                    hours=9 + (slot % 4) * 2
+                )
+                lessons.append(
+                    (
+                        subject_ids[slot % len(subject_ids)],
+                        rng.choice(teacher_ids),
+                        start,
+                        start + timedelta(minutes=90),
+                        f"ГУК-{rng.randrange(rooms)}",
+                        slot // 4,
+                    )
+                )
+            batch[(group_id, week_start)] = lessons
+            total += len(lessons)
+        db.add_lessons_by_week(batch)
+    return total
+
+
+def timed(func, repeat: int) -> float:
+    """Average seconds per call"""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rooms", type=int, default=3000)
+    parser.add_argument("--groups", type=int, default=600)
+    parser.add_argument("--weeks", type=int, default=16)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "bench.db"))
+        lessons = populate(db, args.rooms, args.groups, args.weeks)
+        start = datetime(2025, 10, 8, 11, 0)
+        end = start + timedelta(minutes=90)
+
+        index = FreeRoomIndex(db)
+        loaded = timed(lambda: index.free_rooms(start, end), 1)
+        print(
+            f"{lessons:,} lessons in {len(index):,} rooms, "
+            f"index loaded by the first query in {loaded:.2f} s"
+        )
+
+        free = index.free_rooms(start, end)
+        indexed = timed(lambda: index.free_rooms(start, end), args.repeat)
+
+        conn = db.connect()
+        sql_free = {row[0] for row in conn.execute(FREE_ROOMS_SQL, (end, start))}
+        assert sql_free == {location for location, _ in free}
+        sql = timed(
+            lambda: conn.execute(FREE_ROOMS_SQL, (end, start)).fetchall(), args.repeat
+        )
+        conn.close()
+
+        one_room = timed(lambda: index.is_free("ГУК-1", start, end), args.repeat * 1000)
+        print(f"{len(free):,} free rooms {start:%H:%M}-{end:%H:%M}")
+        print(f"index: {indexed * 1000:8.2f} ms per query (all rooms)")
+        print(f"index: {one_room * 1e6:8.2f} µs per room")
+        print(f"SQL:   {sql * 1000:8.2f} ms per query, {sql / indexed:.0f}× slower")
+
+        # An evening lesson added to one week: only that week is reloaded
+        evening = datetime(2025, 10, 8, 20, 0)
+        group_id = db.get_all_groups()[0][0]
+        db.add_lessons_by_week(
+            {
+                (group_id, date(2025, 10, 6)): [
+                    (1, 1, evening, evening + timedelta(minutes=90), "ГУК-0", 2)
+                ]
+            }
+        )
+        update = timed(lambda: index.free_rooms(start, end), 1)
+        print(f"index: {update * 1000:8.2f} ms for the first query after a week import")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Benchmark of timetable import throughput by number of parser processes
+
+Usage:
+    python bench_ingest.py [--lessons 100000] [--max-workers 8]
+"""
+
+from database.models import Database
+from ingest.loader import Ingester
+from ingest.readers import read_rows
+from datetime import date, timedelta
+import argparse
+import csv
+import os
+import tempfile
+import time
+
+
+def write_export(path: str, lessons: int, groups: int = 200):
+    """Write a CSV export of a semester: 4 lessons a day, 6 days a week per group"""
+    semester_start = date(2025, 9, 1)
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(
+            ["group", "subject", "teacher", "date", "start", "end", "location"]
+        )
+        for index in range(lessons):
+            week, rest = divmod(index, groups * 24)
+            group, slot = divmod(rest, 24)
+            day = semester_start + timedelta(weeks=week, days=slot // 4)
+            hour = 9 + (slot % 4) * 2
+            writer.writerow(
+                [
+                    f"М8О-{100 + group}БВ-24",
+                    f"Предмет {index % 60}",
+                    f"Преподаватель {index % 150}",
+                    day.strftime("%d.%m.%Y"),
+                    f"{hour:02d}:00",
+                    f"{hour + 1:02d}:30",
+                    f"ГУК-{index % 300}",
+                ]
+            )
+
+
+def bench(path: str, workers: int, directory: str) -> float:
+    """Load the export into a fresh database and return the elapsed seconds"""
+    db_path = os.path.join(directory, f"bench-{workers}.db")
+    started = time.perf_counter()
+    report = Ingester(Database(db_path)).ingest(read_rows(path), workers=workers)
+    elapsed = time.perf_counter() - started
+    os.remove(db_path)
+    assert report["skipped"] == 0
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lessons", type=int, default=100000)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "export.csv")
+        write_export(path, args.lessons)
+        print(f"{args.lessons:,} lessons, {os.cpu_count()} CPUs")
+        baseline = None
+        workers = 1
+        while workers <= max(args.max_workers, 1):
+            elapsed = bench(path, workers, tmp)
+            baseline = baseline or elapsed
+            print(
+                f"{workers:2} parser(s): {elapsed:6.2f} s, "
+                f"{args.lessons / elapsed:8,.0f} lessons/s, "
+                f"speedup {baseline / elapsed:4.2f}×"
+            )
+            workers *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Memory of cached lesson dictionaries with and without shared name strings
+
+Usage:
+    python bench_interning.py [--groups 600] [--weeks 7]
+"""
+
+from bench_free_rooms import populate
+from database.interning import location_names, subject_names, teacher_names
+from database.models import Database
+from datetime import date
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+TABLES = (subject_names, teacher_names, location_names)
+
+
+def read_semester(db: Database, groups: list) -> list:
+    """Read every group's semester as the time index does"""
+    return [
+        list(db.iter_lessons_for_period(group_id, date(2025, 9, 1), date(2026, 2, 1)))
+        for group_id in groups
+    ]
+
+
+def cache_semester(db: Database, groups: list) -> tuple:
+    """Get the cache of all semesters, its traced bytes and untraced read seconds"""
+    for table in TABLES:
+        table.clear()
+    started = time.perf_counter()
+    read_semester(db, groups)
+    elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    cache = read_semester(db, groups)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return cache, size, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--groups", type=int, default=600)
+    parser.add_argument("--weeks", type=int, default=7)
+    parser.add_argument("--rooms", type=int, default=3000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "bench.db"))
+        lessons = populate(db, args.rooms, args.groups, args.weeks)
+        groups = [row[0] for row in db.get_all_groups()]
+
+        for table in TABLES:
+            table.enabled = False
+        cache, copied, copied_time = cache_semester(db, groups)
+        del cache
+        for table in TABLES:
+            table.enabled = True
+        cache, shared, shared_time = cache_semester(db, groups)
+        tables = sum(table.memory_usage() for table in TABLES)
+        distinct = {
+            id(lesson[field])
+            for lessons_of_group in cache
+            for lesson in lessons_of_group
+            for field in ("subject_name", "teacher_name", "location")
+        }
+
+        print(f"{lessons:,} cached lessons, {len(distinct):,} distinct name objects")
+        print(
+            f"separate strings: {copied / 1e6:6.1f} MB, "
+            f"{copied / lessons:.0f} bytes per lesson, read in {copied_time:.2f} s"
+        )
+        print(
+            f"shared strings:   {shared / 1e6:6.1f} MB, "
+            f"{shared / lessons:.0f} bytes per lesson, read in {shared_time:.2f} s "
+            f"(tables {tables / 1e3:.0f} KB)"
+        )
+        print(f"saved {(copied - shared) / 1e6:.1f} MB ({1 - shared / copied:.0%})")
+
+
+if __name__ == "__main__":
+    main()
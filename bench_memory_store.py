@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Memory use and week lookup time of the in-memory columnar store against SQLite
+
+Usage:
+    python bench_memory_store.py [--groups 600] [--weeks 7]
+"""
+
+from bench_free_rooms import populate
+from database.models import Database
+from datetime import date, timedelta
+import argparse
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--groups", type=int, default=600)
+    parser.add_argument("--weeks", type=int, default=7)
+    parser.add_argument("--rooms", type=int, default=3000)
+    parser.add_argument("--lookups", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "bench.db"))
+        lessons = populate(db, args.rooms, args.groups, args.weeks)
+        semester = (date(2025, 9, 1), date(2026, 2, 1))
+        weeks = [semester[0] + timedelta(weeks=week) for week in range(args.weeks)]
+        groups = [row[0] for row in db.get_all_groups()]
+        per_100k = 100000 / lessons
+
+        # Lesson dictionaries, as a cache of every week's query result would hold them
+        tracemalloc.start()
+        dictionaries = [
+            db.get_schedule_for_week(group_id, week_start)
+            for group_id in groups
+            for week_start in weeks
+        ]
+        dictionaries_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del dictionaries
+
+        tracemalloc.start()
+        store = db.enable_memory_store(*semester)
+        store_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        # Timed again without tracemalloc, which slows allocations down
+        started = time.perf_counter()
+        store.load()
+        loaded = time.perf_counter() - started
+        usage = store.columns.memory_usage()
+
+        print(f"{lessons:,} lessons, loaded in {loaded:.2f} s")
+        print("per 100k lessons:")
+        print(f"  columns        {usage['columns'] * per_100k / 1e6:6.2f} MB")
+        print(f"  value tables   {usage['tables'] * per_100k / 1e6:6.2f} MB")
+        print(f"  group offsets  {usage['offsets'] * per_100k / 1e6:6.2f} MB")
+        print(f"  store (traced) {store_bytes * per_100k / 1e6:6.2f} MB")
+        print(f"  dictionaries   {dictionaries_bytes * per_100k / 1e6:6.2f} MB")
+
+        rng = random.Random(1)
+        keys = [(rng.choice(groups), rng.choice(weeks)) for _ in range(args.lookups)]
+        started = time.perf_counter()
+        for group_id, week_start in keys:
+            db.get_schedule_for_week(group_id, week_start)
+        memory = (time.perf_counter() - started) / len(keys)
+        db.memory_store = None
+        started = time.perf_counter()
+        for group_id, week_start in keys:
+            db.get_schedule_for_week(group_id, week_start)
+        sqlite = (time.perf_counter() - started) / len(keys)
+        print(
+            f"week lookup: memory {memory * 1e6:.0f} µs, SQLite {sqlite * 1e6:.0f} µs"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark of schedule image rendering time per week
+
+Usage:
+    python bench_render_image.py [--iterations 50] [--workers 4]
+"""
+
+from utils.schedule_image import (
+    THEMES,
+    is_image_rendering_available,
+    render_week_png,
+)
+from utils.schedule_utils import get_current_week_start
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+import argparse
+import statistics
+import time
+
+
+def make_week(week_start, lessons_per_day: int):
+    """Build a synthetic week with the given number of lessons per working day"""
+    lessons = []
+    for day in range(6):
+        day_start = datetime.combine(
+            week_start + timedelta(days=day), datetime.min.time()
+        )
+        for number in range(lessons_per_day):
+            start = day_start + timedelta(hours=9, minutes=105 * number)
+            lessons.append(
+                {
+                    "id": len(lessons) + 1,
+                    "subject_name": f"Дисциплина номер {number + 1}",
+                    "teacher_name": "Иванов Иван Иванович",
+                    "start_time": start,
+                    "end_time": start + timedelta(minutes=90),
+                    "location": f"ГУК В-{200 + number}",
+                    "day_of_week": day,
+                }
+            )
+    return lessons
+
+
+def bench_serial(iterations: int):
+    """Measure single-process render time per week"""
+    week_start = get_current_week_start()
+    for theme in THEMES:
+        for lessons_per_day in (0, 3, 6):
+            lessons = make_week(week_start, lessons_per_day)
+            render_week_png(lessons, week_start, "М8О-207БВ-24", theme)  # warm-up
+            timings = []
+            size = 0
+            for _ in range(iterations):
+                started = time.perf_counter()
+                png = render_week_png(lessons, week_start, "М8О-207БВ-24", theme)
+                timings.append((time.perf_counter() - started) * 1000)
+                size = len(png)
+            timings.sort()
+            print(
+                f"{theme:5} {len(lessons):3} lessons: "
+                f"median {statistics.median(timings):6.2f} ms, "
+                f"p95 {timings[int(len(timings) * 0.95) - 1]:6.2f} ms, "
+                f"{size / 1024:5.1f} KiB"
+            )
+
+
+def bench_pool(iterations: int, workers: int):
+    """Measure throughput of the process pool"""
+    week_start = get_current_week_start()
+    lessons = make_week(week_start, 4)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Warm up the worker processes (imports, font loading)
+        list(
+            pool.map(
+                render_week_png,
+                [lessons] * workers,
+                [week_start] * workers,
+                ["М8О-207БВ-24"] * workers,
+            )
+        )
+        started = time.perf_counter()
+        list(
+            pool.map(
+                render_week_png,
+                [lessons] * iterations,
+                [week_start] * iterations,
+                ["М8О-207БВ-24"] * iterations,
+            )
+        )
+        elapsed = time.perf_counter() - started
+    print(
+        f"pool of {workers}: {iterations / elapsed:6.1f} weeks/s "
+        f"({elapsed * 1000 / iterations:6.2f} ms/week amortized)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+
+    if not is_image_rendering_available():
+        raise SystemExit("✗ Pillow is not installed")
+
+    bench_serial(args.iterations)
+    bench_pool(args.iterations * 4, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,52 @@
 import asyncio
 import logging
+from datetime import datetime
 from aiogram import Bot, Dispatcher
 from aiogram.client.default import DefaultBotProperties
 from aiogram.enums import ParseMode
-from config import BOT_TOKEN
+from config import (
+    BOT_TOKEN,
+    STORAGE_URL,
+    METRICS_HOST,
+    METRICS_PORT,
+    SQL_PROFILE,
+    SQL_SLOW_MS,
+    PROFILE_DIR,
+    PROFILE_SIGNAL_SECONDS,
+    MEMORY_STORE,
+)
 from database.models import Database
-from handlers import start, schedule, group_selection, group_confirmation
+from storage.backends import create_store
+from storage.adapters import KeyValueFSMStorage
+from utils.schedule_utils import configure_storage, get_semester_bounds
+from utils.metrics import start_metrics_server
+from database.profiler import profiler
+from utils.sampler import install_profile_signal
+from middlewares.timing import TimingMiddleware, RequestTimingMiddleware
+from middlewares.stats import StatsMiddleware
+from middlewares.throttling import NavigationThrottleMiddleware
+from utils.file_cache import FileIdCache
+from utils.schedule_image import shutdown_render_pool
+from services.reminders import ReminderService
+from services.watchdog import LoopWatchdog
+from services.change_notifier import ScheduleChangeNotifier
+from services.invalidation import create_invalidation_bus
+from services.warmup import TrafficRecorder, warm_up
+from handlers import (
+    start,
+    schedule,
+    group_selection,
+    group_confirmation,
+    export,
+    image,
+    inline,
+    today,
+    reminders,
+    changes,
+    admin,
+    lookup,
+    free_rooms,
+)
 
 # Configure logging
 logging.basicConfig(
@@ -23,33 +64,102 @@ async def main():
 
     # Initialize bot and dispatcher
     bot = Bot(token=BOT_TOKEN, default=DefaultBotProperties(parse_mode=ParseMode.HTML))
-    dp = Dispatcher()
+    store = create_store(STORAGE_URL)
+    configure_storage(store)
+    dp = Dispatcher(storage=KeyValueFSMStorage(store))
 
     # Initialize database
+    profiler.enabled = SQL_PROFILE
+    profiler.slow_ms = SQL_SLOW_MS
     database = Database()
+    file_cache = FileIdCache(database)
+    reminder_service = ReminderService(database, bot)
+    change_notifier = ScheduleChangeNotifier(database, reminder_service.sender)
+    invalidation_bus = create_invalidation_bus(database)
+    traffic_recorder = TrafficRecorder(database)
 
     # Register handlers
     dp.include_router(start.router)
     dp.include_router(schedule.router)
+    dp.include_router(export.router)
+    dp.include_router(image.router)
+    dp.include_router(inline.router)
+    dp.include_router(today.router)
+    dp.include_router(reminders.router)
+    dp.include_router(changes.router)
+    dp.include_router(admin.router)
+    dp.include_router(lookup.router)
+    dp.include_router(free_rooms.router)
     dp.include_router(group_selection.router)
     dp.include_router(group_confirmation.router)
 
-    # Middleware to pass database to handlers
+    # Middleware to pass database and caches to handlers
     @dp.update.outer_middleware()
     async def database_middleware(handler, event, data):
         data["db"] = database
+        data["file_cache"] = file_cache
+        data["reminders"] = reminder_service
         return await handler(event, data)
 
     # Add the middleware
     dp.update.outer_middleware(database_middleware)
 
+    # Coalescing of rapid navigation taps (registered first so handler timing
+    # covers the renders, not the debounce window)
+    dp.callback_query.middleware(NavigationThrottleMiddleware())
+
+    # Timing of updates, handlers and Bot API requests (recorded only when
+    # the metrics endpoint is enabled)
+    timing_middleware = TimingMiddleware()
+    dp.update.outer_middleware(timing_middleware)
+    for observer in (dp.message, dp.callback_query, dp.inline_query):
+        observer.middleware(timing_middleware)
+    bot.session.middleware(RequestTimingMiddleware())
+
+    # Always-on counters behind /stats
+    stats_middleware = StatsMiddleware()
+    dp.update.outer_middleware(stats_middleware)
+    for observer in (dp.message, dp.callback_query, dp.inline_query):
+        observer.middleware(stats_middleware)
+    metrics_runner = None
+    watchdog = LoopWatchdog()
+
     # Start polling
     try:
         logger.info("Starting bot...")
+        try:
+            install_profile_signal(PROFILE_SIGNAL_SECONDS, PROFILE_DIR)
+        except (NotImplementedError, AttributeError):
+            # No SIGUSR2 / loop signal handlers on this platform
+            pass
+        if METRICS_PORT:
+            metrics_runner = await start_metrics_server(METRICS_HOST, METRICS_PORT)
+            logger.info(f"Metrics at http://{METRICS_HOST}:{METRICS_PORT}/metrics")
+        watchdog.start()
+        if MEMORY_STORE:
+            semester = get_semester_bounds(datetime.now().date())
+            await asyncio.to_thread(database.enable_memory_store, *semester)
+        try:
+            await warm_up(database)
+        except Exception as e:
+            logger.error(f"Error warming up the week cache: {e}")
+        invalidation_bus.start()
+        traffic_recorder.start()
+        reminder_service.start()
+        change_notifier.start()
         await dp.start_polling(bot)
     except Exception as e:
         logger.error(f"Error starting bot: {e}")
     finally:
+        await watchdog.stop()
+        await change_notifier.stop()
+        await reminder_service.stop()
+        await invalidation_bus.stop()
+        await traffic_recorder.stop()
+        shutdown_render_pool()
+        await dp.storage.close()
+        if metrics_runner is not None:
+            await metrics_runner.cleanup()
         await bot.session.close()
 
 
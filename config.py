@@ -12,3 +12,60 @@ DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///schedule.db")
 
 # Default group for schedule
 DEFAULT_GROUP = os.getenv("DEFAULT_GROUP", "М8О-207БВ-24")
+
+# Schedule image rendering (requires Pillow)
+SCHEDULE_IMAGE_FONT = os.getenv("SCHEDULE_IMAGE_FONT", "DejaVuSans.ttf")
+IMAGE_RENDER_WORKERS = int(os.getenv("IMAGE_RENDER_WORKERS", "2"))
+
+# Lesson reminders
+REMINDER_RATE_LIMIT = float(os.getenv("REMINDER_RATE_LIMIT", "25"))  # messages/s
+REMINDER_WINDOW_MINUTES = int(os.getenv("REMINDER_WINDOW_MINUTES", "60"))
+
+# Cache invalidation between processes (bot workers, importers)
+INVALIDATION_POLL_INTERVAL = float(os.getenv("INVALIDATION_POLL_INTERVAL", "1"))
+# Directory for Unix-socket broadcast between local processes, empty to disable
+INVALIDATION_SOCKET_DIR = os.getenv("INVALIDATION_SOCKET_DIR", "")
+
+# Storage for rendered weeks, user groups and FSM state:
+# "memory://" (per process) or "redis://host:port/db" (shared, kept over restarts)
+STORAGE_URL = os.getenv("STORAGE_URL", "memory://")
+
+# Startup warm-up of rendered weeks for the busiest groups
+WARMUP_TOP_GROUPS = int(os.getenv("WARMUP_TOP_GROUPS", "50"))
+WARMUP_WORKERS = int(os.getenv("WARMUP_WORKERS", "4"))
+WARMUP_TIMEOUT = float(os.getenv("WARMUP_TIMEOUT", "30"))  # seconds
+
+# Prometheus metrics endpoint (GET /metrics), disabled when the port is 0
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+
+# Telegram user IDs allowed to use admin commands, comma-separated
+ADMIN_IDS = {
+    int(user_id) for user_id in os.getenv("ADMIN_IDS", "").split(",") if user_id.strip()
+}
+
+# SQL profiler (can also be switched on with /sql on)
+SQL_PROFILE = os.getenv("SQL_PROFILE", "0") == "1"
+SQL_SLOW_MS = float(os.getenv("SQL_SLOW_MS", "50"))
+
+# Sampling profiler (/profile, or SIGUSR2 for PROFILE_SIGNAL_SECONDS)
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_SIGNAL_SECONDS = float(os.getenv("PROFILE_SIGNAL_SECONDS", "30"))
+
+# Event loop watchdog: callbacks holding the loop longer than this are logged
+# with their stack
+WATCHDOG_THRESHOLD_MS = float(os.getenv("WATCHDOG_THRESHOLD_MS", "100"))
+
+# Debounce of week navigation taps: taps within the window after a render are
+# coalesced into one render of the latest, for at most this many users at once
+NAVIGATION_DEBOUNCE_MS = float(os.getenv("NAVIGATION_DEBOUNCE_MS", "300"))
+NAVIGATION_MAX_USERS = int(os.getenv("NAVIGATION_MAX_USERS", "10000"))
+
+# /free: length of the range checked when only a start time (or nothing) is
+# given, and rooms listed per answer
+FREE_ROOM_MINUTES = int(os.getenv("FREE_ROOM_MINUTES", "90"))
+FREE_ROOMS_SHOWN = int(os.getenv("FREE_ROOMS_SHOWN", "40"))
+
+# Keep the lessons of the current semester in an in-memory columnar store and
+# serve week views from it instead of SQLite (about 4 MB per 100k lessons)
+MEMORY_STORE = os.getenv("MEMORY_STORE", "0") == "1"
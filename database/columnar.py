@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+Memory-compact in-process copy of a period's lessons for week lookups
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+import logging
+import sys
+import threading
+import time
+import weakref
+
+logger = logging.getLogger(__name__)
+
+# Changes made by other processes are picked up after this many seconds
+STORE_MAX_AGE = 300
+# The store is rebuilt on the next lookup once this many weeks changed
+MAX_DIRTY_WEEKS = 200
+# Minutes of a week fit an unsigned short; later ends are served by SQLite
+MAX_MINUTES = 0xFFFF
+
+
+class ValueTable:
+    """Distinct values (names, rooms, days) stored once and referred to by index"""
+
+    def __init__(self):
+        self.values: list = []
+        self._ids: dict = {}
+
+    def intern(self, value) -> int:
+        """Get the index of a value, adding it on first sight"""
+        value_id = self._ids.get(value)
+        if value_id is None:
+            value_id = self._ids[value] = len(self.values)
+            self.values.append(value)
+        return value_id
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+class Columns:
+    """
+    Lessons of a period as parallel arrays, sorted by group, week, day and start
+
+    Every lesson is one row across the arrays: 34 bytes whatever its names,
+    against about 700 bytes for a lesson dictionary with its datetimes
+    and strings. Rows of a group are contiguous, group_offsets maps a group to
+    its [first, last) rows, and the week column is sorted inside that range
+    so a week is two binary searches away.
+    """
+
+    def __init__(self):
+        self.lesson_ids = array("q")
+        self.group_ids = array("I")
+        # date.toordinal() of the schedule's week_start
+        self.weeks = array("I")
+        self.days = array("H")
+        # Minutes since the week start
+        self.starts = array("H")
+        self.ends = array("H")
+        self.subjects = array("I")
+        self.teachers = array("I")
+        self.locations = array("I")
+        self.subject_names = ValueTable()
+        self.teacher_names = ValueTable()
+        self.location_names = ValueTable()
+        self.day_values = ValueTable()
+        self.group_offsets: Dict[int, Tuple[int, int]] = {}
+        # Weeks with lessons the columns cannot hold exactly
+        self.unsupported: Set[Tuple[int, int]] = set()
+
+    def append(self, row: tuple) -> bool:
+        """
+        Add a row of Database.iter_period_lessons
+
+        Returns:
+            bool: False when the lesson's times do not fit the columns
+        """
+        (
+            group_id,
+            week_start,
+            lesson_id,
+            subject,
+            teacher,
+            start_time,
+            end_time,
+            location,
+            day,
+        ) = row
+        week = date.fromisoformat(week_start)
+        week_begin = datetime.combine(week, datetime.min.time())
+        start = datetime.fromisoformat(start_time)
+        end = datetime.fromisoformat(end_time)
+        start_minutes, start_rest = divmod((start - week_begin).total_seconds(), 60)
+        end_minutes, end_rest = divmod((end - week_begin).total_seconds(), 60)
+        if (
+            start_rest
+            or end_rest
+            or start.tzinfo is not None
+            or not 0 <= start_minutes <= end_minutes <= MAX_MINUTES
+        ):
+            return False
+
+        self.lesson_ids.append(lesson_id)
+        self.group_ids.append(group_id)
+        self.weeks.append(week.toordinal())
+        self.days.append(self.day_values.intern(day))
+        self.starts.append(int(start_minutes))
+        self.ends.append(int(end_minutes))
+        self.subjects.append(self.subject_names.intern(subject))
+        self.teachers.append(self.teacher_names.intern(teacher))
+        self.locations.append(self.location_names.intern(location))
+        return True
+
+    def build_offsets(self):
+        """Index the first and last row of every group"""
+        offsets = {}
+        first = 0
+        for row in range(1, len(self.group_ids) + 1):
+            if (
+                row == len(self.group_ids)
+                or self.group_ids[row] != self.group_ids[first]
+            ):
+                offsets[self.group_ids[first]] = (first, row)
+                first = row
+        self.group_offsets = offsets
+
+    def week_rows(self, group_id: int, week_start: date) -> range:
+        """Get the rows of a group's week"""
+        first, last = self.group_offsets.get(group_id, (0, 0))
+        week = week_start.toordinal()
+        return range(
+            bisect_left(self.weeks, week, first, last),
+            bisect_right(self.weeks, week, first, last),
+        )
+
+    def to_dict(self, row: int, week_begin: datetime) -> dict:
+        """Build the lesson dictionary of a row (see Database.get_schedule_for_week)"""
+        return {
+            "id": self.lesson_ids[row],
+            "subject_name": self.subject_names.values[self.subjects[row]],
+            "teacher_name": self.teacher_names.values[self.teachers[row]],
+            "start_time": week_begin + timedelta(minutes=self.starts[row]),
+            "end_time": week_begin + timedelta(minutes=self.ends[row]),
+            "location": self.location_names.values[self.locations[row]],
+            "day_of_week": self.day_values.values[self.days[row]],
+        }
+
+    def memory_usage(self) -> Dict[str, int]:
+        """
+        Get bytes used by the columns, the value tables and the offsets
+
+        Value tables count their list and dictionary plus the values
+        themselves; offsets count the dictionary, its keys and tuples.
+        """
+        columns = sum(
+            len(column) * column.itemsize
+            for column in (
+                self.lesson_ids,
+                self.group_ids,
+                self.weeks,
+                self.days,
+                self.starts,
+                self.ends,
+                self.subjects,
+                self.teachers,
+                self.locations,
+            )
+        )
+        tables = 0
+        for table in (
+            self.subject_names,
+            self.teacher_names,
+            self.location_names,
+            self.day_values,
+        ):
+            tables += sys.getsizeof(table.values) + sys.getsizeof(table._ids)
+            tables += sum(sys.getsizeof(value) for value in table.values)
+        offsets = sys.getsizeof(self.group_offsets) + sum(
+            sys.getsizeof(group_id) + sys.getsizeof(bounds)
+            for group_id, bounds in self.group_offsets.items()
+        )
+        return {
+            "rows": len(self.lesson_ids),
+            "columns": columns,
+            "tables": tables,
+            "offsets": offsets,
+            "total": columns + tables + offsets,
+        }
+
+    def __len__(self) -> int:
+        return len(self.lesson_ids)
+
+
+class ColumnarStore:
+    """
+    In-memory copy of the lessons of a period (usually the active semester)
+    that Database.get_schedule_for_week serves weeks from
+
+    Weeks changed through the Database (or reported by the invalidation bus)
+    are marked dirty and served by SQLite until the store is rebuilt. After
+    MAX_DIRTY_WEEKS changes or STORE_MAX_AGE seconds the next lookup starts a
+    rebuild in a background thread; it fills new columns and swaps them in,
+    so lookups neither wait for it nor see a half-built store.
+    """
+
+    def __init__(
+        self,
+        db,
+        start: date,
+        end: date,
+        max_age: float = STORE_MAX_AGE,
+        max_dirty_weeks: int = MAX_DIRTY_WEEKS,
+    ):
+        # Weak reference: the store is kept alive by the database, not vice versa
+        self._db = weakref.ref(db)
+        # Whole weeks are served, so the first one may start before the period
+        self.start = start - timedelta(days=start.weekday())
+        self.end = end
+        self.max_age = max_age
+        self.max_dirty_weeks = max_dirty_weeks
+        self.columns = Columns()
+        self.hits = 0
+        self.misses = 0
+        self.rebuilds = 0
+        self._dirty_weeks: Set[Tuple[int, date]] = set()
+        self._dirty_groups: Set[int] = set()
+        # Changes seen while a rebuild reads the database, dirty after the swap
+        self._changes_during_load: Optional[Tuple[set, set]] = None
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._rebuild_thread: Optional[threading.Thread] = None
+
+    def load(self):
+        """Read the period from the database into new columns and swap them in"""
+        with self._lock:
+            started = time.perf_counter()
+            changes = self._changes_during_load = (set(), set())
+            columns = Columns()
+            for row in self._db().iter_period_lessons(self.start, self.end):
+                if not columns.append(row):
+                    columns.unsupported.add(
+                        (row[0], date.fromisoformat(row[1]).toordinal())
+                    )
+            columns.build_offsets()
+
+            self.columns = columns
+            self._dirty_weeks, self._dirty_groups = changes
+            self._changes_during_load = None
+            self._loaded_at = time.monotonic()
+            self.rebuilds += 1
+        logger.info(
+            f"Loaded {len(columns):,} lessons from {self.start} to {self.end} "
+            f"into memory ({columns.memory_usage()['total'] / 1e6:.1f} MB) in "
+            f"{time.perf_counter() - started:.2f} s"
+        )
+
+    def _rebuild(self):
+        try:
+            self.load()
+        except Exception as e:
+            logger.error(f"Error rebuilding the memory store: {e}")
+
+    def on_change(self, group_id: int, week_start: Optional[date]):
+        """Change listener: serve the changed week (or group) from SQLite"""
+        targets = [(self._dirty_weeks, self._dirty_groups)]
+        if self._changes_during_load is not None:
+            targets.append(self._changes_during_load)
+        for dirty_weeks, dirty_groups in targets:
+            if week_start is None:
+                dirty_groups.add(group_id)
+            else:
+                dirty_weeks.add((group_id, week_start))
+
+    def _is_stale(self) -> bool:
+        return (
+            self._loaded_at is None
+            or time.monotonic() - self._loaded_at > self.max_age
+            or len(self._dirty_weeks) + len(self._dirty_groups) > self.max_dirty_weeks
+        )
+
+    def _start_rebuild(self):
+        if self._rebuild_thread is not None and self._rebuild_thread.is_alive():
+            return
+        self._rebuild_thread = threading.Thread(
+            target=self._rebuild, name="memory-store-rebuild", daemon=True
+        )
+        self._rebuild_thread.start()
+
+    def get_week(self, group_id: int, week_start: date) -> Optional[List[dict]]:
+        """
+        Get the lessons of a group's week
+
+        Args:
+            group_id (int): ID of the group
+            week_start (date): Start date of the week
+
+        Returns:
+            Optional[List[dict]]: Lessons as Database.get_schedule_for_week
+            returns them, or None when the week has to be read from SQLite
+        """
+        if not self.start <= week_start < self.end or self._loaded_at is None:
+            return None
+        if self._is_stale():
+            self._start_rebuild()
+        columns = self.columns
+        if (
+            (group_id, week_start) in self._dirty_weeks
+            or group_id in self._dirty_groups
+            or (group_id, week_start.toordinal()) in columns.unsupported
+        ):
+            self.misses += 1
+            return None
+        self.hits += 1
+        week_begin = datetime.combine(week_start, datetime.min.time())
+        return [
+            columns.to_dict(row, week_begin)
+            for row in columns.week_rows(group_id, week_start)
+        ]
+
+    def wait_for_rebuild(self, timeout: Optional[float] = None):
+        """Wait until a running rebuild has swapped in its columns"""
+        thread = self._rebuild_thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def __len__(self) -> int:
+        return len(self.columns)
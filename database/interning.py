@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Process-wide tables sharing subject, teacher and room strings between query results
+"""
+
+import sys
+from typing import Dict, Hashable, Optional
+
+
+class NameTable:
+    """
+    One shared string per row id (or per value, for rooms)
+
+    SQLite hands out a new string for every column of every row, so each
+    cached lesson dictionary would otherwise hold its own copy of names that
+    repeat across thousands of lessons. get() returns the string already held
+    for the id, or keeps the new one when the row was renamed. The tables
+    grow with the number of subjects, teachers and rooms, not with lessons.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.enabled = True
+        self.shared = 0
+        self._strings: Dict[Hashable, str] = {}
+
+    def get(self, key: Hashable, value: Optional[str]) -> Optional[str]:
+        """
+        Get the shared string of a row
+
+        Args:
+            key (Hashable): Row id (or the value itself when rows have no id)
+            value (Optional[str]): Value read from the database
+
+        Returns:
+            Optional[str]: An equal string shared by all results
+        """
+        if value is None or not self.enabled:
+            return value
+        current = self._strings.get(key)
+        if current == value:
+            self.shared += 1
+            return current
+        self._strings[key] = value
+        return value
+
+    def intern(self, value: Optional[str]) -> Optional[str]:
+        """Get the shared string of a value without an id (e.g. a room)"""
+        return self.get(value, value)
+
+    def memory_usage(self) -> int:
+        """Get bytes held by the table: its dictionary and the strings"""
+        return sys.getsizeof(self._strings) + sum(
+            sys.getsizeof(value) for value in self._strings.values()
+        )
+
+    def clear(self):
+        """Drop all shared strings"""
+        self._strings.clear()
+        self.shared = 0
+
+    def __len__(self) -> int:
+        return len(self._strings)
+
+
+# Keyed by subjects.id, teachers.id and the room itself
+subject_names = NameTable("subjects")
+teacher_names = NameTable("teachers")
+location_names = NameTable("locations")
@@ -1,16 +1,177 @@
 import sqlite3
-from datetime import datetime, date
-from typing import Optional, List
+import hashlib
+import os
+import uuid
+from datetime import datetime, date, timedelta
+from typing import Optional, List, Iterator, Callable, Tuple, Dict
+from utils.metrics import trace_methods, db_call_seconds
+from database.columnar import ColumnarStore
+from database.interning import location_names, subject_names, teacher_names
+from database.profiler import profiler, ProfilingConnection
+from utils.stats import live_stats
 
+# Content hash of a week without lessons
+EMPTY_WEEK_HASH = "0" * 16
 
+
+@trace_methods(db_call_seconds)
 class Database:
     def __init__(self, db_path: str = "schedule.db"):
         self.db_path = db_path
+        self._change_listeners: List[Callable[[int, Optional[date]], None]] = []
+        # Written to the change log so a process can skip its own changes
+        self.origin = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        # In-memory copy of a period serving get_schedule_for_week, if enabled
+        self.memory_store: Optional[ColumnarStore] = None
         self.init_db()
 
+    def enable_memory_store(self, start: date, end: date) -> ColumnarStore:
+        """
+        Serve weeks starting in [start, end) from an in-memory columnar store
+
+        The period is loaded now; weeks changed afterwards are read from
+        SQLite until the store is rebuilt (see database.columnar).
+
+        Args:
+            start (date): First day of the period (e.g. the semester start)
+            end (date): Day after the period
+
+        Returns:
+            ColumnarStore: The loaded store
+        """
+        store = ColumnarStore(self, start, end)
+        store.load()
+        self.add_change_listener(store.on_change)
+        self.memory_store = store
+        return store
+
+    def connect(self) -> sqlite3.Connection:
+        """Open a connection, profiled when the SQL profiler is enabled"""
+        live_stats.db_queries.add()
+        if profiler.enabled:
+            return sqlite3.connect(self.db_path, factory=ProfilingConnection)
+        return sqlite3.connect(self.db_path)
+
+    def add_change_listener(self, listener: Callable[[int, Optional[date]], None]):
+        """
+        Register a callback invoked with (group_id, week_start) on schedule changes
+
+        week_start is None when the group itself was added or changed.
+        """
+        self._change_listeners.append(listener)
+
+    def _notify_change(self, group_id: int, week_start):
+        """Tell listeners that a group or the schedule of a group's week has changed"""
+        if isinstance(week_start, str):
+            week_start = date.fromisoformat(week_start)
+        for listener in self._change_listeners:
+            listener(group_id, week_start)
+
+    def notify_change(self, group_id: int, week_start: Optional[date]):
+        """Tell listeners about a change made elsewhere (e.g. by another process)"""
+        self._notify_change(group_id, week_start)
+
+    def _log_change(self, cursor, group_id: int, week_start):
+        """Append a change to the change log read by other processes"""
+        cursor.execute(
+            "INSERT INTO change_log (group_id, week_start, origin) VALUES (?, ?, ?)",
+            (group_id, week_start, self.origin),
+        )
+
+    @staticmethod
+    def _lesson_digest(
+        subject_id, teacher_id, start_time, end_time, location, day_of_week
+    ) -> int:
+        """Hash the content of a lesson to a 64-bit integer"""
+        payload = "\x1f".join(
+            str(value)
+            for value in (
+                subject_id,
+                teacher_id,
+                start_time,
+                end_time,
+                location,
+                day_of_week,
+            )
+        )
+        return int.from_bytes(
+            hashlib.sha256(payload.encode("utf-8")).digest()[:8], "big"
+        )
+
+    def _bump_week(self, cursor, group_id: int, week_start, added_digest: int = 0):
+        """
+        Increase the version of a week and add lesson digests to its content hash
+
+        The content hash is the sum of lesson digests modulo 2**64, so it does
+        not depend on insertion order and is updated without reading the week.
+        """
+        cursor.execute(
+            """
+            SELECT MAX(version), content_hash FROM schedules
+            WHERE group_id = ? AND week_start = ?
+        """,
+            (group_id, week_start),
+        )
+        version, content_hash = cursor.fetchone()
+        content_hash = (int(content_hash or EMPTY_WEEK_HASH, 16) + added_digest) % (
+            1 << 64
+        )
+        cursor.execute(
+            """
+            UPDATE schedules SET version = ?, content_hash = ?
+            WHERE group_id = ? AND week_start = ?
+        """,
+            ((version or 0) + 1, f"{content_hash:016x}", group_id, week_start),
+        )
+        self._log_change(cursor, group_id, week_start)
+
+    def _bump_weeks_using(self, cursor, column: str, row_id: int) -> List[tuple]:
+        """
+        Increase the version of every week with a lesson referencing a row
+
+        Used when a subject or teacher row changes: the lessons keep their
+        content hash, but results rendered from the old row must not be
+        served again. Returns the (group_id, week_start) of the bumped weeks.
+        """
+        cursor.execute(
+            f"""
+            SELECT DISTINCT sch.group_id, sch.week_start
+            FROM lessons l
+            JOIN schedules sch ON l.schedule_id = sch.id
+            WHERE l.{column} = ?
+        """,
+            (row_id,),
+        )
+        weeks = cursor.fetchall()
+        for group_id, week_start in weeks:
+            self._bump_week(cursor, group_id, week_start)
+        return weeks
+
+    def _rehash_week(self, cursor, group_id: int, week_start):
+        """Recompute the content hash of a week from its lessons and bump its version"""
+        cursor.execute(
+            """
+            SELECT l.subject_id, l.teacher_id, l.start_time, l.end_time,
+                   l.location, l.day_of_week
+            FROM lessons l
+            JOIN schedules sch ON l.schedule_id = sch.id
+            WHERE sch.group_id = ? AND sch.week_start = ?
+        """,
+            (group_id, week_start),
+        )
+        digest = sum(self._lesson_digest(*row) for row in cursor.fetchall())
+        cursor.execute(
+            """
+            UPDATE schedules SET content_hash = ?
+            WHERE group_id = ? AND week_start = ?
+        """,
+            (EMPTY_WEEK_HASH, group_id, week_start),
+        )
+        self._bump_week(cursor, group_id, week_start, digest)
+
     def init_db(self):
         """Initialize the database with required tables"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect()
         cursor = conn.cursor()
 
         # Create groups table
@@ -53,11 +214,44 @@ class Database:
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 group_id INTEGER NOT NULL,
                 week_start DATE NOT NULL,
+                version INTEGER NOT NULL DEFAULT 0,
+                content_hash TEXT NOT NULL DEFAULT '0000000000000000',
                 FOREIGN KEY (group_id) REFERENCES groups (id)
             )
         """
         )
 
+        # Create change log table (changes for other processes, read by rowid)
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS change_log (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                group_id INTEGER NOT NULL,
+                week_start DATE,
+                origin TEXT NOT NULL,
+                created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        """
+        )
+
+        # Add version columns to schedules created before they existed
+        cursor.execute("PRAGMA table_info(schedules)")
+        if "version" not in {column[1] for column in cursor.fetchall()}:
+            cursor.execute(
+                "ALTER TABLE schedules ADD COLUMN version INTEGER NOT NULL DEFAULT 0"
+            )
+            cursor.execute(
+                "ALTER TABLE schedules ADD COLUMN content_hash TEXT NOT NULL "
+                f"DEFAULT '{EMPTY_WEEK_HASH}'"
+            )
+            cursor.execute("SELECT DISTINCT group_id, week_start FROM schedules")
+            for group_id, week_start in cursor.fetchall():
+                self._rehash_week(cursor, group_id, week_start)
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_schedules_group_week "
+            "ON schedules (group_id, week_start)"
+        )
+
         # Create lessons table
         cursor.execute(
             """
@@ -77,61 +271,364 @@ class Database:
         """
         )
 
+        # Create user groups table (group chosen by each Telegram user)
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS user_groups (
+                user_id INTEGER PRIMARY KEY,
+                group_id INTEGER NOT NULL,
+                updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (group_id) REFERENCES groups (id)
+            )
+        """
+        )
+
+        # Create reminder subscriptions table
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS reminder_subscriptions (
+                user_id INTEGER PRIMARY KEY,
+                chat_id INTEGER NOT NULL,
+                minutes_before INTEGER NOT NULL,
+                created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        """
+        )
+
+        # Create reminder state table (single row with the dispatch cursor)
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS reminder_state (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                cursor DATETIME NOT NULL
+            )
+        """
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_lessons_start_time ON lessons (start_time)"
+        )
+        # Teacher and room views
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_lessons_teacher_start "
+            "ON lessons (teacher_id, start_time)"
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_lessons_location_start "
+            "ON lessons (location, start_time)"
+        )
+
+        # Create week snapshots table (last notified content of each week)
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS week_snapshots (
+                group_id INTEGER NOT NULL,
+                week_start DATE NOT NULL,
+                fingerprint TEXT NOT NULL,
+                lessons TEXT NOT NULL,
+                PRIMARY KEY (group_id, week_start)
+            )
+        """
+        )
+
+        # Create schedule change subscriptions table
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS change_subscriptions (
+                user_id INTEGER PRIMARY KEY,
+                chat_id INTEGER NOT NULL,
+                created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        """
+        )
+
+        # Create group traffic table (schedule requests per group and day)
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS group_traffic (
+                group_id INTEGER NOT NULL,
+                day DATE NOT NULL,
+                requests INTEGER NOT NULL,
+                PRIMARY KEY (group_id, day)
+            )
+        """
+        )
+
+        # Create file cache table (Telegram file_id of uploaded artifacts).
+        # Tables from before cache keys carried the content version are
+        # dropped, their uploads are simply sent again.
+        cursor.execute("PRAGMA table_info(file_cache)")
+        if "content_hash" in {column[1] for column in cursor.fetchall()}:
+            cursor.execute("DROP TABLE file_cache")
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS file_cache (
+                cache_key TEXT PRIMARY KEY,
+                file_id TEXT NOT NULL,
+                group_id INTEGER,
+                created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        """
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_file_cache_group ON file_cache (group_id)"
+        )
+
+        # Natural keys behind the upserts, added to existing databases after
+        # merging the duplicates they may hold
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?",
+            ("idx_lessons_natural",),
+        )
+        if cursor.fetchone() is None:
+            self._merge_duplicates(cursor)
+            cursor.execute("DROP INDEX IF EXISTS idx_schedules_group_week")
+        cursor.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_groups_name ON groups (name)"
+        )
+        cursor.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_teachers_name ON teachers (name)"
+        )
+        cursor.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_schedules_group_week "
+            "ON schedules (group_id, week_start)"
+        )
+        cursor.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_lessons_natural "
+            "ON lessons (schedule_id, start_time, subject_id, teacher_id)"
+        )
+
         conn.commit()
         conn.close()
 
+    def _merge_duplicates(self, cursor):
+        """
+        Merge rows that share a natural key, keeping the oldest of each
+
+        References are moved to the kept row, so nothing a user set up is
+        lost; the weeks are rehashed afterwards since duplicate lessons go.
+        """
+        merged = 0
+        cursor.execute(
+            """
+            SELECT MIN(id), GROUP_CONCAT(id) FROM groups
+            GROUP BY name HAVING COUNT(*) > 1
+        """
+        )
+        for keep, ids in cursor.fetchall():
+            for duplicate in (int(i) for i in ids.split(",") if int(i) != keep):
+                for table in (
+                    "schedules",
+                    "user_groups",
+                    "group_traffic",
+                    "week_snapshots",
+                    "file_cache",
+                    "change_log",
+                ):
+                    cursor.execute(
+                        f"UPDATE OR IGNORE {table} SET group_id = ? WHERE group_id = ?",
+                        (keep, duplicate),
+                    )
+                    cursor.execute(
+                        f"DELETE FROM {table} WHERE group_id = ?", (duplicate,)
+                    )
+                cursor.execute("DELETE FROM groups WHERE id = ?", (duplicate,))
+                merged += 1
+
+        cursor.execute(
+            """
+            SELECT MIN(id), GROUP_CONCAT(id) FROM teachers
+            GROUP BY name HAVING COUNT(*) > 1
+        """
+        )
+        for keep, ids in cursor.fetchall():
+            for duplicate in (int(i) for i in ids.split(",") if int(i) != keep):
+                cursor.execute(
+                    "UPDATE lessons SET teacher_id = ? WHERE teacher_id = ?",
+                    (keep, duplicate),
+                )
+                cursor.execute("DELETE FROM teachers WHERE id = ?", (duplicate,))
+                merged += 1
+
+        cursor.execute(
+            """
+            SELECT MIN(id), GROUP_CONCAT(id) FROM schedules
+            GROUP BY group_id, week_start HAVING COUNT(*) > 1
+        """
+        )
+        for keep, ids in cursor.fetchall():
+            for duplicate in (int(i) for i in ids.split(",") if int(i) != keep):
+                cursor.execute(
+                    "UPDATE lessons SET schedule_id = ? WHERE schedule_id = ?",
+                    (keep, duplicate),
+                )
+                cursor.execute("DELETE FROM schedules WHERE id = ?", (duplicate,))
+                merged += 1
+
+        cursor.execute(
+            """
+            DELETE FROM lessons WHERE id NOT IN (
+                SELECT MIN(id) FROM lessons
+                GROUP BY schedule_id, start_time, subject_id, teacher_id
+            )
+        """
+        )
+        merged += cursor.rowcount
+
+        if merged:
+            cursor.execute("SELECT DISTINCT group_id, week_start FROM schedules")
+            for group_id, week_start in cursor.fetchall():
+                self._rehash_week(cursor, group_id, week_start)
+
     def add_group(self, name: str, faculty: str) -> int:
-        """Add a new group to the database"""
-        conn = sqlite3.connect(self.db_path)
+        """Add a group, or update the faculty of the group with that name"""
+        conn = self.connect()
         cursor = conn.cursor()
         cursor.execute(
-            "INSERT INTO groups (name, faculty) VALUES (?, ?)", (name, faculty)
+            """
+            INSERT INTO groups (name, faculty) VALUES (?, ?)
+            ON CONFLICT (name) DO UPDATE SET faculty = excluded.faculty
+            WHERE faculty IS NOT excluded.faculty
+        """,
+            (name, faculty),
         )
-        group_id = cursor.lastrowid
+        changed = cursor.rowcount > 0
+        cursor.execute("SELECT id FROM groups WHERE name = ?", (name,))
+        group_id = cursor.fetchone()[0]
+        if changed:
+            self._log_change(cursor, group_id, None)
         conn.commit()
         conn.close()
+        if changed:
+            self._notify_change(group_id, None)
         return group_id
 
     def add_subject(self, name: str, code: str) -> int:
-        """Add a new subject to the database"""
-        conn = sqlite3.connect(self.db_path)
+        """Add a subject, or rename the subject with that code"""
+        conn = self.connect()
         cursor = conn.cursor()
         cursor.execute(
-            "INSERT OR IGNORE INTO subjects (name, code) VALUES (?, ?)", (name, code)
+            """
+            INSERT INTO subjects (name, code) VALUES (?, ?)
+            ON CONFLICT (code) DO UPDATE SET name = excluded.name
+            WHERE name IS NOT excluded.name
+        """,
+            (name, code),
         )
-        conn.commit()
+        changed = cursor.rowcount > 0
 
         # Get the subject id
         cursor.execute("SELECT id FROM subjects WHERE code = ?", (code,))
         subject_id = cursor.fetchone()[0]
+        weeks = []
+        if changed:
+            # A renamed subject changes every week it is taught in
+            weeks = self._bump_weeks_using(cursor, "subject_id", subject_id)
+        conn.commit()
         conn.close()
+        for group_id, week_start in weeks:
+            self._notify_change(group_id, week_start)
         return subject_id
 
     def add_teacher(self, name: str, department: str) -> int:
-        """Add a new teacher to the database"""
-        conn = sqlite3.connect(self.db_path)
+        """Add a teacher, or update the department of the teacher with that name"""
+        conn = self.connect()
         cursor = conn.cursor()
         cursor.execute(
-            "INSERT INTO teachers (name, department) VALUES (?, ?)", (name, department)
+            """
+            INSERT INTO teachers (name, department) VALUES (?, ?)
+            ON CONFLICT (name) DO UPDATE SET department = excluded.department
+            WHERE excluded.department IS NOT NULL
+              AND department IS NOT excluded.department
+        """,
+            (name, department),
         )
-        teacher_id = cursor.lastrowid
+        changed = cursor.rowcount > 0
+        cursor.execute("SELECT id FROM teachers WHERE name = ?", (name,))
+        teacher_id = cursor.fetchone()[0]
+        weeks = []
+        if changed:
+            weeks = self._bump_weeks_using(cursor, "teacher_id", teacher_id)
         conn.commit()
         conn.close()
+        for group_id, week_start in weeks:
+            self._notify_change(group_id, week_start)
         return teacher_id
 
-    def add_schedule(self, group_id: int, week_start: date) -> int:
-        """Add a new schedule for a group"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    def _upsert_schedule(self, cursor, group_id: int, week_start) -> Tuple[int, bool]:
+        """Get the schedule of a week, creating it; returns (id, created)"""
+        cursor.execute(
+            """
+            INSERT INTO schedules (group_id, week_start) VALUES (?, ?)
+            ON CONFLICT (group_id, week_start) DO NOTHING
+        """,
+            (group_id, week_start),
+        )
+        created = cursor.rowcount > 0
         cursor.execute(
-            "INSERT INTO schedules (group_id, week_start) VALUES (?, ?)",
+            "SELECT id FROM schedules WHERE group_id = ? AND week_start = ?",
             (group_id, week_start),
         )
-        schedule_id = cursor.lastrowid
+        return cursor.fetchone()[0], created
+
+    def add_schedule(self, group_id: int, week_start: date) -> int:
+        """Get the schedule of a group's week, creating it when there is none"""
+        conn = self.connect()
+        cursor = conn.cursor()
+        schedule_id, created = self._upsert_schedule(cursor, group_id, week_start)
+        if created:
+            self._bump_week(cursor, group_id, week_start)
         conn.commit()
         conn.close()
+        if created:
+            self._notify_change(group_id, week_start)
         return schedule_id
 
+    def _upsert_lessons(self, cursor, schedule_id: int, lessons: List[tuple]) -> tuple:
+        """
+        Insert new lessons of a schedule and update changed ones
+
+        Lessons are matched on their natural key (subject, teacher, start
+        time); lessons identical to the stored ones are not written at all.
+
+        Returns:
+            tuple: Number of written lessons and the change of the week's
+            content hash
+        """
+        cursor.execute(
+            """
+            SELECT subject_id, teacher_id, start_time, end_time, location, day_of_week
+            FROM lessons WHERE schedule_id = ?
+        """,
+            (schedule_id,),
+        )
+        stored = {
+            (row[0], row[1], str(row[2])): self._lesson_digest(*row)
+            for row in cursor.fetchall()
+        }
+        changed = {}
+        delta = 0
+        for lesson in lessons:
+            key = (lesson[0], lesson[1], str(lesson[2]))
+            digest = self._lesson_digest(*lesson)
+            previous = stored.get(key)
+            if previous == digest:
+                continue
+            delta += digest - (previous or 0)
+            stored[key] = digest
+            changed[key] = lesson
+        cursor.executemany(
+            """
+            INSERT INTO lessons (schedule_id, subject_id, teacher_id, start_time, end_time, location, day_of_week)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (schedule_id, start_time, subject_id, teacher_id) DO UPDATE SET
+                end_time = excluded.end_time,
+                location = excluded.location,
+                day_of_week = excluded.day_of_week
+        """,
+            [(schedule_id, *lesson) for lesson in changed.values()],
+        )
+        return len(changed), delta
+
     def add_lesson(
         self,
         schedule_id: int,
@@ -142,38 +639,190 @@ class Database:
         location: str,
         day_of_week: int,
     ) -> int:
-        """Add a new lesson to a schedule"""
-        conn = sqlite3.connect(self.db_path)
+        """
+        Add a lesson to a schedule, or update the lesson with the same subject,
+        teacher and start time
+        """
+        conn = self.connect()
         cursor = conn.cursor()
+        lesson = (subject_id, teacher_id, start_time, end_time, location, day_of_week)
+        written, delta = self._upsert_lessons(cursor, schedule_id, [lesson])
         cursor.execute(
             """
-            INSERT INTO lessons (schedule_id, subject_id, teacher_id, start_time, end_time, location, day_of_week)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
+            SELECT id FROM lessons
+            WHERE schedule_id = ? AND start_time = ? AND subject_id = ? AND teacher_id = ?
         """,
-            (
-                schedule_id,
-                subject_id,
-                teacher_id,
-                start_time,
-                end_time,
-                location,
-                day_of_week,
-            ),
+            (schedule_id, start_time, subject_id, teacher_id),
         )
-        lesson_id = cursor.lastrowid
+        lesson_id = cursor.fetchone()[0]
+
+        schedule = None
+        if written:
+            cursor.execute(
+                "SELECT group_id, week_start FROM schedules WHERE id = ?",
+                (schedule_id,),
+            )
+            schedule = cursor.fetchone()
+        if schedule:
+            self._bump_week(cursor, schedule[0], schedule[1], delta)
         conn.commit()
         conn.close()
+        if schedule:
+            self._notify_change(schedule[0], schedule[1])
         return lesson_id
 
+    def add_lessons(self, schedule_id: int, lessons: List[tuple]) -> int:
+        """
+        Add or update many lessons of a schedule in one transaction
+
+        Args:
+            schedule_id (int): ID of the schedule
+            lessons (List[tuple]): (subject_id, teacher_id, start_time, end_time,
+                location, day_of_week) tuples
+
+        Returns:
+            int: Number of added or changed lessons (0 when all were stored)
+        """
+        if not lessons:
+            return 0
+        conn = self.connect()
+        cursor = conn.cursor()
+        written, delta = self._upsert_lessons(cursor, schedule_id, lessons)
+
+        schedule = None
+        if written:
+            cursor.execute(
+                "SELECT group_id, week_start FROM schedules WHERE id = ?",
+                (schedule_id,),
+            )
+            schedule = cursor.fetchone()
+        if schedule:
+            # One version bump for the whole batch
+            self._bump_week(cursor, schedule[0], schedule[1], delta)
+        conn.commit()
+        conn.close()
+        if schedule:
+            self._notify_change(schedule[0], schedule[1])
+        return written
+
+    def add_lessons_by_week(self, weeks: Dict[Tuple[int, date], List[tuple]]) -> int:
+        """
+        Add or update lessons of many weeks in one transaction
+
+        A schedule is created for weeks that have none, and every week with
+        new or changed lessons gets one version bump. Weeks whose lessons are
+        all stored already are left untouched, so re-imports are cheap.
+
+        Args:
+            weeks (Dict[Tuple[int, date], List[tuple]]): (group_id, week_start)
+                mapped to (subject_id, teacher_id, start_time, end_time,
+                location, day_of_week) tuples
+
+        Returns:
+            int: Number of added or changed lessons
+        """
+        conn = self.connect()
+        cursor = conn.cursor()
+        written = 0
+        touched = []
+        for (group_id, week_start), lessons in weeks.items():
+            if not lessons:
+                continue
+            schedule_id, created = self._upsert_schedule(cursor, group_id, week_start)
+            count, delta = self._upsert_lessons(cursor, schedule_id, lessons)
+            if count or created:
+                self._bump_week(cursor, group_id, week_start, delta)
+                touched.append((group_id, week_start))
+            written += count
+        conn.commit()
+        conn.close()
+        for group_id, week_start in touched:
+            self._notify_change(group_id, week_start)
+        return written
+
+    def replace_weeks(
+        self, weeks: Dict[Tuple[int, date], List[tuple]]
+    ) -> List[Tuple[int, date]]:
+        """
+        Make the stored lessons of weeks exactly the given ones, in one transaction
+
+        The content hash of the new lessons is compared with the stored one
+        first, so unchanged weeks cost one lookup and no writes.
+
+        Args:
+            weeks (Dict[Tuple[int, date], List[tuple]]): (group_id, week_start)
+                mapped to (subject_id, teacher_id, start_time, end_time,
+                location, day_of_week) tuples; an empty list clears the week
+
+        Returns:
+            List[Tuple[int, date]]: (group_id, week_start) of the weeks that changed
+        """
+        conn = self.connect()
+        cursor = conn.cursor()
+        touched = []
+        for (group_id, week_start), lessons in weeks.items():
+            # Later lessons win over earlier ones with the same natural key
+            lessons = list(
+                {
+                    (lesson[0], lesson[1], str(lesson[2])): lesson for lesson in lessons
+                }.values()
+            )
+            digest = sum(self._lesson_digest(*lesson) for lesson in lessons)
+            cursor.execute(
+                """
+                SELECT id, content_hash FROM schedules
+                WHERE group_id = ? AND week_start = ?
+            """,
+                (group_id, week_start),
+            )
+            schedule = cursor.fetchone()
+            if schedule is None and not lessons:
+                continue
+            if schedule is not None and int(schedule[1], 16) == digest % (1 << 64):
+                continue
+
+            schedule_id, _ = self._upsert_schedule(cursor, group_id, week_start)
+            cursor.execute("DELETE FROM lessons WHERE schedule_id = ?", (schedule_id,))
+            cursor.executemany(
+                """
+                INSERT INTO lessons (schedule_id, subject_id, teacher_id, start_time, end_time, location, day_of_week)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+                [(schedule_id, *lesson) for lesson in lessons],
+            )
+            cursor.execute(
+                "UPDATE schedules SET content_hash = ? WHERE id = ?",
+                (EMPTY_WEEK_HASH, schedule_id),
+            )
+            self._bump_week(cursor, group_id, week_start, digest)
+            touched.append((group_id, week_start))
+        conn.commit()
+        conn.close()
+        for group_id, week_start in touched:
+            self._notify_change(group_id, week_start)
+        return touched
+
+    def replace_week(
+        self, group_id: int, week_start: date, lessons: List[tuple]
+    ) -> bool:
+        """Make the stored lessons of a week exactly the given ones (see replace_weeks)"""
+        return bool(self.replace_weeks({(group_id, week_start): lessons}))
+
     def get_schedule_for_week(self, group_id: int, week_start: date) -> List[dict]:
         """Get schedule for a specific group and week"""
-        conn = sqlite3.connect(self.db_path)
+        if self.memory_store is not None:
+            lessons = self.memory_store.get_week(group_id, week_start)
+            if lessons is not None:
+                return lessons
+
+        conn = self.connect()
         cursor = conn.cursor()
 
         cursor.execute(
             """
             SELECT l.id, s.name as subject_name, t.name as teacher_name, 
-                   l.start_time, l.end_time, l.location, l.day_of_week
+                   l.start_time, l.end_time, l.location, l.day_of_week,
+                   l.subject_id, l.teacher_id
             FROM lessons l
             JOIN subjects s ON l.subject_id = s.id
             JOIN teachers t ON l.teacher_id = t.id
@@ -193,29 +842,748 @@ class Database:
             result.append(
                 {
                     "id": lesson[0],
-                    "subject_name": lesson[1],
-                    "teacher_name": lesson[2],
+                    "subject_name": subject_names.get(lesson[7], lesson[1]),
+                    "teacher_name": teacher_names.get(lesson[8], lesson[2]),
                     "start_time": datetime.fromisoformat(lesson[3]),
                     "end_time": datetime.fromisoformat(lesson[4]),
-                    "location": lesson[5],
+                    "location": location_names.intern(lesson[5]),
                     "day_of_week": lesson[6],
                 }
             )
 
         return result
 
-    def get_group_id_by_name(self, name: str) -> Optional[int]:
-        """Get group ID by name"""
-        conn = sqlite3.connect(self.db_path)
+    def _get_lessons_between(self, column: str, value, week_start: date) -> List[dict]:
+        """Get lessons of the week starting at week_start with a column value"""
+        start = datetime.combine(week_start, datetime.min.time())
+        conn = self.connect()
         cursor = conn.cursor()
-        cursor.execute("SELECT id FROM groups WHERE name = ?", (name,))
-        result = cursor.fetchone()
-        conn.close()
+        cursor.execute(
+            f"""
+            SELECT l.id, s.name as subject_name, t.name as teacher_name,
+                   l.start_time, l.end_time, l.location, l.day_of_week,
+                   g.name as group_name, l.subject_id, l.teacher_id
+            FROM lessons l
+            JOIN subjects s ON l.subject_id = s.id
+            JOIN teachers t ON l.teacher_id = t.id
+            JOIN schedules sch ON l.schedule_id = sch.id
+            JOIN groups g ON sch.group_id = g.id
+            WHERE l.{column} = ? AND l.start_time >= ? AND l.start_time < ?
+            ORDER BY l.start_time, g.name
+        """,
+            (value, start, start + timedelta(days=7)),
+        )
+        lessons = cursor.fetchall()
+        conn.close()
+        return [
+            {
+                "id": lesson[0],
+                "subject_name": subject_names.get(lesson[8], lesson[1]),
+                "teacher_name": teacher_names.get(lesson[9], lesson[2]),
+                "start_time": datetime.fromisoformat(lesson[3]),
+                "end_time": datetime.fromisoformat(lesson[4]),
+                "location": location_names.intern(lesson[5]),
+                "day_of_week": lesson[6],
+                "group_name": lesson[7],
+            }
+            for lesson in lessons
+        ]
+
+    def get_teacher_schedule_for_week(
+        self, teacher_id: int, week_start: date
+    ) -> List[dict]:
+        """
+        Get lessons of a teacher in a week, with the group of every lesson
+
+        Uses the (teacher_id, start_time) index, so the cost depends on the
+        teacher's lessons that week and not on the size of the timetable.
+        """
+        return self._get_lessons_between("teacher_id", teacher_id, week_start)
+
+    def get_room_schedule_for_week(self, location: str, week_start: date) -> List[dict]:
+        """Get lessons held in a room in a week, using the (location, start_time) index"""
+        return self._get_lessons_between("location", location, week_start)
+
+    @staticmethod
+    def _period_filter(start: date, end: date) -> tuple:
+        """
+        Parameters of a lessons query for the days [start, end)
+
+        Returns the Monday on or before start (so a first week that starts
+        before the period, e.g. on August 31 for September 1, is not
+        skipped), end, and the bounds of lesson start times.
+        """
+        first_week = start - timedelta(days=start.weekday())
+        return (
+            first_week,
+            end,
+            datetime.combine(start, datetime.min.time()),
+            datetime.combine(end, datetime.min.time()),
+        )
+
+    def iter_lessons_for_period(
+        self, group_id: int, start: date, end: date, batch_size: int = 500
+    ) -> Iterator[dict]:
+        """
+        Stream lessons of a group starting on the days [start, end)
+
+        Lessons are read in batches of ``batch_size``, each with its own
+        short-lived connection that continues after the last (start_time, id)
+        seen. Memory use does not depend on the length of the period, and a
+        consumer that pauses between batches (e.g. an upload) holds no read
+        lock that would block writers.
+        """
+        after = ("", 0)
+        while True:
+            conn = self.connect()
+            try:
+                cursor = conn.cursor()
+                cursor.execute(
+                    """
+                    SELECT l.id, s.name as subject_name, t.name as teacher_name,
+                           l.start_time, l.end_time, l.location, l.day_of_week,
+                           l.subject_id, l.teacher_id
+                    FROM lessons l
+                    JOIN subjects s ON l.subject_id = s.id
+                    JOIN teachers t ON l.teacher_id = t.id
+                    JOIN schedules sch ON l.schedule_id = sch.id
+                    WHERE sch.group_id = ? AND sch.week_start >= ? AND sch.week_start < ?
+                      AND l.start_time >= ? AND l.start_time < ?
+                      AND (l.start_time > ? OR (l.start_time = ? AND l.id > ?))
+                    ORDER BY l.start_time, l.id
+                    LIMIT ?
+                """,
+                    (
+                        group_id,
+                        *self._period_filter(start, end),
+                        after[0],
+                        *after,
+                        batch_size,
+                    ),
+                )
+                rows = cursor.fetchall()
+            finally:
+                conn.close()
+            if not rows:
+                break
+            after = (rows[-1][3], rows[-1][0])
+            for lesson in rows:
+                yield {
+                    "id": lesson[0],
+                    "subject_name": subject_names.get(lesson[7], lesson[1]),
+                    "teacher_name": teacher_names.get(lesson[8], lesson[2]),
+                    "start_time": datetime.fromisoformat(lesson[3]),
+                    "end_time": datetime.fromisoformat(lesson[4]),
+                    "location": location_names.intern(lesson[5]),
+                    "day_of_week": lesson[6],
+                }
+            if len(rows) < batch_size:
+                break
+
+    def iter_period_lessons(
+        self, start: date, end: date, batch_size: int = 5000
+    ) -> Iterator[tuple]:
+        """
+        Stream lessons of all groups for weeks starting in [start, end) as
+        (group_id, week_start, id, subject_name, teacher_name, start_time,
+        end_time, location, day_of_week) rows of SQLite values, ordered by
+        group, week and then as in get_schedule_for_week
+        """
+        conn = self.connect()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(
+                """
+                SELECT sch.group_id, sch.week_start, l.id, s.name, t.name,
+                       l.start_time, l.end_time, l.location, l.day_of_week
+                FROM schedules sch
+                JOIN lessons l ON l.schedule_id = sch.id
+                JOIN subjects s ON l.subject_id = s.id
+                JOIN teachers t ON l.teacher_id = t.id
+                WHERE sch.week_start >= ? AND sch.week_start < ?
+                ORDER BY sch.group_id, sch.week_start, l.day_of_week, l.start_time, l.id
+            """,
+                (start, end),
+            )
+
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            conn.close()
+
+    def iter_room_occupancy(
+        self, start: date, end: date, batch_size: int = 5000
+    ) -> Iterator[tuple]:
+        """
+        Stream (location, group_id, week_start, start_time, end_time) of all
+        lessons with a room starting on the days [start, end)
+        """
+        conn = self.connect()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(
+                """
+                SELECT l.location, sch.group_id, sch.week_start, l.start_time, l.end_time
+                FROM lessons l
+                JOIN schedules sch ON l.schedule_id = sch.id
+                WHERE sch.week_start >= ? AND sch.week_start < ?
+                  AND l.start_time >= ? AND l.start_time < ?
+                  AND l.location IS NOT NULL
+            """,
+                self._period_filter(start, end),
+            )
+
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for location, group_id, week_start, start_time, end_time in rows:
+                    yield (
+                        location,
+                        group_id,
+                        date.fromisoformat(week_start),
+                        datetime.fromisoformat(start_time),
+                        datetime.fromisoformat(end_time),
+                    )
+        finally:
+            conn.close()
+
+    def get_week_version(
+        self, group_id: int, week_start: date
+    ) -> Optional[Tuple[int, str]]:
+        """
+        Get the version and content hash of a group's week
+
+        The version grows with every write to the week; the content hash only
+        depends on the lessons of the week.
+
+        Args:
+            group_id (int): ID of the group
+            week_start (date): Start date of the week
+
+        Returns:
+            Optional[Tuple[int, str]]: (version, content_hash), None if the week
+            has no schedule
+        """
+        conn = self.connect()
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            SELECT version, content_hash FROM schedules
+            WHERE group_id = ? AND week_start = ?
+            LIMIT 1
+        """,
+            (group_id, week_start),
+        )
+        result = cursor.fetchone()
+        conn.close()
+        return result
+
+    def get_period_version(self, group_id: int, start: date, end: date) -> str:
+        """
+        Get a cheap version token for a group's weeks overlapping [start, end)
+
+        Like iter_lessons_for_period, the week containing start is included
+        even when it begins before the period.
+        """
+        conn = self.connect()
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            SELECT COUNT(*), COALESCE(SUM(version), 0) FROM schedules
+            WHERE group_id = ? AND week_start >= ? AND week_start < ?
+        """,
+            (group_id, *self._period_filter(start, end)[:2]),
+        )
+        count, versions = cursor.fetchone()
+        conn.close()
+        return f"{count}.{versions}"
+
+    def get_changes_since(
+        self, after_id: int, exclude_origin: Optional[str] = None, limit: int = 1000
+    ) -> List[tuple]:
+        """
+        Get change log entries newer than a rowid
+
+        Args:
+            after_id (int): Last change log ID already seen
+            exclude_origin (Optional[str]): Skip changes written by this origin
+            limit (int): Maximum number of entries
+
+        Returns:
+            List[tuple]: (id, group_id, week_start) sorted by ID, week_start is
+            a date or None
+        """
+        conn = self.connect()
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            SELECT id, group_id, week_start FROM change_log
+            WHERE id > ? AND origin IS NOT ?
+            ORDER BY id
+            LIMIT ?
+        """,
+            (after_id, exclude_origin, limit),
+        )
+        result = [
+            (
+                change_id,
+                group_id,
+                date.fromisoformat(week_start) if week_start else None,
+            )
+            for change_id, group_id, week_start in cursor.fetchall()
+        ]
+        conn.close()
+        return result
+
+    def get_change_log_bounds(self) -> Tuple[int, int]:
+        """Get the smallest and the largest change log IDs (0, 0 when empty)"""
+        conn = self.connect()
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT COALESCE(MIN(id), 0), COALESCE(MAX(id), 0) FROM change_log"
+        )
+        result = cursor.fetchone()
+        conn.close()
+        return result
+
+    def prune_change_log(self, keep: int) -> int:
+        """Delete all but the newest `keep` change log entries"""
+        conn = self.connect()
+        cursor = conn.cursor()
+        cursor.execute(
+            "DELETE FROM change_log WHERE id <= (SELECT MAX(id) FROM change_log) - ?",
+            (keep,),
+        )
+        deleted = cursor.rowcount
+        conn.commit()
+        conn.close()
+        return deleted
+
+    def add_group_traffic(self, counts: dict, day: date):
+        """Add request counts per group to the traffic of a day"""
+        if not counts:
+            return
+        conn = self.connect()
+        cursor = conn.cursor()
+        cursor.executemany(
+            """
+            INSERT INTO group_traffic (group_id, day, requests) VALUES (?, ?, ?)
+            ON CONFLICT (group_id, day) DO UPDATE
+            SET requests = requests + excluded.requests
+        """,
+            [(group_id, day, requests) for group_id, requests in counts.items()],
+        )
+        conn.commit()
+        conn.close()
+
+    def get_top_groups(self, since: date, limit: int) -> List[tuple]:
+        """
+        Get the groups with the most requests since a day
+
+        Args:
+            since (date): First day to count
+            limit (int): Maximum number of groups
+
+        Returns:
+            List[tuple]: (group_id, group_name, requests) sorted by requests
+        """
+        conn = self.connect()
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            SELECT g.id, g.name, SUM(t.requests) AS total
+            FROM group_traffic t
+            JOIN groups g ON g.id = t.group_id
+            WHERE t.day >= ?
+            GROUP BY g.id, g.name
+            ORDER BY total DESC, g.id
+            LIMIT ?
+        """,
+            (since, limit),
+        )
+        result = cursor.fetchall()
+        conn.close()
+        return result
+
+    def get_total_traffic(self, since: date) -> int:
+        """Get the number of requests of all groups since a day"""
+        conn = self.connect()
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT COALESCE(SUM(requests), 0) FROM group_traffic WHERE day >= ?",
+            (since,),
+        )
+        result = cursor.fetchone()[0]
+        conn.close()
+        return result
+
+    def prune_group_traffic(self, before: date) -> int:
+        """Delete traffic of days before a day"""
+        conn = self.connect()
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM group_traffic WHERE day < ?", (before,))
+        deleted = cursor.rowcount
+        conn.commit()
+        conn.close()
+        return deleted
+
+    def get_group_name(self, group_id: int) -> Optional[str]:
+        """Get group name by ID"""
+        conn = self.connect()
+        cursor = conn.cursor()
+        cursor.execute("SELECT name FROM groups WHERE id = ?", (group_id,))
+        result = cursor.fetchone()
+        conn.close()
+        return result[0] if result else None
+
+    def get_teacher_name(self, teacher_id: int) -> Optional[str]:
+        """Get teacher name by ID"""
+        conn = self.connect()
+        cursor = conn.cursor()
+        cursor.execute("SELECT name FROM teachers WHERE id = ?", (teacher_id,))
+        result = cursor.fetchone()
+        conn.close()
+        return result[0] if result else None
+
+    def get_schedule_weeks(self, since: date) -> List[tuple]:
+        """Get distinct (group_id, week_start) of schedules starting on or after a date"""
+        conn = self.connect()
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            SELECT DISTINCT group_id, week_start FROM schedules
+            WHERE week_start >= ?
+            ORDER BY group_id, week_start
+        """,
+            (since,),
+        )
+        result = [
+            (group_id, date.fromisoformat(week_start))
+            for group_id, week_start in cursor.fetchall()
+        ]
+        conn.close()
+        return result
+
+    def get_all_groups(self) -> List[tuple]:
+        """Get (id, name, faculty) of all groups"""
+        conn = self.connect()
+        cursor = conn.cursor()
+        cursor.execute("SELECT id, name, faculty FROM groups")
+        groups = cursor.fetchall()
+        conn.close()
+        return groups
+
+    def get_all_subjects(self) -> List[tuple]:
+        """Get (id, name, code) of all subjects"""
+        conn = self.connect()
+        cursor = conn.cursor()
+        cursor.execute("SELECT id, name, code FROM subjects")
+        subjects = cursor.fetchall()
+        conn.close()
+        return subjects
+
+    def get_all_teachers(self) -> List[tuple]:
+        """Get (id, name, department) of all teachers"""
+        conn = self.connect()
+        cursor = conn.cursor()
+        cursor.execute("SELECT id, name, department FROM teachers")
+        teachers = cursor.fetchall()
+        conn.close()
+        return teachers
+
+    def get_all_locations(self) -> List[str]:
+        """Get the distinct rooms of all lessons"""
+        conn = self.connect()
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT DISTINCT location FROM lessons WHERE location IS NOT NULL "
+            "ORDER BY location"
+        )
+        locations = [row[0] for row in cursor.fetchall()]
+        conn.close()
+        return locations
+
+    def get_group_id_by_name(self, name: str) -> Optional[int]:
+        """Get group ID by name"""
+        conn = self.connect()
+        cursor = conn.cursor()
+        cursor.execute("SELECT id FROM groups WHERE name = ?", (name,))
+        result = cursor.fetchone()
+        conn.close()
         return result[0] if result else None
 
+    def set_user_group(self, user_id: int, group_id: int):
+        """Remember the group chosen by a user"""
+        conn = self.connect()
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            INSERT OR REPLACE INTO user_groups (user_id, group_id, updated_at)
+            VALUES (?, ?, CURRENT_TIMESTAMP)
+        """,
+            (user_id, group_id),
+        )
+        conn.commit()
+        conn.close()
+
+    def get_user_group(self, user_id: int) -> Optional[tuple]:
+        """Get (group_id, group_name) chosen by a user"""
+        conn = self.connect()
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            SELECT g.id, g.name
+            FROM user_groups ug
+            JOIN groups g ON ug.group_id = g.id
+            WHERE ug.user_id = ?
+        """,
+            (user_id,),
+        )
+        result = cursor.fetchone()
+        conn.close()
+        return result
+
+    def set_reminder(self, user_id: int, chat_id: int, minutes_before: int):
+        """Subscribe a user to reminders before each lesson of their group"""
+        conn = self.connect()
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            INSERT OR REPLACE INTO reminder_subscriptions (user_id, chat_id, minutes_before)
+            VALUES (?, ?, ?)
+        """,
+            (user_id, chat_id, minutes_before),
+        )
+        conn.commit()
+        conn.close()
+
+    def delete_reminder(self, user_id: int) -> bool:
+        """Unsubscribe a user from reminders"""
+        conn = self.connect()
+        cursor = conn.cursor()
+        cursor.execute(
+            "DELETE FROM reminder_subscriptions WHERE user_id = ?", (user_id,)
+        )
+        deleted = cursor.rowcount > 0
+        conn.commit()
+        conn.close()
+        return deleted
+
+    def delete_chat_reminders(self, chat_id: int) -> int:
+        """Unsubscribe every reminder delivered to a chat (e.g. the bot was blocked)"""
+        conn = self.connect()
+        cursor = conn.cursor()
+        cursor.execute(
+            "DELETE FROM reminder_subscriptions WHERE chat_id = ?", (chat_id,)
+        )
+        deleted = cursor.rowcount
+        conn.commit()
+        conn.close()
+        return deleted
+
+    def get_reminder_subscribers(self) -> List[tuple]:
+        """Get (group_id, minutes_before, chat_id) of all reminder subscriptions"""
+        conn = self.connect()
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            SELECT ug.group_id, rs.minutes_before, rs.chat_id
+            FROM reminder_subscriptions rs
+            JOIN user_groups ug ON rs.user_id = ug.user_id
+        """
+        )
+        result = cursor.fetchall()
+        conn.close()
+        return result
+
+    def get_lessons_starting_between(
+        self, start: datetime, end: datetime, group_ids: List[int]
+    ) -> List[dict]:
+        """Get lessons of the given groups starting in [start, end)"""
+        if not group_ids:
+            return []
+        conn = self.connect()
+        cursor = conn.cursor()
+        placeholders = ", ".join("?" for _ in group_ids)
+        cursor.execute(
+            f"""
+            SELECT l.id, s.name as subject_name, t.name as teacher_name,
+                   l.start_time, l.end_time, l.location, l.day_of_week, sch.group_id,
+                   l.subject_id, l.teacher_id
+            FROM lessons l
+            JOIN subjects s ON l.subject_id = s.id
+            JOIN teachers t ON l.teacher_id = t.id
+            JOIN schedules sch ON l.schedule_id = sch.id
+            WHERE l.start_time >= ? AND l.start_time < ?
+              AND sch.group_id IN ({placeholders})
+            ORDER BY l.start_time
+        """,
+            (start, end, *group_ids),
+        )
+        lessons = cursor.fetchall()
+        conn.close()
+
+        return [
+            {
+                "id": lesson[0],
+                "subject_name": subject_names.get(lesson[8], lesson[1]),
+                "teacher_name": teacher_names.get(lesson[9], lesson[2]),
+                "start_time": datetime.fromisoformat(lesson[3]),
+                "end_time": datetime.fromisoformat(lesson[4]),
+                "location": location_names.intern(lesson[5]),
+                "day_of_week": lesson[6],
+                "group_id": lesson[7],
+            }
+            for lesson in lessons
+        ]
+
+    def get_reminder_cursor(self) -> Optional[datetime]:
+        """Get the fire time of the last dispatched reminder"""
+        conn = self.connect()
+        cursor = conn.cursor()
+        cursor.execute("SELECT cursor FROM reminder_state WHERE id = 1")
+        result = cursor.fetchone()
+        conn.close()
+        return datetime.fromisoformat(result[0]) if result else None
+
+    def set_reminder_cursor(self, value: datetime):
+        """Persist the fire time of the last dispatched reminder"""
+        conn = self.connect()
+        cursor = conn.cursor()
+        cursor.execute(
+            "INSERT OR REPLACE INTO reminder_state (id, cursor) VALUES (1, ?)",
+            (value.isoformat(" "),),
+        )
+        conn.commit()
+        conn.close()
+
+    def get_week_snapshot(self, group_id: int, week_start: date) -> Optional[tuple]:
+        """Get (fingerprint, serialized lessons) of the last snapshot of a week"""
+        conn = self.connect()
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            SELECT fingerprint, lessons FROM week_snapshots
+            WHERE group_id = ? AND week_start = ?
+        """,
+            (group_id, week_start),
+        )
+        result = cursor.fetchone()
+        conn.close()
+        return result
+
+    def save_week_snapshot(
+        self, group_id: int, week_start: date, fingerprint: str, lessons: str
+    ):
+        """Store the snapshot of a week"""
+        conn = self.connect()
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            INSERT OR REPLACE INTO week_snapshots (group_id, week_start, fingerprint, lessons)
+            VALUES (?, ?, ?, ?)
+        """,
+            (group_id, week_start, fingerprint, lessons),
+        )
+        conn.commit()
+        conn.close()
+
+    def set_change_subscription(self, user_id: int, chat_id: int):
+        """Subscribe a user to schedule change notifications of their group"""
+        conn = self.connect()
+        cursor = conn.cursor()
+        cursor.execute(
+            "INSERT OR REPLACE INTO change_subscriptions (user_id, chat_id) VALUES (?, ?)",
+            (user_id, chat_id),
+        )
+        conn.commit()
+        conn.close()
+
+    def delete_change_subscription(self, user_id: int) -> bool:
+        """Unsubscribe a user from schedule change notifications"""
+        conn = self.connect()
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM change_subscriptions WHERE user_id = ?", (user_id,))
+        deleted = cursor.rowcount > 0
+        conn.commit()
+        conn.close()
+        return deleted
+
+    def delete_chat_change_subscriptions(self, chat_id: int) -> int:
+        """Unsubscribe every change notification delivered to a chat"""
+        conn = self.connect()
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM change_subscriptions WHERE chat_id = ?", (chat_id,))
+        deleted = cursor.rowcount
+        conn.commit()
+        conn.close()
+        return deleted
+
+    def get_change_subscribers(self, group_id: int) -> List[int]:
+        """Get chat IDs subscribed to schedule changes of a group"""
+        conn = self.connect()
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            SELECT cs.chat_id
+            FROM change_subscriptions cs
+            JOIN user_groups ug ON cs.user_id = ug.user_id
+            WHERE ug.group_id = ?
+        """,
+            (group_id,),
+        )
+        result = [row[0] for row in cursor.fetchall()]
+        conn.close()
+        return result
+
     def get_or_create_group(self, name: str, faculty: str) -> int:
         """Get existing group or create a new one"""
         group_id = self.get_group_id_by_name(name)
         if group_id is None:
             group_id = self.add_group(name, faculty)
         return group_id
+
+    def get_cached_file(self, cache_key: str) -> Optional[tuple]:
+        """Get (file_id, group_id) of a cached upload by its key"""
+        conn = self.connect()
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT file_id, group_id FROM file_cache WHERE cache_key = ?",
+            (cache_key,),
+        )
+        result = cursor.fetchone()
+        conn.close()
+        return result
+
+    def save_cached_file(
+        self, cache_key: str, file_id: str, group_id: Optional[int] = None
+    ):
+        """Remember the Telegram file_id of an uploaded artifact"""
+        conn = self.connect()
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            INSERT OR REPLACE INTO file_cache (cache_key, file_id, group_id)
+            VALUES (?, ?, ?)
+        """,
+            (cache_key, file_id, group_id),
+        )
+        conn.commit()
+        conn.close()
+
+    def prune_cached_files(self, before: datetime) -> int:
+        """Forget cached uploads saved before a moment (UTC)"""
+        conn = self.connect()
+        cursor = conn.cursor()
+        cursor.execute(
+            "DELETE FROM file_cache WHERE created_at < ?",
+            (before.strftime("%Y-%m-%d %H:%M:%S"),),
+        )
+        deleted = cursor.rowcount
+        conn.commit()
+        conn.close()
+        return deleted
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Opt-in profiler of SQL statements run through Database connections
+"""
+
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, List, Optional
+import re
+import sqlite3
+import threading
+import time
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAMETER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def fingerprint(sql: str) -> str:
+    """
+    Normalize a statement so that calls differing only in literals match
+
+    Literals become "?", lists of placeholders become "(?+)" and whitespace
+    is collapsed.
+
+    Args:
+        sql (str): SQL statement
+
+    Returns:
+        str: Statement fingerprint
+    """
+    sql = _STRING_LITERAL.sub("?", sql)
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    sql = _WHITESPACE.sub(" ", sql).strip()
+    return _PARAMETER_LIST.sub("(?+)", sql)
+
+
+def is_table_scan(plan: List[str]) -> bool:
+    """Check whether a query plan reads a whole table without an index"""
+    return any(detail.startswith("SCAN") and "USING" not in detail for detail in plan)
+
+
+class QueryProfiler:
+    """
+    Records SQL statements: a ring buffer of recent executions and totals per
+    fingerprint
+
+    Statements slower than slow_ms get their EXPLAIN QUERY PLAN attached, so
+    table scans can be spotted in production. Disabled by default; while
+    disabled Database hands out plain sqlite3 connections.
+    """
+
+    def __init__(self, capacity: int = 500, slow_ms: float = 50):
+        self.enabled = False
+        self.slow_ms = slow_ms
+        self.recent: Deque[dict] = deque(maxlen=capacity)
+        self.slow: Deque[dict] = deque(maxlen=capacity)
+        # fingerprint: {"count", "total_ms", "max_ms", "rows"}
+        self.totals: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def record(self, sql: str, elapsed_ms: float, rows: int) -> dict:
+        """Add an execution to the ring buffer and the totals"""
+        entry = {
+            "fingerprint": fingerprint(sql),
+            "sql": sql,
+            "elapsed_ms": elapsed_ms,
+            "rows": rows,
+            "plan": None,
+            "at": datetime.now(),
+        }
+        with self._lock:
+            self.recent.append(entry)
+            totals = self.totals.setdefault(
+                entry["fingerprint"],
+                {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "rows": 0},
+            )
+            totals["count"] += 1
+            totals["total_ms"] += elapsed_ms
+            totals["max_ms"] = max(totals["max_ms"], elapsed_ms)
+            totals["rows"] += max(rows, 0)
+        return entry
+
+    def update(self, entry: dict, elapsed_ms: float, rows: int):
+        """Add fetch time and fetched rows to a recorded execution"""
+        with self._lock:
+            entry["elapsed_ms"] += elapsed_ms
+            entry["rows"] = max(entry["rows"], 0) + rows
+            totals = self.totals[entry["fingerprint"]]
+            totals["total_ms"] += elapsed_ms
+            totals["max_ms"] = max(totals["max_ms"], entry["elapsed_ms"])
+            totals["rows"] += rows
+
+    def mark_slow(self, entry: dict, plan: List[str]):
+        """Attach the query plan of a slow execution"""
+        entry["plan"] = plan
+        entry["scan"] = is_table_scan(plan)
+        with self._lock:
+            self.slow.append(entry)
+
+    def top(self, limit: int = 10, key: str = "total_ms") -> List[tuple]:
+        """Get (fingerprint, totals) with the largest value of a total"""
+        with self._lock:
+            items = [(name, dict(totals)) for name, totals in self.totals.items()]
+        return sorted(items, key=lambda item: item[1][key], reverse=True)[:limit]
+
+    def reset(self):
+        """Drop everything recorded"""
+        with self._lock:
+            self.recent.clear()
+            self.slow.clear()
+            self.totals.clear()
+
+
+# Process-wide profiler used by Database
+profiler = QueryProfiler()
+
+
+class ProfilingCursor(sqlite3.Cursor):
+    """Cursor timing execute/executemany and the fetches that follow them"""
+
+    _entry: Optional[dict] = None
+    _parameters = ()
+
+    def execute(self, sql, parameters=()):
+        started = time.perf_counter()
+        result = super().execute(sql, parameters)
+        self._entry = profiler.record(
+            sql, (time.perf_counter() - started) * 1000, self.rowcount
+        )
+        self._parameters = parameters
+        self._check_slow()
+        return result
+
+    def executemany(self, sql, seq_of_parameters):
+        started = time.perf_counter()
+        result = super().executemany(sql, seq_of_parameters)
+        self._entry = profiler.record(
+            sql, (time.perf_counter() - started) * 1000, self.rowcount
+        )
+        # No single parameter set to explain with
+        self._parameters = None
+        return result
+
+    def _after_fetch(self, started: float, rows: int):
+        if self._entry is not None:
+            profiler.update(self._entry, (time.perf_counter() - started) * 1000, rows)
+            self._check_slow()
+
+    def _check_slow(self):
+        entry = self._entry
+        if (
+            entry["plan"] is not None
+            or self._parameters is None
+            or entry["elapsed_ms"] < profiler.slow_ms
+        ):
+            return
+        try:
+            # A plain cursor, so the EXPLAIN itself is not profiled
+            plan_rows = (
+                sqlite3.Cursor(self.connection)
+                .execute(f"EXPLAIN QUERY PLAN {entry['sql']}", self._parameters)
+                .fetchall()
+            )
+            profiler.mark_slow(entry, [row[-1] for row in plan_rows])
+        except sqlite3.Error:
+            # Statements such as PRAGMA cannot be explained
+            profiler.mark_slow(entry, [])
+
+    def fetchone(self):
+        started = time.perf_counter()
+        row = super().fetchone()
+        self._after_fetch(started, 0 if row is None else 1)
+        return row
+
+    def fetchmany(self, size=None):
+        started = time.perf_counter()
+        rows = super().fetchmany(size if size is not None else self.arraysize)
+        self._after_fetch(started, len(rows))
+        return rows
+
+    def fetchall(self):
+        started = time.perf_counter()
+        rows = super().fetchall()
+        self._after_fetch(started, len(rows))
+        return rows
+
+
+class ProfilingConnection(sqlite3.Connection):
+    """Connection whose cursors are ProfilingCursors"""
+
+    def cursor(self, factory=ProfilingCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Script to export a group's semester schedule to an iCalendar or CSV file
+
+Usage:
+    python export_schedule.py "М8О-207БВ-24" --format ics --semester 2025-autumn
+"""
+
+from database.models import Database
+from utils.export import (
+    EXPORT_FORMATS,
+    iter_export,
+    encode_chunks,
+    get_export_filename,
+)
+from utils.schedule_utils import get_semester_key, parse_semester_key
+from datetime import date
+import argparse
+import sys
+
+
+def export_schedule(
+    group_name: str,
+    export_format: str = "ics",
+    semester: str = None,
+    output: str = None,
+    db_path: str = "schedule.db",
+) -> str:
+    """
+    Export a group's semester schedule to a file
+
+    Args:
+        group_name (str): Exact name of the group
+        export_format (str): One of EXPORT_FORMATS
+        semester (str): Semester identifier (default: current semester)
+        output (str): Output path, "-" for stdout (default: generated name)
+        db_path (str): Path to the SQLite database
+
+    Returns:
+        str: Path the export was written to
+    """
+    db = Database(db_path)
+    group_id = db.get_group_id_by_name(group_name)
+    if group_id is None:
+        raise SystemExit(f"✗ Group not found: {group_name}")
+
+    if semester is None:
+        semester = get_semester_key(date.today())
+    semester_start, semester_end = parse_semester_key(semester)
+
+    lessons = db.iter_lessons_for_period(group_id, semester_start, semester_end)
+    chunks = encode_chunks(iter_export(lessons, export_format, group_name))
+
+    if output == "-":
+        for chunk in chunks:
+            sys.stdout.buffer.write(chunk)
+        sys.stdout.buffer.flush()
+        return output
+
+    if output is None:
+        output = get_export_filename(group_name, semester, export_format)
+    with open(output, "wb") as f:
+        for chunk in chunks:
+            f.write(chunk)
+    return output
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("group", help="Exact group name, e.g. М8О-207БВ-24")
+    parser.add_argument(
+        "--format", choices=sorted(EXPORT_FORMATS), default="ics", dest="export_format"
+    )
+    parser.add_argument(
+        "--semester", help="Semester, e.g. 2025-autumn (default: current)"
+    )
+    parser.add_argument("--output", "-o", help='Output file, "-" for stdout')
+    parser.add_argument("--db", default="schedule.db", help="Path to the database")
+    args = parser.parse_args()
+
+    path = export_schedule(
+        args.group, args.export_format, args.semester, args.output, args.db
+    )
+    if path != "-":
+        print(f"✓ Exported schedule to {path}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
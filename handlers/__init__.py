@@ -1 +1,15 @@
-from . import start, schedule, group_selection, group_confirmation
+from . import (
+    start,
+    schedule,
+    group_selection,
+    group_confirmation,
+    export,
+    image,
+    inline,
+    today,
+    reminders,
+    changes,
+    admin,
+    lookup,
+    free_rooms,
+)
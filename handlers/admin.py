@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Admin commands for looking into the running bot
+"""
+
+from aiogram import Router
+from aiogram.types import FSInputFile, Message
+from aiogram.filters import Command, CommandObject
+from database.columnar import ColumnarStore
+from database.interning import location_names, subject_names, teacher_names
+from database.models import Database
+from database.profiler import profiler
+from services.reminders import ReminderService
+from utils.file_cache import FileIdCache
+from utils.sampler import profile_for
+from utils.schedule_utils import week_cache, week_renders
+from utils.stats import live_stats, read_rss_bytes
+from config import ADMIN_IDS, PROFILE_DIR
+from html import escape
+from typing import List, Optional
+import logging
+import time
+
+router = Router()
+logger = logging.getLogger(__name__)
+
+# Telegram message length limit
+MAX_MESSAGE_LENGTH = 4096
+# Query plan characters shown per slow statement
+MAX_PLAN_LENGTH = 1000
+
+# Sampling profiler duration limits in seconds
+DEFAULT_PROFILE_SECONDS = 10
+MAX_PROFILE_SECONDS = 120
+
+
+def is_admin(user_id: int) -> bool:
+    """Check whether a user may run admin commands"""
+    return user_id in ADMIN_IDS
+
+
+def truncate(text: str, limit: int = 120) -> str:
+    """Shorten a line to a limit"""
+    return text if len(text) <= limit else text[: limit - 1] + "…"
+
+
+def join_lines(lines: List[str], max_length: int = MAX_MESSAGE_LENGTH) -> str:
+    """
+    Join lines of an HTML message, dropping whole lines from the end until it fits
+
+    Cutting the joined text instead could split a tag or an entity.
+
+    Args:
+        lines (List[str]): Lines with balanced markup, the first one is kept
+        max_length (int): Length limit of the text
+
+    Returns:
+        str: Joined lines, ending with "…" when some were dropped
+    """
+    text = "\n".join(lines)
+    kept = len(lines)
+    while len(text) > max_length and kept > 1:
+        kept -= 1
+        text = "\n".join(lines[:kept] + ["…"])
+    return text
+
+
+def format_sql_top(limit: int = 10, max_length: int = MAX_MESSAGE_LENGTH) -> str:
+    """Format statements with the largest total time"""
+    lines = [f"<b>SQL: top {limit} by total time</b>"]
+    for name, totals in profiler.top(limit):
+        lines.append(
+            f"{totals['total_ms']:.1f} ms total, {totals['count']}×, "
+            f"max {totals['max_ms']:.1f} ms, {totals['rows']} rows\n"
+            f"<code>{escape(truncate(name))}</code>"
+        )
+    if len(lines) == 1:
+        lines.append("Нет данных.")
+    return join_lines(lines, max_length)
+
+
+def format_sql_slow(limit: int = 10, max_length: int = MAX_MESSAGE_LENGTH) -> str:
+    """Format the latest slow statements with their query plans"""
+    lines = [f"<b>SQL: slow statements (≥ {profiler.slow_ms:g} ms)</b>"]
+    for entry in list(profiler.slow)[-limit:][::-1]:
+        scan = " ⚠️ SCAN" if entry.get("scan") else ""
+        plan = "\n".join(entry["plan"] or [])
+        lines.append(
+            f"{entry['at'].strftime('%H:%M:%S')} {entry['elapsed_ms']:.1f} ms, "
+            f"{entry['rows']} rows{scan}\n"
+            f"<code>{escape(truncate(entry['fingerprint']))}</code>\n"
+            f"<pre>{escape(truncate(plan, MAX_PLAN_LENGTH))}</pre>"
+        )
+    if len(lines) == 1:
+        lines.append("Нет медленных запросов.")
+    return join_lines(lines, max_length)
+
+
+def format_ratio(hits: int, misses: int) -> str:
+    """Format a cache hit ratio with its counts"""
+    total = hits + misses
+    if not total:
+        return "нет обращений"
+    return f"{hits / total:.0%} ({hits}/{total})"
+
+
+def format_stats(
+    file_cache: Optional[FileIdCache] = None,
+    reminders: Optional[ReminderService] = None,
+    top_handlers: int = 5,
+    memory_store: Optional[ColumnarStore] = None,
+    max_length: int = MAX_MESSAGE_LENGTH,
+) -> str:
+    """
+    Format a snapshot of the in-memory counters
+
+    Nothing here touches the database, so /stats stays cheap under load.
+
+    Args:
+        file_cache (Optional[FileIdCache]): Cache of uploaded files
+        reminders (Optional[ReminderService]): Reminder service with the
+            outbound message queue
+        top_handlers (int): Number of busiest handlers to show
+        memory_store (Optional[ColumnarStore]): In-memory store of the
+            semester, if enabled
+        max_length (int): Length limit, whole lines are dropped past it
+
+    Returns:
+        str: HTML text
+    """
+    uptime = int(time.monotonic() - live_stats.started)
+    lines = [
+        "<b>Статистика</b>",
+        f"Аптайм: {uptime // 3600} ч {uptime % 3600 // 60} мин",
+        f"Обновления: {live_stats.updates.rate():.2f}/с "
+        f"(всего {live_stats.updates.total})",
+        f"Запросы к БД: {live_stats.db_queries.rate():.2f}/с "
+        f"(всего {live_stats.db_queries.total})",
+        f"Ошибки обработчиков: {live_stats.handler_errors}",
+    ]
+
+    busiest = sorted(
+        live_stats.handlers.items(), key=lambda item: item[1].count, reverse=True
+    )[:top_handlers]
+    if busiest:
+        lines.append("\n<b>Обработчики (p95)</b>")
+        for name, window in busiest:
+            lines.append(
+                f"<code>{escape(name)}</code>: "
+                f"{window.percentile(0.95) * 1000:.1f} мс, {window.count}×"
+            )
+
+    lines.append("\n<b>Кэши</b>")
+    lines.append(
+        f"Недели: {format_ratio(week_cache.hits, week_cache.misses)}, "
+        f"из хранилища {week_cache.backend_hits}, "
+        f"совмещено рендеров {week_renders.coalesced}"
+    )
+    if file_cache is not None:
+        lines.append(f"Файлы: {format_ratio(file_cache.hits, file_cache.misses)}")
+    if memory_store is not None:
+        usage = memory_store.columns.memory_usage()
+        lines.append(
+            f"Семестр в памяти: {format_ratio(memory_store.hits, memory_store.misses)}, "
+            f"{usage['rows']} занятий, {usage['total'] / 2**20:.1f} МБ"
+        )
+    tables = (subject_names, teacher_names, location_names)
+    lines.append(
+        f"Общие строки: {' / '.join(str(len(table)) for table in tables)} "
+        f"(предметы / преподаватели / аудитории), "
+        f"повторов {sum(table.shared for table in tables)}"
+    )
+
+    lines.append("\n<b>Процесс</b>")
+    if reminders is not None:
+        lines.append(f"Очередь отправки: {reminders.sender.qsize()}")
+    lines.append(
+        f"Задержка цикла событий: {live_stats.loop_lag * 1000:.1f} мс "
+        f"(макс. {live_stats.max_loop_lag * 1000:.1f} мс)"
+    )
+    rss = read_rss_bytes()
+    if rss is not None:
+        lines.append(f"RSS: {rss / 2**20:.1f} МБ")
+    return join_lines(lines, max_length)
+
+
+@router.message(Command("sql"))
+async def sql_profiler_handler(message: Message, command: CommandObject):
+    """Handle the /sql [on|off|reset|top|slow] command"""
+    try:
+        if not is_admin(message.from_user.id):
+            return
+
+        action = (command.args or "top").strip().lower()
+        note = ""
+        if not profiler.enabled and action in ("top", "slow"):
+            note = "\n\nПрофилирование выключено: /sql on"
+        if action == "on":
+            profiler.enabled = True
+            text = "SQL-профилирование включено."
+        elif action == "off":
+            profiler.enabled = False
+            text = "SQL-профилирование выключено."
+        elif action == "reset":
+            profiler.reset()
+            text = "Статистика SQL сброшена."
+        elif action == "slow":
+            text = format_sql_slow(max_length=MAX_MESSAGE_LENGTH - len(note))
+        elif action == "top":
+            text = format_sql_top(max_length=MAX_MESSAGE_LENGTH - len(note))
+        else:
+            text = "Использование: /sql [on|off|reset|top|slow]"
+        await message.answer(text + note)
+    except Exception as e:
+        logger.error(f"Error in sql_profiler_handler: {e}")
+        await message.answer("Sorry, an error occurred. Please try again later.")
+
+
+@router.message(Command("profile"))
+async def profile_handler(message: Message, command: CommandObject):
+    """Handle the /profile [seconds] command"""
+    try:
+        if not is_admin(message.from_user.id):
+            return
+
+        try:
+            seconds = float(command.args or DEFAULT_PROFILE_SECONDS)
+        except ValueError:
+            await message.answer("Использование: /profile [секунды]")
+            return
+        seconds = min(max(seconds, 1), MAX_PROFILE_SECONDS)
+
+        await message.answer(f"Профилирование {seconds:g} с…")
+        try:
+            path = await profile_for(seconds, PROFILE_DIR)
+        except RuntimeError:
+            await message.answer("Профилирование уже запущено.")
+            return
+        await message.answer_document(
+            FSInputFile(path), caption="Collapsed stacks (flamegraph.pl, speedscope)"
+        )
+    except Exception as e:
+        logger.error(f"Error in profile_handler: {e}")
+        await message.answer("Sorry, an error occurred. Please try again later.")
+
+
+@router.message(Command("stats"))
+async def stats_handler(
+    message: Message,
+    file_cache: Optional[FileIdCache] = None,
+    reminders: Optional[ReminderService] = None,
+    db: Optional[Database] = None,
+):
+    """Handle the /stats command"""
+    try:
+        if not is_admin(message.from_user.id):
+            return
+
+        await message.answer(
+            format_stats(
+                file_cache, reminders, memory_store=db.memory_store if db else None
+            )
+        )
+    except Exception as e:
+        logger.error(f"Error in stats_handler: {e}")
+        await message.answer("Sorry, an error occurred. Please try again later.")
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Handler for subscribing to schedule change notifications
+"""
+
+from aiogram import Router
+from aiogram.types import Message
+from aiogram.filters import Command, CommandObject
+from utils.schedule_utils import (
+    get_user_group_or_default_async,
+    set_user_group_async,
+)
+from database.models import Database
+import logging
+
+router = Router()
+logger = logging.getLogger(__name__)
+
+
+@router.message(Command("changes"))
+async def changes_handler(message: Message, command: CommandObject, db: Database):
+    """Handle the /changes [on|off] command"""
+    try:
+        args = (command.args or "on").strip().lower()
+        user_id = message.from_user.id
+
+        if args in ("off", "stop", "выкл"):
+            if db.delete_change_subscription(user_id):
+                await message.answer("Уведомления об изменениях отключены.")
+            else:
+                await message.answer("Уведомления об изменениях не были включены.")
+            return
+
+        # Notifications follow the user's group, so make sure one is saved
+        group_id, group_name = await get_user_group_or_default_async(user_id, db)
+        await set_user_group_async(user_id, group_id, db)
+        db.set_change_subscription(user_id, message.chat.id)
+
+        await message.answer(
+            f"Уведомления об изменениях в расписании группы <b>{group_name}</b> "
+            "включены.\nОтключить: /changes off"
+        )
+    except Exception as e:
+        logger.error(f"Error in changes_handler: {e}")
+        await message.answer("Sorry, an error occurred. Please try again later.")
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Handler for exporting a group's semester schedule as a calendar file
+"""
+
+from aiogram import Router
+from aiogram.types import Message
+from aiogram.filters import Command, CommandObject
+from utils.export import (
+    EXPORT_FORMATS,
+    iter_export,
+    encode_chunks,
+    get_export_filename,
+)
+from utils.file_cache import FileIdCache
+from utils.schedule_utils import get_semester_bounds, get_semester_key
+from handlers.group_selection import search_matching_groups
+from database.models import Database
+from config import DEFAULT_GROUP
+from datetime import date
+from typing import Iterator, Optional, Tuple
+import asyncio
+import logging
+
+router = Router()
+logger = logging.getLogger(__name__)
+
+
+def parse_export_args(args: Optional[str]) -> Tuple[str, str]:
+    """
+    Parse "/export [ics|csv] [group name]" arguments
+
+    Args:
+        args (Optional[str]): Text after the command
+
+    Returns:
+        Tuple[str, str]: Export format and group name
+    """
+    export_format = "ics"
+    group_name = DEFAULT_GROUP
+
+    parts = (args or "").split(maxsplit=1)
+    if parts and parts[0].lower().lstrip(".") in EXPORT_FORMATS:
+        export_format = parts.pop(0).lower().lstrip(".")
+    if parts:
+        group_name = parts[0].strip()
+
+    return export_format, group_name
+
+
+@router.message(Command("export"))
+async def export_handler(
+    message: Message, command: CommandObject, db: Database, file_cache: FileIdCache
+):
+    """Handle the /export command"""
+    try:
+        export_format, requested_group = parse_export_args(command.args)
+
+        matching_groups = await asyncio.to_thread(
+            search_matching_groups, requested_group, db
+        )
+        if not matching_groups:
+            await message.answer(
+                "Группа не найдена. Пожалуйста, проверьте название и попробуйте снова."
+            )
+            return
+        group_id = matching_groups[0]["id"]
+        group_name = matching_groups[0]["name"]
+
+        semester_start, semester_end = get_semester_bounds(date.today())
+        semester = get_semester_key(semester_start)
+        version = await asyncio.to_thread(
+            db.get_period_version, group_id, semester_start, semester_end
+        )
+
+        def chunks_factory() -> Iterator[bytes]:
+            lessons = db.iter_lessons_for_period(group_id, semester_start, semester_end)
+            return encode_chunks(iter_export(lessons, export_format, group_name))
+
+        await file_cache.send(
+            message.answer_document,
+            cache_key=f"export:{group_id}:{semester}:{version}:{export_format}",
+            chunks_factory=chunks_factory,
+            filename=get_export_filename(group_name, semester, export_format),
+            group_id=group_id,
+        )
+    except Exception as e:
+        logger.error(f"Error in export_handler: {e}")
+        await message.answer("Sorry, an error occurred. Please try again later.")
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Handler for the /free command
+"""
+
+from aiogram import Router
+from aiogram.types import Message
+from aiogram.filters import Command, CommandObject
+from utils.lookup_index import normalize_room
+from utils.room_index import get_free_room_index
+from config import FREE_ROOM_MINUTES, FREE_ROOMS_SHOWN
+from database.models import Database
+from datetime import datetime, time, timedelta
+from html import escape
+from typing import List, Optional, Tuple
+import asyncio
+import logging
+import re
+
+router = Router()
+logger = logging.getLogger(__name__)
+
+TIME_RANGE = re.compile(r"^(\d{1,2})[:.](\d{2})(?:[-–](\d{1,2})[:.](\d{2}))?$")
+
+
+def parse_free_query(
+    args: Optional[str], now: datetime
+) -> Tuple[datetime, datetime, str]:
+    """
+    Parse the arguments of /free
+
+    "/free" checks the next FREE_ROOM_MINUTES minutes, "/free 13:00" the same
+    length from 13:00 today, "/free 13:00-14:30" that range; any other words
+    filter rooms, e.g. "/free 13:00 ГУК".
+
+    Args:
+        args (Optional[str]): Command arguments
+        now (datetime): Current time
+
+    Returns:
+        Tuple[datetime, datetime, str]: Start and end of the range and the room
+        filter (empty for all rooms)
+
+    Raises:
+        ValueError: When a time is invalid or the range is empty
+    """
+    start = now.replace(second=0, microsecond=0)
+    end = start + timedelta(minutes=FREE_ROOM_MINUTES)
+    words = []
+    for word in (args or "").split():
+        match = TIME_RANGE.match(word)
+        if not match:
+            words.append(word)
+            continue
+        start = datetime.combine(now.date(), time(int(match[1]), int(match[2])))
+        if match[3]:
+            end = datetime.combine(now.date(), time(int(match[3]), int(match[4])))
+        else:
+            end = start + timedelta(minutes=FREE_ROOM_MINUTES)
+    if end <= start:
+        raise ValueError("Empty time range")
+    return start, end, " ".join(words)
+
+
+def format_free_rooms_message(
+    rooms: List[Tuple[str, Optional[datetime]]],
+    start: datetime,
+    end: datetime,
+    shown: int = FREE_ROOMS_SHOWN,
+) -> str:
+    """
+    Format free rooms with the time they stay free until
+
+    Args:
+        rooms (List[Tuple[str, Optional[datetime]]]): Rooms and the start of
+            their next lesson
+        start (datetime): Start of the range
+        end (datetime): End of the range
+        shown (int): Rooms listed, the rest are counted
+
+    Returns:
+        str: Formatted message
+    """
+    message = (
+        f"<blockquote><b>Свободные аудитории ~ {start.strftime('%d.%m')} "
+        f"{start.strftime('%H:%M')}-{end.strftime('%H:%M')}</b></blockquote>\n"
+    )
+    if not rooms:
+        return message + "<blockquote>Свободных аудиторий нет</blockquote>"
+
+    lines = []
+    for location, next_start in rooms[:shown]:
+        if next_start is not None and next_start.date() == start.date():
+            lines.append(f"{escape(location)} — до {next_start.strftime('%H:%M')}")
+        else:
+            lines.append(f"{escape(location)} — до конца дня")
+    if len(rooms) > shown:
+        lines.append(f"и ещё {len(rooms) - shown}")
+    return message + "<blockquote>" + "\n".join(lines) + "</blockquote>"
+
+
+@router.message(Command("free"))
+async def free_rooms_handler(message: Message, command: CommandObject, db: Database):
+    """Handle the /free command"""
+    try:
+        try:
+            start, end, room_filter = parse_free_query(command.args, datetime.now())
+        except ValueError:
+            await message.answer(
+                "Укажите время, например: <code>/free 13:00</code> или "
+                "<code>/free 13:00-14:30 ГУК</code>"
+            )
+            return
+
+        # The first query of a semester loads the index, keep it off the loop
+        rooms = await asyncio.to_thread(get_free_room_index(db).free_rooms, start, end)
+        if room_filter:
+            normalized_filter = normalize_room(room_filter)
+            rooms = [
+                room for room in rooms if normalized_filter in normalize_room(room[0])
+            ]
+        await message.answer(format_free_rooms_message(rooms, start, end))
+    except Exception as e:
+        logger.error(f"Error in free_rooms_handler: {e}")
+        await message.answer("Sorry, an error occurred. Please try again later.")
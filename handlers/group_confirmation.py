@@ -6,11 +6,10 @@ Handler for group confirmation callbacks
 from aiogram import Router, F
 from aiogram.types import CallbackQuery
 from keyboards.navigation import get_week_navigation_keyboard
-from utils.schedule_utils import get_current_week_schedule
+from utils.schedule_utils import get_week_schedule_async, set_user_group_async
 from database.models import Database
 import json
 import logging
-import sqlite3
 
 router = Router()
 logger = logging.getLogger(__name__)
@@ -33,7 +32,7 @@ async def group_confirmation_handler(callback: CallbackQuery, db: Database):
             return
 
         # Get group name from database
-        connection = sqlite3.connect(db.db_path)
+        connection = db.connect()
         cursor = connection.cursor()
         cursor.execute("SELECT name FROM groups WHERE id = ?", (group_id,))
         result = cursor.fetchone()
@@ -46,8 +45,13 @@ async def group_confirmation_handler(callback: CallbackQuery, db: Database):
         group_name = result[0]
 
         if action == "confirm_group":
+            # Remember the group for commands like /today and /next
+            await set_user_group_async(callback.from_user.id, group_id, db)
+
             # User confirmed the group, show the schedule
-            schedule_message = get_current_week_schedule(group_id, db, group_name)
+            schedule_message = await get_week_schedule_async(
+                group_id, db, 0, group_name
+            )
 
             # Edit the message to remove the confirmation and show schedule
             await callback.message.edit_text(
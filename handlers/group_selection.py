@@ -8,10 +8,9 @@ from aiogram.types import Message, CallbackQuery
 from aiogram.filters import Command
 from keyboards.group_selection import get_group_confirmation_keyboard
 from utils.schedule_utils import get_current_week_schedule
+from utils.group_index import get_group_index
 from database.models import Database
 import logging
-import re
-import sqlite3
 
 router = Router()
 logger = logging.getLogger(__name__)
@@ -79,61 +78,7 @@ def search_matching_groups(user_input: str, db: Database):
         list: List of matching groups
     """
     try:
-        # Get all groups from database
-        connection = sqlite3.connect(db.db_path)
-        cursor = connection.cursor()
-        cursor.execute("SELECT id, name, faculty FROM groups")
-        all_groups = cursor.fetchall()
-        connection.close()
-
-        # Normalize user input (remove spaces and hyphens)
-        normalized_input = re.sub(r"[\s\-]+", "", user_input.lower())
-
-        matching_groups = []
-
-        for group in all_groups:
-            group_id, group_name, faculty = group
-            # Normalize group name (remove spaces and hyphens)
-            normalized_group_name = re.sub(r"[\s\-]+", "", group_name.lower())
-
-            # Check for exact match
-            if group_name.lower() == user_input.lower():
-                matching_groups.append(
-                    {
-                        "id": group_id,
-                        "name": group_name,
-                        "faculty": faculty,
-                        "match_type": "exact",
-                    }
-                )
-                # If exact match, prioritize it
-                if len(matching_groups) > 1:
-                    matching_groups.insert(0, matching_groups.pop())
-                continue
-
-            # Check for partial match (user input contains group name)
-            if normalized_input in normalized_group_name:
-                matching_groups.append(
-                    {
-                        "id": group_id,
-                        "name": group_name,
-                        "faculty": faculty,
-                        "match_type": "partial_contains",
-                    }
-                )
-
-            # Check for partial match (group name contains user input)
-            if normalized_group_name in normalized_input:
-                matching_groups.append(
-                    {
-                        "id": group_id,
-                        "name": group_name,
-                        "faculty": faculty,
-                        "match_type": "group_contains",
-                    }
-                )
-
-        return matching_groups
+        return get_group_index(db).search(user_input)
     except Exception as e:
         logger.error(f"Error in search_matching_groups: {e}")
         return []
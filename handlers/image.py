@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Handler for sending the week schedule as a picture
+"""
+
+from aiogram import Router
+from aiogram.types import Message
+from aiogram.filters import Command, CommandObject
+from utils.file_cache import FileIdCache, get_photo_file_id
+from utils.schedule_image import (
+    THEMES,
+    DEFAULT_THEME,
+    is_image_rendering_available,
+    render_week_png_async,
+)
+from utils.schedule_utils import get_current_week_start
+from database.models import Database
+from config import DEFAULT_GROUP
+import logging
+
+router = Router()
+logger = logging.getLogger(__name__)
+
+
+@router.message(Command("image"))
+async def image_handler(
+    message: Message, command: CommandObject, db: Database, file_cache: FileIdCache
+):
+    """Handle the /image command"""
+    try:
+        if not is_image_rendering_available():
+            await message.answer("Расписание в виде картинки сейчас недоступно.")
+            return
+
+        theme = (command.args or DEFAULT_THEME).strip().lower()
+        if theme not in THEMES:
+            await message.answer(f"Доступные темы: {', '.join(THEMES)}")
+            return
+
+        group_id = db.get_or_create_group(DEFAULT_GROUP, "Computer Science")
+        week_start = get_current_week_start()
+        version = db.get_week_version(group_id, week_start)
+        content_hash = version[1] if version else "empty"
+        cache_key = f"png:{group_id}:{week_start}:{theme}:{content_hash}"
+        filename = f"{DEFAULT_GROUP}_{week_start}.png"
+
+        # Only render when there is no earlier upload to re-send
+        if await file_cache.send_if_cached(message.answer_photo, cache_key):
+            return
+
+        lessons = db.get_schedule_for_week(group_id, week_start)
+        png = await render_week_png_async(lessons, week_start, DEFAULT_GROUP, theme)
+        await file_cache.send(
+            message.answer_photo,
+            cache_key=cache_key,
+            chunks_factory=lambda: iter([png]),
+            filename=filename,
+            group_id=group_id,
+            get_file_id=get_photo_file_id,
+        )
+    except Exception as e:
+        logger.error(f"Error in image_handler: {e}")
+        await message.answer("Sorry, an error occurred. Please try again later.")
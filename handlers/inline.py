@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Handler for inline queries (@bot <group name>)
+"""
+
+from aiogram import Router
+from aiogram.enums import ParseMode
+from aiogram.types import (
+    InlineQuery,
+    InlineQueryResultArticle,
+    InputTextMessageContent,
+)
+from utils.group_index import get_group_index
+from utils.schedule_utils import get_week_schedule, get_week_start_with_offset
+from database.models import Database
+from config import DEFAULT_GROUP
+from typing import List
+import asyncio
+import logging
+import time
+
+router = Router()
+logger = logging.getLogger(__name__)
+
+# How long Telegram may cache the answer to the same query (seconds)
+INLINE_CACHE_TIME = 300
+# Groups offered for an ambiguous query
+INLINE_MAX_GROUPS = 5
+# Server-side latency budget, slower answers are logged
+INLINE_LATENCY_TARGET_MS = 50
+
+WEEK_TITLES = {0: "Текущая неделя", 1: "Следующая неделя"}
+
+
+def build_inline_results(query: str, db: Database) -> List[InlineQueryResultArticle]:
+    """
+    Build inline results with the current and next week of matching groups
+
+    Args:
+        query (str): Inline query text
+        db (Database): Database instance
+
+    Returns:
+        List[InlineQueryResultArticle]: Inline results
+    """
+    matches = get_group_index(db).search(query.strip() or DEFAULT_GROUP)
+
+    results = []
+    seen_groups = set()
+    for match in matches:
+        if match["id"] in seen_groups:
+            continue
+        seen_groups.add(match["id"])
+        if len(seen_groups) > INLINE_MAX_GROUPS:
+            break
+
+        for week_offset, title in WEEK_TITLES.items():
+            week_start = get_week_start_with_offset(week_offset)
+            message = get_week_schedule(match["id"], db, week_offset, match["name"])
+            results.append(
+                InlineQueryResultArticle(
+                    id=f"{match['id']}:{week_start.isoformat()}",
+                    title=f"{match['name']} — {title}",
+                    description=f"с {week_start.strftime('%d.%m')}",
+                    input_message_content=InputTextMessageContent(
+                        message_text=message, parse_mode=ParseMode.HTML
+                    ),
+                )
+            )
+
+    return results
+
+
+@router.inline_query()
+async def inline_schedule_handler(inline_query: InlineQuery, db: Database):
+    """Handle inline schedule queries"""
+    try:
+        started = time.perf_counter()
+        # Week renders may read the storage backend, keep them off the loop
+        results = await asyncio.to_thread(build_inline_results, inline_query.query, db)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if elapsed_ms > INLINE_LATENCY_TARGET_MS:
+            logger.warning(
+                f"Slow inline query {inline_query.query!r}: {elapsed_ms:.1f} ms"
+            )
+
+        await inline_query.answer(
+            results, cache_time=INLINE_CACHE_TIME, is_personal=False
+        )
+    except Exception as e:
+        logger.error(f"Error in inline_schedule_handler: {e}")
+        await inline_query.answer([], cache_time=0)
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Handlers for the /teacher and /room week views
+"""
+
+from aiogram import Router, F
+from aiogram.types import CallbackQuery, Message
+from aiogram.filters import Command, CommandObject
+from keyboards.navigation import (
+    get_lookup_choice_keyboard,
+    get_lookup_navigation_keyboard,
+)
+from utils.lookup_index import get_room_index, get_teacher_index
+from utils.schedule_utils import (
+    format_schedule_message,
+    get_week_start_with_offset,
+    merge_lesson_groups,
+)
+from database.models import Database
+from html import escape
+from typing import List, Optional, Tuple
+import asyncio
+import logging
+
+router = Router()
+logger = logging.getLogger(__name__)
+
+# Matches offered as buttons when a search is ambiguous
+MAX_CHOICES = 10
+
+
+async def render_teacher_week(db: Database, teacher_id: int, offset: int) -> str:
+    """Render the week of a teacher, with the groups of every lesson"""
+    week_start = get_week_start_with_offset(offset)
+
+    def load() -> Tuple[List[dict], Optional[str]]:
+        return (
+            db.get_teacher_schedule_for_week(teacher_id, week_start),
+            db.get_teacher_name(teacher_id),
+        )
+
+    lessons, name = await asyncio.to_thread(load)
+    name = name or "Преподаватель"
+    return format_schedule_message(
+        merge_lesson_groups(lessons), week_start, offset, name, "group_name"
+    )
+
+
+async def render_room_week(db: Database, location: str, offset: int) -> str:
+    """Render the week of a room, with the groups of every lesson"""
+    week_start = get_week_start_with_offset(offset)
+    lessons = await asyncio.to_thread(
+        db.get_room_schedule_for_week, location, week_start
+    )
+    return format_schedule_message(
+        merge_lesson_groups(lessons), week_start, offset, location, "group_name"
+    )
+
+
+def _pick_single(matches: list) -> Optional[dict]:
+    if len(matches) == 1 or (matches and matches[0]["match_type"] == "exact"):
+        return matches[0]
+    return None
+
+
+@router.message(Command("teacher"))
+async def teacher_handler(message: Message, command: CommandObject, db: Database):
+    """Handle the /teacher command"""
+    try:
+        query = (command.args or "").strip()
+        if not query:
+            await message.answer(
+                "Укажите преподавателя, например: <code>/teacher Иванов</code>"
+            )
+            return
+
+        # A stale index reloads from the database, keep that off the loop
+        matches = await asyncio.to_thread(get_teacher_index(db).search, query)
+        if not matches:
+            await message.answer(
+                f"Преподаватель «{escape(query)}» не найден. "
+                "Попробуйте ввести только фамилию."
+            )
+            return
+
+        match = _pick_single(matches)
+        if match is None:
+            choices = [(m["name"], m["id"]) for m in matches[:MAX_CHOICES]]
+            await message.answer(
+                "Найдено несколько преподавателей, выберите одного:",
+                reply_markup=get_lookup_choice_keyboard("t", choices),
+            )
+            return
+
+        await message.answer(
+            await render_teacher_week(db, match["id"], 0),
+            reply_markup=get_lookup_navigation_keyboard("t", match["id"]),
+        )
+    except Exception as e:
+        logger.error(f"Error in teacher_handler: {e}")
+        await message.answer("Sorry, an error occurred. Please try again later.")
+
+
+@router.message(Command("room"))
+async def room_handler(message: Message, command: CommandObject, db: Database):
+    """Handle the /room command"""
+    try:
+        query = (command.args or "").strip()
+        if not query:
+            await message.answer("Укажите аудиторию, например: <code>/room 307</code>")
+            return
+
+        matches = await asyncio.to_thread(get_room_index(db).search, query)
+        if not matches:
+            await message.answer(f"Аудитория «{escape(query)}» не найдена.")
+            return
+
+        match = _pick_single(matches)
+        if match is None:
+            choices = [(m["location"], m["location"]) for m in matches[:MAX_CHOICES]]
+            await message.answer(
+                "Найдено несколько аудиторий, выберите одну:",
+                reply_markup=get_lookup_choice_keyboard("r", choices),
+            )
+            return
+
+        await message.answer(
+            await render_room_week(db, match["location"], 0),
+            reply_markup=get_lookup_navigation_keyboard("r", match["location"]),
+        )
+    except Exception as e:
+        logger.error(f"Error in room_handler: {e}")
+        await message.answer("Sorry, an error occurred. Please try again later.")
+
+
+@router.callback_query(F.data.startswith("lk_"))
+async def lookup_navigation_handler(callback: CallbackQuery, db: Database):
+    """Handle teacher and room week navigation and choice callbacks"""
+    try:
+        # Format: lk_<t|r>:offset:<teacher id|room>
+        parts = callback.data.split(":", 2)
+        if len(parts) != 3 or parts[0] not in ("lk_t", "lk_r"):
+            await callback.answer("Invalid callback data", show_alert=True)
+            return
+
+        kind = parts[0][3:]
+        offset = int(parts[1])
+        if kind == "t":
+            key = int(parts[2])
+            schedule_message = await render_teacher_week(db, key, offset)
+        else:
+            key = parts[2]
+            schedule_message = await render_room_week(db, key, offset)
+
+        if callback.message.html_text != schedule_message:
+            await callback.message.edit_text(
+                schedule_message,
+                reply_markup=get_lookup_navigation_keyboard(kind, key, offset),
+            )
+        await callback.answer()
+    except Exception as e:
+        logger.error(f"Error in lookup_navigation_handler: {e}")
+        await callback.answer(
+            "Sorry, an error occurred while fetching the schedule. Please try again later.",
+            show_alert=True,
+        )
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Handler for subscribing to lesson reminders
+"""
+
+from aiogram import Router
+from aiogram.types import Message
+from aiogram.filters import Command, CommandObject
+from services.reminders import (
+    ReminderService,
+    MIN_MINUTES_BEFORE,
+    MAX_MINUTES_BEFORE,
+    DEFAULT_MINUTES_BEFORE,
+)
+from utils.schedule_utils import (
+    get_user_group_or_default_async,
+    set_user_group_async,
+)
+from database.models import Database
+import logging
+
+router = Router()
+logger = logging.getLogger(__name__)
+
+
+@router.message(Command("remind"))
+async def remind_handler(
+    message: Message, command: CommandObject, db: Database, reminders: ReminderService
+):
+    """Handle the /remind [minutes|off] command"""
+    try:
+        args = (command.args or "").strip().lower()
+        user_id = message.from_user.id
+
+        if args in ("off", "stop", "выкл"):
+            if db.delete_reminder(user_id):
+                reminders.scheduler.invalidate()
+                await message.answer("Напоминания отключены.")
+            else:
+                await message.answer("Напоминания не были включены.")
+            return
+
+        minutes_before = int(args) if args else DEFAULT_MINUTES_BEFORE
+        if not MIN_MINUTES_BEFORE <= minutes_before <= MAX_MINUTES_BEFORE:
+            raise ValueError(minutes_before)
+
+        # Reminders follow the user's group, so make sure one is saved
+        group_id, group_name = await get_user_group_or_default_async(user_id, db)
+        await set_user_group_async(user_id, group_id, db)
+        db.set_reminder(user_id, message.chat.id, minutes_before)
+        reminders.scheduler.invalidate()
+
+        await message.answer(
+            f"Напоминания включены: за {minutes_before} мин. до каждого занятия "
+            f"группы <b>{group_name}</b>.\nОтключить: /remind off"
+        )
+    except ValueError:
+        await message.answer(
+            f"Укажите число минут от {MIN_MINUTES_BEFORE} до {MAX_MINUTES_BEFORE}, "
+            "например: /remind 15"
+        )
+    except Exception as e:
+        logger.error(f"Error in remind_handler: {e}")
+        await message.answer("Sorry, an error occurred. Please try again later.")
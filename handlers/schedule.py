@@ -1,7 +1,7 @@
 from aiogram import Router, F
 from aiogram.types import CallbackQuery
 from keyboards.navigation import get_week_navigation_keyboard
-from utils.schedule_utils import get_week_schedule, format_schedule_message
+from utils.schedule_utils import get_week_schedule_async, format_schedule_message
 from database.models import Database
 from config import DEFAULT_GROUP
 import json
@@ -30,13 +30,17 @@ async def schedule_navigation_handler(callback: CallbackQuery, db: Database):
         group_id = db.get_or_create_group(DEFAULT_GROUP, "Computer Science")
 
         # Get schedule based on action
-        schedule_message = get_week_schedule(group_id, db, offset, "М8О-207БВ-24")
-
-        # Edit the message with the new schedule
-        await callback.message.edit_text(
-            schedule_message, reply_markup=get_week_navigation_keyboard(offset)
+        schedule_message = await get_week_schedule_async(
+            group_id, db, offset, "М8О-207БВ-24"
         )
 
+        # Skip the edit when the same week is shown and it has not changed
+        # (rendered weeks are cached by week version, so this costs no render)
+        if offset != current_offset or callback.message.html_text != schedule_message:
+            await callback.message.edit_text(
+                schedule_message, reply_markup=get_week_navigation_keyboard(offset)
+            )
+
         # Answer the callback query to remove the loading indicator
         await callback.answer()
     except Exception as e:
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Handlers for the /today and /next commands
+"""
+
+from aiogram import Router
+from aiogram.types import Message
+from aiogram.filters import Command
+from utils.time_index import get_time_index
+from utils.schedule_utils import (
+    format_day_message,
+    format_next_lesson_message,
+    get_user_group_or_default_async,
+)
+from database.models import Database
+from datetime import datetime
+import asyncio
+import logging
+
+router = Router()
+logger = logging.getLogger(__name__)
+
+
+@router.message(Command("today"))
+async def today_handler(message: Message, db: Database):
+    """Handle the /today command"""
+    try:
+        group_id, group_name = await get_user_group_or_default_async(
+            message.from_user.id, db
+        )
+        today = datetime.now().date()
+        # A cold or stale timeline loads the whole semester
+        lessons = await asyncio.to_thread(
+            get_time_index(db).lessons_on, group_id, today
+        )
+        await message.answer(format_day_message(lessons, today, group_name))
+    except Exception as e:
+        logger.error(f"Error in today_handler: {e}")
+        await message.answer("Sorry, an error occurred. Please try again later.")
+
+
+@router.message(Command("next"))
+async def next_lesson_handler(message: Message, db: Database):
+    """Handle the /next command"""
+    try:
+        group_id, group_name = await get_user_group_or_default_async(
+            message.from_user.id, db
+        )
+        now = datetime.now()
+        current, upcoming = await asyncio.to_thread(
+            get_time_index(db).current_and_next, group_id, now
+        )
+        await message.answer(
+            format_next_lesson_message(current, upcoming, now, group_name)
+        )
+    except Exception as e:
+        logger.error(f"Error in next_lesson_handler: {e}")
+        await message.answer("Sorry, an error occurred. Please try again later.")
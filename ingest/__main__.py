@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Load timetable exports into the database
+
+    python -m ingest semester.csv [more files...] [--db schedule.db]
+"""
+
+from database.models import Database
+from ingest.loader import DEFAULT_BATCH_SIZE, Ingester
+from ingest.readers import FORMATS, read_rows
+import argparse
+import logging
+import sys
+
+
+def print_progress(report: dict):
+    """Print a progress line over the previous one"""
+    print(
+        f"\r{report['rows']:,} rows, {report['lessons']:,} lessons written, "
+        f"{report['rate']:,.0f} rows/s",
+        end="",
+        file=sys.stderr,
+        flush=True,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load timetable exports")
+    parser.add_argument("paths", nargs="+", help="JSON, JSON Lines, CSV or XLSX files")
+    parser.add_argument("--db", default="schedule.db", help="Database file")
+    parser.add_argument("--format", choices=FORMATS, help="Format of all files")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument(
+        "--workers", type=int, default=1, help="Parser processes (1: no pool)"
+    )
+    parser.add_argument("--faculty", default="", help="Faculty of new groups")
+    parser.add_argument(
+        "--replace",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Replace every imported week as a whole (--no-replace only adds)",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    ingester = Ingester(
+        Database(args.db),
+        batch_size=args.batch_size,
+        default_faculty=args.faculty,
+        progress=print_progress,
+        replace=args.replace,
+    )
+    for path in args.paths:
+        report = ingester.ingest(read_rows(path, args.format), workers=args.workers)
+        print_progress(report)
+        print(file=sys.stderr)
+    print(
+        f"{report['rows']:,} rows: {report['lessons']:,} lessons written in "
+        f"{report['batches']} batches, {report['skipped']} skipped, "
+        f"{report['groups']} groups, {report['subjects']} subjects and "
+        f"{report['teachers']} teachers created in {report['elapsed']:.1f} s "
+        f"({report['rate']:,.0f} rows/s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Loading of lesson records into the database in batched transactions
+"""
+
+from database.models import Database
+from ingest.parallel import DEFAULT_CHUNK_SIZE, parse_parallel
+from ingest.records import LessonRecord, name_key, parse_row
+from collections import defaultdict
+from datetime import date
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Lessons written per transaction
+DEFAULT_BATCH_SIZE = 5000
+# Rows between progress reports
+PROGRESS_EVERY = 10000
+# Invalid rows logged in full, the rest are only counted
+LOGGED_ERRORS = 10
+
+
+class DedupMap:
+    """
+    Ids of groups, subjects or teachers by normalized name
+
+    Existing rows are loaded once, so every name costs one dictionary lookup
+    and only names never seen before reach the database.
+    """
+
+    def __init__(
+        self, create: Callable[..., int], rows: Iterable[Tuple[int, str]] = ()
+    ):
+        self.create = create
+        self.created = 0
+        self._ids: Dict[str, int] = {}
+        for row_id, name in rows:
+            self._ids.setdefault(name_key(name), row_id)
+
+    def get_id(self, name: str, *extra) -> int:
+        """Get the id of a name, creating the row on first sight"""
+        key = name_key(name)
+        row_id = self._ids.get(key)
+        if row_id is None:
+            row_id = self._ids[key] = self.create(name, *extra)
+            self.created += 1
+        return row_id
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+
+class Ingester:
+    """
+    Writes lesson records through dedup maps and batched transactions
+
+    By default every week met in the input is replaced as a whole (see
+    Database.replace_weeks), so lessons moved or cancelled since the last
+    import disappear. Batches are only cut between weeks: when a batch is
+    full, every buffered week except the one still being read is written.
+    A week met again later in the run (unsorted input, another file) is
+    merged into what this run already wrote instead of replacing it. With
+    replace=False lessons are only added or updated.
+    """
+
+    def __init__(
+        self,
+        db: Database,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        default_faculty: str = "",
+        progress: Optional[Callable[[dict], None]] = None,
+        progress_every: int = PROGRESS_EVERY,
+        replace: bool = True,
+    ):
+        self.db = db
+        self.batch_size = batch_size
+        self.replace = replace
+        self.default_faculty = default_faculty
+        self.progress = progress
+        self.progress_every = progress_every
+        self.groups = DedupMap(
+            db.add_group, ((row[0], row[1]) for row in db.get_all_groups())
+        )
+        self.subjects = DedupMap(
+            self._add_subject, ((row[0], row[1]) for row in db.get_all_subjects())
+        )
+        self.teachers = DedupMap(
+            db.add_teacher, ((row[0], row[1]) for row in db.get_all_teachers())
+        )
+        self._batch: Dict[Tuple[int, date], List[tuple]] = defaultdict(list)
+        self._pending = 0
+        # Week being read, kept back from a flush so it is not split
+        self._open: Optional[Tuple[int, date]] = None
+        # Weeks written by this run, later parts of them are merged
+        self._replaced: Set[Tuple[int, date]] = set()
+        self._started = time.perf_counter()
+        self.report = {
+            "rows": 0,
+            "lessons": 0,
+            "skipped": 0,
+            "batches": 0,
+            "elapsed": 0.0,
+            "rate": 0.0,
+        }
+
+    def _add_subject(self, name: str, code: Optional[str]) -> int:
+        # subjects.code is unique, the name stands in for a missing code
+        return self.db.add_subject(name, code or name)
+
+    def add(self, record: LessonRecord):
+        """Queue a lesson, writing the finished weeks once the batch is full"""
+        group_id = self.groups.get_id(record.group, record.faculty)
+        subject_id = self.subjects.get_id(record.subject, record.subject_code)
+        teacher_id = self.teachers.get_id(record.teacher, record.department)
+        self._open = (group_id, record.week_start)
+        self._batch[self._open].append(
+            (
+                subject_id,
+                teacher_id,
+                record.start_time,
+                record.end_time,
+                record.location,
+                record.start_time.weekday(),
+            )
+        )
+        self._pending += 1
+        if self._pending >= self.batch_size:
+            self.flush(keep_open=True)
+
+    def flush(self, keep_open: bool = False):
+        """
+        Write queued weeks in one transaction
+
+        Args:
+            keep_open (bool): Keep the week being read queued, so a week is
+                never split by the batch size
+        """
+        if not self._pending or keep_open and len(self._batch) == 1:
+            return
+        batch = self._batch
+        self._batch = defaultdict(list)
+        self._pending = 0
+        if keep_open:
+            self._batch[self._open] = batch.pop(self._open)
+            self._pending = len(self._batch[self._open])
+        if not self.replace:
+            self.report["lessons"] += self.db.add_lessons_by_week(batch)
+            self.report["batches"] += 1
+            return
+
+        merged = {key: batch.pop(key) for key in list(batch) if key in self._replaced}
+        changed = self.db.replace_weeks(batch)
+        self.report["lessons"] += sum(len(batch[key]) for key in changed)
+        self._replaced.update(batch)
+        if merged:
+            self.report["lessons"] += self.db.add_lessons_by_week(merged)
+        self.report["batches"] += 1
+
+    def _update_timing(self):
+        elapsed = time.perf_counter() - self._started
+        self.report["elapsed"] = elapsed
+        self.report["rate"] = self.report["rows"] / elapsed if elapsed else 0.0
+
+    def _skip(self, error):
+        self.report["skipped"] += 1
+        if self.report["skipped"] <= LOGGED_ERRORS:
+            logger.warning(f"Skipping row: {error}")
+
+    def _report_progress(self, previous_rows: int):
+        if (
+            self.progress
+            and self.report["rows"] // self.progress_every
+            > previous_rows // self.progress_every
+        ):
+            self._update_timing()
+            self.progress(self.report)
+
+    def ingest(
+        self,
+        rows: Iterable[dict],
+        workers: int = 1,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> dict:
+        """
+        Parse and write export rows
+
+        With more than one worker, rows are parsed in a process pool (see
+        ingest.parallel.parse_parallel) while this process stays the only
+        writer.
+
+        Args:
+            rows (Iterable[dict]): Rows of an export (see ingest.readers)
+            workers (int): Parser processes, 1 parses in this process
+            chunk_size (int): Rows per chunk sent to a parser process
+
+        Returns:
+            dict: rows, lessons (written), skipped (invalid rows), batches,
+            groups/subjects/teachers (created), elapsed (seconds) and rate
+            (rows per second)
+        """
+        if workers > 1:
+            for records, errors in parse_parallel(
+                rows, workers, chunk_size, self.default_faculty
+            ):
+                previous_rows = self.report["rows"]
+                self.report["rows"] += len(records) + len(errors)
+                for error in errors:
+                    self._skip(error)
+                for record in records:
+                    self.add(record)
+                self._report_progress(previous_rows)
+        else:
+            for row in rows:
+                self.report["rows"] += 1
+                try:
+                    self.add(parse_row(row, self.default_faculty))
+                except (ValueError, TypeError) as e:
+                    self._skip(e)
+                self._report_progress(self.report["rows"] - 1)
+        self.flush()
+        self._update_timing()
+        self.report["groups"] = self.groups.created
+        self.report["subjects"] = self.subjects.created
+        self.report["teachers"] = self.teachers.created
+        return self.report
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Parallel parse stage of large imports
+"""
+
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from ingest.records import COLUMN_ALIASES, LessonRecord, parse_row
+from typing import Dict, Iterable, Iterator, List, Tuple
+import zlib
+
+# Rows sent to a worker at a time
+DEFAULT_CHUNK_SIZE = 2000
+
+
+def parse_chunk(
+    rows: List[dict], default_faculty: str = ""
+) -> Tuple[List[LessonRecord], List[str]]:
+    """
+    Parse a chunk of rows in a worker process
+
+    Args:
+        rows (List[dict]): Rows keyed by column name
+        default_faculty (str): Faculty of groups when a row has none
+
+    Returns:
+        Tuple[List[LessonRecord], List[str]]: Parsed lessons and the errors of
+        skipped rows
+    """
+    records = []
+    errors = []
+    for row in rows:
+        try:
+            records.append(parse_row(row, default_faculty))
+        except (ValueError, TypeError) as e:
+            errors.append(str(e))
+    return records, errors
+
+
+def _partition(row: dict, partitions: int) -> int:
+    for column, value in row.items():
+        if column and str(column).strip().lower() in COLUMN_ALIASES["group"]:
+            key = " ".join(str(value).split()).casefold()
+            return zlib.crc32(key.encode("utf-8")) % partitions
+    return 0
+
+
+def parse_parallel(
+    rows: Iterable[dict],
+    workers: int,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    default_faculty: str = "",
+) -> Iterator[Tuple[List[LessonRecord], List[str]]]:
+    """
+    Parse rows in a process pool, partitioned by group
+
+    Rows are read in the calling process and split into one partition per
+    worker by a hash of their group, so the rows of a group stay in input
+    order within one partition. Chunks are still cut every chunk_size rows
+    and finish in any order, so a week can arrive in several pieces with
+    other groups in between; the Ingester merges the later pieces into the
+    week it already wrote. At most two chunks per worker are in flight,
+    which bounds memory for exports of any size.
+
+    Args:
+        rows (Iterable[dict]): Rows keyed by column name
+        workers (int): Number of worker processes
+        chunk_size (int): Rows per chunk
+        default_faculty (str): Faculty of groups when a row has none
+
+    Yields:
+        Tuple[List[LessonRecord], List[str]]: Results of parse_chunk in
+        completion order
+    """
+    buffers: Dict[int, List[dict]] = {index: [] for index in range(workers)}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight = set()
+
+        def submit(chunk: List[dict]):
+            in_flight.add(pool.submit(parse_chunk, chunk, default_faculty))
+
+        def drain(limit: int) -> Iterator[Tuple[List[LessonRecord], List[str]]]:
+            nonlocal in_flight
+            while len(in_flight) > limit:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+
+        for row in rows:
+            buffer = buffers[_partition(row, workers)]
+            buffer.append(row)
+            if len(buffer) >= chunk_size:
+                submit(buffer[:])
+                buffer.clear()
+                yield from drain(workers * 2)
+        for buffer in buffers.values():
+            if buffer:
+                submit(buffer)
+        yield from drain(0)
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Streaming readers of timetable exports (JSON, JSON Lines, CSV, XLSX)
+"""
+
+from typing import Iterator, Optional
+import csv
+import json
+import os
+
+try:
+    import openpyxl
+except ImportError:  # openpyxl is optional, only XLSX needs it
+    openpyxl = None
+
+# Characters read from JSON files at a time
+JSON_CHUNK_SIZE = 1 << 16
+
+FORMATS = ("json", "jsonl", "csv", "xlsx")
+
+
+def detect_format(path: str) -> str:
+    """
+    Guess the format of an export from its file extension
+
+    Args:
+        path (str): Path of the export
+
+    Returns:
+        str: One of FORMATS
+    """
+    extension = os.path.splitext(path)[1].lower().lstrip(".")
+    if extension == "ndjson":
+        return "jsonl"
+    if extension not in FORMATS:
+        raise ValueError(f"Unknown export format: {path}")
+    return extension
+
+
+def _skip_separators(buffer: str, position: int) -> int:
+    while position < len(buffer) and (
+        buffer[position].isspace() or buffer[position] == ","
+    ):
+        position += 1
+    return position
+
+
+def iter_json_array(file, chunk_size: int = JSON_CHUNK_SIZE) -> Iterator[dict]:
+    """
+    Yield the elements of a top-level JSON array without loading the whole file
+
+    Args:
+        file: Text file positioned at the array
+        chunk_size (int): Characters read at a time
+
+    Yields:
+        dict: Array elements
+    """
+    decoder = json.JSONDecoder()
+    buffer = file.read(chunk_size).lstrip()
+    if not buffer.startswith("["):
+        raise ValueError("Expected a JSON array")
+    position = 1
+    while True:
+        position = _skip_separators(buffer, position)
+        if position == len(buffer):
+            chunk = file.read(chunk_size)
+            if not chunk:
+                raise ValueError("Unterminated JSON array")
+            buffer, position = chunk, 0
+            continue
+        if buffer[position] == "]":
+            return
+        try:
+            value, position = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            # The element continues in the next chunk
+            chunk = file.read(chunk_size)
+            if not chunk:
+                raise
+            buffer, position = buffer[position:] + chunk, 0
+            continue
+        yield value
+
+
+def read_json(path: str) -> Iterator[dict]:
+    """Yield lessons of a JSON export: an array of objects or JSON Lines"""
+    with open(path, encoding="utf-8-sig") as file:
+        first = file.read(JSON_CHUNK_SIZE).lstrip()
+        file.seek(0)
+        if first.startswith("["):
+            yield from iter_json_array(file)
+        else:
+            yield from _iter_json_lines(file)
+
+
+def read_json_lines(path: str) -> Iterator[dict]:
+    """Yield lessons of a JSON Lines export, one object per line"""
+    with open(path, encoding="utf-8-sig") as file:
+        yield from _iter_json_lines(file)
+
+
+def _iter_json_lines(file) -> Iterator[dict]:
+    for line in file:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+def read_csv(path: str) -> Iterator[dict]:
+    """Yield lessons of a CSV export with a header row (comma or semicolon separated)"""
+    with open(path, newline="", encoding="utf-8-sig") as file:
+        sample = file.read(4096)
+        file.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+        except csv.Error:
+            dialect = csv.excel
+        yield from csv.DictReader(file, dialect=dialect)
+
+
+def read_xlsx(path: str, sheet: Optional[str] = None) -> Iterator[dict]:
+    """Yield lessons of an XLSX export with a header row (first sheet by default)"""
+    if openpyxl is None:
+        raise RuntimeError("Reading XLSX exports needs openpyxl: pip install openpyxl")
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        worksheet = workbook[sheet] if sheet else workbook.active
+        rows = worksheet.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        header = [str(name).strip() if name is not None else "" for name in header]
+        for row in rows:
+            if any(value is not None for value in row):
+                yield dict(zip(header, row))
+    finally:
+        workbook.close()
+
+
+def read_rows(path: str, export_format: Optional[str] = None) -> Iterator[dict]:
+    """
+    Stream the rows of an export
+
+    Args:
+        path (str): Path of the export
+        export_format (Optional[str]): One of FORMATS, guessed from the
+            extension when omitted
+
+    Returns:
+        Iterator[dict]: Rows keyed by column name
+    """
+    export_format = export_format or detect_format(path)
+    readers = {
+        "json": read_json,
+        "jsonl": read_json_lines,
+        "csv": read_csv,
+        "xlsx": read_xlsx,
+    }
+    if export_format not in readers:
+        raise ValueError(f"Unknown export format: {export_format}")
+    return readers[export_format](path)
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Normalization of export rows into lesson records
+"""
+
+from datetime import date, datetime, time, timedelta
+from typing import NamedTuple, Optional
+
+# Column names accepted for every field, lowercase
+COLUMN_ALIASES = {
+    "group": ("group", "group_name", "группа"),
+    "faculty": ("faculty", "факультет", "институт"),
+    "subject": ("subject", "subject_name", "предмет", "дисциплина"),
+    "subject_code": ("subject_code", "code", "код"),
+    "teacher": ("teacher", "teacher_name", "преподаватель"),
+    "department": ("department", "кафедра"),
+    "date": ("date", "дата"),
+    "start": ("start", "start_time", "начало"),
+    "end": ("end", "end_time", "конец", "окончание"),
+    "location": ("location", "room", "аудитория", "место"),
+}
+
+DATE_FORMATS = ("%Y-%m-%d", "%d.%m.%Y", "%d.%m.%y")
+TIME_FORMATS = ("%H:%M", "%H:%M:%S", "%H.%M")
+
+
+class LessonRecord(NamedTuple):
+    """Lesson of an export with normalized names and parsed times"""
+
+    group: str
+    faculty: str
+    subject: str
+    subject_code: Optional[str]
+    teacher: str
+    department: str
+    start_time: datetime
+    end_time: datetime
+    location: Optional[str]
+
+    @property
+    def week_start(self) -> date:
+        """Monday of the lesson's week"""
+        day = self.start_time.date()
+        return day - timedelta(days=day.weekday())
+
+
+def normalize_name(value) -> str:
+    """Collapse whitespace of a name"""
+    return " ".join(str(value).split()) if value is not None else ""
+
+
+def name_key(name: str) -> str:
+    """Key under which spellings of the same name are deduplicated"""
+    return normalize_name(name).casefold().replace("ё", "е")
+
+
+def _pick(row: dict, field: str):
+    for alias in COLUMN_ALIASES[field]:
+        if alias in row:
+            return row[alias]
+    return None
+
+
+def parse_date(value) -> date:
+    """Parse a date cell (ISO or dd.mm.yyyy)"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    text = normalize_name(value)
+    try:
+        return date.fromisoformat(text)
+    except ValueError:
+        pass
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, date_format).date()
+        except ValueError:
+            pass
+    raise ValueError(f"Invalid date: {value!r}")
+
+
+def parse_time(value, day: Optional[date]) -> datetime:
+    """Parse a start or end cell: a full datetime, or a time of `day`"""
+    if isinstance(value, datetime):
+        return value.replace(microsecond=0)
+    if isinstance(value, time):
+        if day is None:
+            raise ValueError("Time without a date")
+        return datetime.combine(day, value.replace(microsecond=0))
+    text = normalize_name(value)
+    if not text:
+        raise ValueError("Missing time")
+    try:
+        return datetime.fromisoformat(text).replace(microsecond=0, tzinfo=None)
+    except ValueError:
+        pass
+    if day is None:
+        raise ValueError(f"Time without a date: {value!r}")
+    try:
+        return datetime.combine(day, time.fromisoformat(text).replace(microsecond=0))
+    except ValueError:
+        pass
+    for time_format in TIME_FORMATS:
+        try:
+            return datetime.combine(day, datetime.strptime(text, time_format).time())
+        except ValueError:
+            pass
+    raise ValueError(f"Invalid time: {value!r}")
+
+
+def parse_row(row: dict, default_faculty: str = "") -> LessonRecord:
+    """
+    Turn an export row into a lesson record
+
+    Column names are matched case-insensitively against COLUMN_ALIASES. Start
+    and end are either full datetimes or times combined with the date column.
+
+    Args:
+        row (dict): Row keyed by column name
+        default_faculty (str): Faculty of groups when the row has none
+
+    Returns:
+        LessonRecord: Parsed lesson
+
+    Raises:
+        ValueError: When a required field is missing or invalid
+    """
+    row = {str(key).strip().lower(): value for key, value in row.items() if key}
+    group = normalize_name(_pick(row, "group"))
+    subject = normalize_name(_pick(row, "subject"))
+    if not group or not subject:
+        raise ValueError("Missing group or subject")
+
+    day_value = _pick(row, "date")
+    day = parse_date(day_value) if day_value not in (None, "") else None
+    start_time = parse_time(_pick(row, "start"), day)
+    end_time = parse_time(_pick(row, "end"), start_time.date())
+    if end_time <= start_time:
+        raise ValueError(f"Lesson ends before it starts: {start_time} - {end_time}")
+
+    subject_code = normalize_name(_pick(row, "subject_code")) or None
+    location = normalize_name(_pick(row, "location")) or None
+    return LessonRecord(
+        group=group,
+        faculty=normalize_name(_pick(row, "faculty")) or default_faculty,
+        subject=subject,
+        subject_code=subject_code,
+        teacher=normalize_name(_pick(row, "teacher")),
+        department=normalize_name(_pick(row, "department")),
+        start_time=start_time,
+        end_time=end_time,
+        location=location,
+    )
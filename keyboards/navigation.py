@@ -1,4 +1,5 @@
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
+from typing import List, Optional, Tuple
 import json
 
 
@@ -29,3 +30,70 @@ def get_week_navigation_keyboard(current_offset: int = 0) -> InlineKeyboardMarku
     )
 
     return keyboard
+
+
+# Telegram rejects callback data longer than this many bytes
+CALLBACK_DATA_LIMIT = 64
+
+
+def get_lookup_callback_data(kind: str, offset: int, key) -> Optional[str]:
+    """
+    Build callback data of a teacher ("t") or room ("r") week view
+
+    Returns:
+        Optional[str]: Callback data, or None when the key does not fit
+    """
+    data = f"lk_{kind}:{offset}:{key}"
+    if len(data.encode("utf-8")) > CALLBACK_DATA_LIMIT:
+        return None
+    return data
+
+
+def get_lookup_navigation_keyboard(
+    kind: str, key, current_offset: int = 0
+) -> Optional[InlineKeyboardMarkup]:
+    """
+    Create week navigation for a teacher or room view
+
+    Args:
+        kind (str): "t" for a teacher id, "r" for a room
+        key: Teacher id or room
+        current_offset (int): Current week offset from current week
+
+    Returns:
+        Optional[InlineKeyboardMarkup]: Keyboard with previous, current and
+        next week buttons, or None when the room is too long for callback data
+    """
+    offsets = (current_offset - 1, 0, current_offset + 1)
+    callback_data = [get_lookup_callback_data(kind, offset, key) for offset in offsets]
+    if None in callback_data:
+        return None
+    return InlineKeyboardMarkup(
+        inline_keyboard=[
+            [
+                InlineKeyboardButton(text=text, callback_data=data)
+                for text, data in zip(("←", "🏠", "→"), callback_data)
+            ]
+        ]
+    )
+
+
+def get_lookup_choice_keyboard(
+    kind: str, choices: List[Tuple[str, object]]
+) -> InlineKeyboardMarkup:
+    """
+    Create a keyboard to pick one of several matching teachers or rooms
+
+    Args:
+        kind (str): "t" for teachers, "r" for rooms
+        choices (List[Tuple[str, object]]): Button text and teacher id or room
+
+    Returns:
+        InlineKeyboardMarkup: One button per choice that fits in callback data
+    """
+    rows = []
+    for text, key in choices:
+        data = get_lookup_callback_data(kind, 0, key)
+        if data:
+            rows.append([InlineKeyboardButton(text=text, callback_data=data)])
+    return InlineKeyboardMarkup(inline_keyboard=rows)
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Middleware feeding the in-memory counters shown by /stats
+"""
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+from utils.stats import live_stats
+from typing import Any, Awaitable, Callable, Dict
+import time
+
+
+class StatsMiddleware(BaseMiddleware):
+    """
+    Counts updates (as an outer middleware of dp.update) and records handler
+    durations (as an inner middleware of event observers)
+    """
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        handler_object = data.get("handler")
+        if handler_object is None:
+            live_stats.updates.add()
+            return await handler(event, data)
+
+        started = time.perf_counter()
+        try:
+            return await handler(event, data)
+        except Exception:
+            live_stats.handler_errors += 1
+            raise
+        finally:
+            live_stats.record_handler(
+                handler_object.callback.__name__, time.perf_counter() - started
+            )
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Per-user debounce of schedule navigation callbacks
+"""
+
+from aiogram import BaseMiddleware
+from aiogram.types import CallbackQuery, TelegramObject
+from config import NAVIGATION_DEBOUNCE_MS, NAVIGATION_MAX_USERS
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]]
+
+
+class _Burst:
+    """Taps of one user while a render of theirs runs or the window is open"""
+
+    __slots__ = ("pending",)
+
+    def __init__(self):
+        # Latest tap waiting for the window to close
+        self.pending: Optional[Tuple[Handler, CallbackQuery, Dict[str, Any]]] = None
+
+
+class NavigationThrottleMiddleware(BaseMiddleware):
+    """
+    Coalesces rapid taps on the week navigation buttons
+
+    The first tap of a user is handled at once. Taps arriving while it renders
+    or within `window` seconds after it only replace each other, and when the
+    window closes the latest one is handled, so a burst costs at most two
+    queries and edits however many times the button was pressed. Skipped taps
+    are answered so their loading indicator goes away.
+
+    At most `max_users` bursts are tracked; the oldest is forgotten when more
+    users tap at once, which only lets its next tap through unthrottled.
+    """
+
+    def __init__(
+        self,
+        window: float = NAVIGATION_DEBOUNCE_MS / 1000,
+        max_users: int = NAVIGATION_MAX_USERS,
+        prefix: str = "sch_",
+    ):
+        self.window = window
+        self.max_users = max_users
+        self.prefix = prefix
+        self.coalesced = 0
+        self._bursts: "OrderedDict[int, _Burst]" = OrderedDict()
+
+    async def __call__(
+        self, handler: Handler, event: TelegramObject, data: Dict[str, Any]
+    ) -> Any:
+        if not isinstance(event, CallbackQuery) or not (event.data or "").startswith(
+            self.prefix
+        ):
+            return await handler(event, data)
+
+        user_id = event.from_user.id
+        burst = self._bursts.get(user_id)
+        if burst is not None:
+            if burst.pending is not None:
+                await self._skip(burst.pending[1])
+            burst.pending = (handler, event, data)
+            return None
+
+        burst = self._bursts[user_id] = _Burst()
+        if len(self._bursts) > self.max_users:
+            self._bursts.popitem(last=False)
+        try:
+            result = await handler(event, data)
+            while True:
+                await asyncio.sleep(self.window)
+                if burst.pending is None:
+                    return result
+                latest_handler, latest_event, latest_data = burst.pending
+                burst.pending = None
+                try:
+                    await latest_handler(latest_event, latest_data)
+                except Exception as e:
+                    logger.error(f"Error handling coalesced navigation: {e}")
+        finally:
+            if self._bursts.get(user_id) is burst:
+                del self._bursts[user_id]
+
+    async def _skip(self, callback: CallbackQuery):
+        self.coalesced += 1
+        try:
+            await callback.answer()
+        except Exception as e:
+            logger.debug(f"Error answering a coalesced callback: {e}")
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Middlewares timing updates, handlers and outbound Bot API requests
+"""
+
+from aiogram import BaseMiddleware, Bot
+from aiogram.client.session.middlewares.base import (
+    BaseRequestMiddleware,
+    NextRequestMiddlewareType,
+)
+from aiogram.methods import TelegramMethod
+from aiogram.methods.base import Response, TelegramType
+from aiogram.types import TelegramObject, Update
+from aiogram.types.update import UpdateTypeLookupError
+from utils.metrics import registry
+from typing import Any, Awaitable, Callable, Dict
+import time
+
+update_seconds = registry.histogram(
+    "bot_update_seconds", "Time to process an update", ("event_type",)
+)
+handler_seconds = registry.histogram(
+    "bot_handler_seconds", "Time spent in a handler", ("handler",)
+)
+handler_errors = registry.counter(
+    "bot_handler_errors", "Exceptions raised by handlers", ("handler",)
+)
+api_seconds = registry.histogram(
+    "bot_api_seconds", "Duration of Bot API requests", ("method",)
+)
+api_errors = registry.counter("bot_api_errors", "Failed Bot API requests", ("method",))
+
+
+def _event_type(event: TelegramObject) -> str:
+    if isinstance(event, Update):
+        try:
+            return event.event_type
+        except UpdateTypeLookupError:
+            return "unknown"
+    return type(event).__name__
+
+
+class TimingMiddleware(BaseMiddleware):
+    """
+    Records processing time of events
+
+    As an outer middleware of dp.update it times whole updates by event type;
+    as an inner middleware of an event observer (dp.message, ...) it times the
+    handler that was chosen, labelled by the handler's function name.
+    """
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        if not registry.enabled:
+            return await handler(event, data)
+
+        handler_object = data.get("handler")
+        if handler_object is not None:
+            histogram = handler_seconds
+            label = handler_object.callback.__name__
+        else:
+            histogram = update_seconds
+            label = _event_type(event)
+
+        started = time.perf_counter()
+        try:
+            return await handler(event, data)
+        except Exception:
+            if handler_object is not None:
+                handler_errors.inc(label)
+            raise
+        finally:
+            histogram.observe(time.perf_counter() - started, label)
+
+
+class RequestTimingMiddleware(BaseRequestMiddleware):
+    """Records the duration of every Bot API request by method name"""
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        if not registry.enabled:
+            return await make_request(bot, method)
+
+        label = type(method).__name__
+        started = time.perf_counter()
+        try:
+            return await make_request(bot, method)
+        except Exception:
+            api_errors.inc(label)
+            raise
+        finally:
+            api_seconds.observe(time.perf_counter() - started, label)
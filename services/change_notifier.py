@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Detection of schedule changes and notification of subscribed users
+"""
+
+from database.models import Database, EMPTY_WEEK_HASH
+from utils.schedule_diff import (
+    ADDED,
+    REMOVED,
+    MOVED,
+    CHANGED,
+    serialize_week,
+    deserialize_week,
+    diff_weeks,
+)
+from utils.schedule_utils import DAYS_OF_WEEK, get_current_week_start
+from datetime import date
+from typing import Dict, List, Optional, Set, Tuple
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Seconds to collect changed weeks before diffing them (an import touches a
+# week many times, it should be diffed once)
+FLUSH_INTERVAL = 10
+# Chats queued per batch before yielding to the event loop
+NOTIFY_BATCH_SIZE = 50
+
+CHANGE_ICONS = {ADDED: "➕", REMOVED: "➖", MOVED: "🔁", CHANGED: "✏️"}
+
+
+def describe_lesson(lesson: dict) -> str:
+    """Describe a lesson in one line: day, time, subject and location"""
+    start = lesson["start_time"]
+    day_name = DAYS_OF_WEEK[start.weekday()]
+    location = lesson["location"] or "--каф."
+    return (
+        f"{day_name} ~ {start.strftime('%d.%m')} "
+        f"{start.strftime('%H:%M')}-{lesson['end_time'].strftime('%H:%M')} "
+        f"{lesson['subject_name']}, {location}"
+    )
+
+
+def format_changes_message(
+    group_name: str, changes: List[Tuple[str, Optional[dict], Optional[dict]]]
+) -> str:
+    """
+    Format schedule changes of a group
+
+    Args:
+        group_name (str): Name of the group
+        changes: Changes as returned by diff_weeks
+
+    Returns:
+        str: Formatted message
+    """
+    message = f"<b>Изменения в расписании</b>\n<blockquote>{group_name}</blockquote>\n"
+    message += "<blockquote>"
+    for kind, old, new in changes:
+        icon = CHANGE_ICONS[kind]
+        if kind == ADDED:
+            message += f"{icon} {describe_lesson(new)}\n"
+        elif kind == REMOVED:
+            message += f"{icon} <s>{describe_lesson(old)}</s>\n"
+        else:
+            message += f"{icon} {describe_lesson(old)}\n    → {describe_lesson(new)}\n"
+    message += "</blockquote>"
+    return message
+
+
+class ScheduleChangeDetector:
+    """
+    Compares the current lessons of a week with its stored snapshot
+
+    The stored fingerprint is the content hash of the week's schedule, so an
+    unchanged week costs one indexed lookup (Database.get_week_version) and
+    only changed weeks are loaded and diffed row by row.
+    """
+
+    def __init__(self, db: Database):
+        self.db = db
+        self.weeks_checked = 0
+        self.weeks_changed = 0
+
+    def check_week(
+        self, group_id: int, week_start: date
+    ) -> List[Tuple[str, Optional[dict], Optional[dict]]]:
+        """
+        Diff a week against its snapshot and store the new snapshot
+
+        The first check of a week only stores the snapshot.
+
+        Args:
+            group_id (int): ID of the group
+            week_start (date): Start date of the week
+
+        Returns:
+            List[Tuple[str, Optional[dict], Optional[dict]]]: Changes since the snapshot
+        """
+        self.weeks_checked += 1
+        version = self.db.get_week_version(group_id, week_start)
+        fingerprint = version[1] if version else EMPTY_WEEK_HASH
+
+        snapshot = self.db.get_week_snapshot(group_id, week_start)
+        if snapshot is not None and snapshot[0] == fingerprint:
+            return []
+
+        lessons = self.db.get_schedule_for_week(group_id, week_start)
+        self.db.save_week_snapshot(
+            group_id, week_start, fingerprint, serialize_week(lessons)
+        )
+        if snapshot is None:
+            return []
+
+        self.weeks_changed += 1
+        return diff_weeks(deserialize_week(snapshot[1]), lessons)
+
+
+class ScheduleChangeNotifier:
+    """
+    Collects weeks changed through the database, diffs them periodically and
+    sends the changes to subscribed users of the group in batches
+    """
+
+    def __init__(
+        self,
+        db: Database,
+        sender,
+        interval: float = FLUSH_INTERVAL,
+        batch_size: int = NOTIFY_BATCH_SIZE,
+    ):
+        self.db = db
+        self.sender = sender
+        self.interval = interval
+        self.batch_size = batch_size
+        self.detector = ScheduleChangeDetector(db)
+        self._dirty: Set[Tuple[int, date]] = set()
+        self._task: Optional[asyncio.Task] = None
+        self.notifications = 0
+        db.add_change_listener(self._on_change)
+
+    def _on_change(self, group_id: int, week_start: Optional[date]):
+        if week_start is not None:
+            self._dirty.add((group_id, week_start))
+
+    def prime(self) -> int:
+        """Take snapshots of current and upcoming weeks that have none yet"""
+        primed = 0
+        for group_id, week_start in self.db.get_schedule_weeks(
+            get_current_week_start()
+        ):
+            if self.db.get_week_snapshot(group_id, week_start) is None:
+                self.detector.check_week(group_id, week_start)
+                primed += 1
+        return primed
+
+    def collect_changes(
+        self, keys: Set[Tuple[int, date]]
+    ) -> Dict[int, List[Tuple[str, Optional[dict], Optional[dict]]]]:
+        """Check weeks and group their changes by group (past weeks are not reported)"""
+        current_week_start = get_current_week_start()
+        changes_by_group: Dict[int, list] = {}
+        for group_id, week_start in sorted(keys):
+            changes = self.detector.check_week(group_id, week_start)
+            if changes and week_start >= current_week_start:
+                changes_by_group.setdefault(group_id, []).extend(changes)
+        return changes_by_group
+
+    async def flush(self):
+        """Diff collected weeks and notify subscribers"""
+        if not self._dirty:
+            return
+        keys, self._dirty = self._dirty, set()
+        changes_by_group = await asyncio.to_thread(self.collect_changes, keys)
+
+        for group_id, changes in changes_by_group.items():
+            chats = await asyncio.to_thread(self.db.get_change_subscribers, group_id)
+            if not chats:
+                continue
+            group_name = await asyncio.to_thread(self.db.get_group_name, group_id)
+            text = format_changes_message(group_name, changes)
+            for position in range(0, len(chats), self.batch_size):
+                for chat_id in chats[position : position + self.batch_size]:
+                    await self.sender.put(
+                        chat_id,
+                        text,
+                        on_forbidden=self.db.delete_chat_change_subscriptions,
+                    )
+                    self.notifications += 1
+                await asyncio.sleep(0)
+
+    async def run(self):
+        """Flush collected weeks forever"""
+        primed = await asyncio.to_thread(self.prime)
+        logger.info(f"Schedule change notifier primed {primed} week snapshots")
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Error in schedule change notifier: {e}")
+
+    def start(self):
+        """Start the notifier task"""
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        """Stop the notifier task"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
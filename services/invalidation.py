@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Cache invalidation between processes sharing one database
+"""
+
+from database.models import Database
+from utils.schedule_utils import week_cache
+from config import INVALIDATION_POLL_INTERVAL, INVALIDATION_SOCKET_DIR
+from datetime import date
+from typing import List, Optional, Tuple
+import asyncio
+import json
+import logging
+import os
+import socket
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Change log entries kept for workers that poll late
+CHANGE_LOG_KEEP = 10000
+
+Key = Tuple[int, Optional[date]]
+
+
+class InvalidationChannel:
+    """
+    Transport of (group_id, week_start) invalidation keys between processes
+
+    publish() is called for every change made by this process, poll() returns
+    keys changed by other processes since the previous call.
+    """
+
+    def publish(self, group_id: int, week_start: Optional[date]):
+        """Announce a local change"""
+
+    def poll(self) -> List[Key]:
+        """Get keys changed elsewhere since the last poll"""
+        return []
+
+    def close(self):
+        """Release resources of the channel"""
+
+
+class ChangeLogChannel(InvalidationChannel):
+    """
+    Reads the change_log table that Database fills in the same transaction as
+    every schedule write
+
+    Publishing is therefore implicit; polling is a range scan on the rowid
+    after the last seen entry, with this process's own entries skipped.
+    """
+
+    def __init__(self, db: Database, keep: int = CHANGE_LOG_KEEP):
+        self.db = db
+        self.keep = keep
+        # Start from the current end of the log, older changes are already
+        # visible to a freshly started process
+        self.last_id = db.get_change_log_bounds()[1]
+        self.lost = False
+
+    def poll(self) -> List[Key]:
+        first_id, last_id = self.db.get_change_log_bounds()
+        if first_id > self.last_id + 1:
+            # Entries were pruned before we read them
+            logger.warning("Change log entries were pruned before being read")
+            self.lost = True
+
+        keys = []
+        while True:
+            changes = self.db.get_changes_since(
+                self.last_id, exclude_origin=self.db.origin
+            )
+            if not changes:
+                break
+            keys.extend((group_id, week_start) for _, group_id, week_start in changes)
+            self.last_id = changes[-1][0]
+        # Own entries are filtered out, so advance past them too
+        self.last_id = max(self.last_id, last_id)
+
+        if last_id - first_id >= 2 * self.keep:
+            self.db.prune_change_log(self.keep)
+        return keys
+
+
+class UnixSocketChannel(InvalidationChannel):
+    """
+    Broadcast over Unix datagram sockets for processes on one host
+
+    Every process binds a socket in a shared directory and sends each change
+    to all other sockets found there, so changes arrive without waiting for
+    the next change log poll. Sockets of dead processes are removed.
+    """
+
+    def __init__(self, directory: str, name: Optional[str] = None):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.path = os.path.join(directory, f"{name or os.getpid()}.sock")
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.sock.bind(self.path)
+        self.sock.setblocking(False)
+
+    def publish(self, group_id: int, week_start: Optional[date]):
+        payload = json.dumps(
+            [group_id, week_start.isoformat() if week_start else None]
+        ).encode()
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if path == self.path or not name.endswith(".sock"):
+                continue
+            try:
+                self.sock.sendto(payload, path)
+            except (ConnectionRefusedError, FileNotFoundError):
+                # Nobody listens on this socket any more
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+            except BlockingIOError:
+                logger.warning(f"Invalidation socket {path} is full, dropping")
+
+    def poll(self) -> List[Key]:
+        keys = []
+        while True:
+            try:
+                payload = self.sock.recv(256)
+            except BlockingIOError:
+                break
+            group_id, week_start = json.loads(payload)
+            keys.append(
+                (group_id, date.fromisoformat(week_start) if week_start else None)
+            )
+        return keys
+
+    def close(self):
+        self.sock.close()
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+
+class InvalidationBus:
+    """
+    Publishes local changes to the channels and replays changes received from
+    other processes
+
+    Remote changes are applied to the rendered week cache and passed to the
+    Database change listeners, so every index and cache that follows local
+    writes (time index, group index, file_id cache, change notifier) follows
+    writes of other processes the same way.
+    """
+
+    def __init__(
+        self,
+        db: Database,
+        channels: List[InvalidationChannel],
+        interval: float = INVALIDATION_POLL_INTERVAL,
+    ):
+        self.db = db
+        self.channels = channels
+        self.interval = interval
+        self.received = 0
+        # Set while replaying remote changes, per thread: local writes made
+        # in worker threads during a replay must still be published
+        self._replay = threading.local()
+        self._task: Optional[asyncio.Task] = None
+        db.add_change_listener(self._on_local_change)
+
+    def _on_local_change(self, group_id: int, week_start: Optional[date]):
+        if getattr(self._replay, "applying", False):
+            # Replayed remote change, do not echo it back
+            return
+        for channel in self.channels:
+            try:
+                channel.publish(group_id, week_start)
+            except Exception as e:
+                logger.error(f"Error publishing invalidation: {e}")
+
+    def receive(self) -> Tuple[List[Key], bool]:
+        """
+        Read changes from all channels without applying them
+
+        Safe to call from a worker thread: it only reads the channels.
+
+        Returns:
+            Tuple[List[Key], bool]: Distinct keys in order, and whether
+            changes may have been lost
+        """
+        keys = []
+        lost = False
+        for channel in self.channels:
+            keys.extend(channel.poll())
+            if getattr(channel, "lost", False):
+                channel.lost = False
+                lost = True
+        # Keep the order but apply each key once
+        return list(dict.fromkeys(keys)), lost
+
+    def apply(self, keys: List[Key], lost: bool = False) -> int:
+        """
+        Replay received changes to the week cache and the Database listeners
+
+        Listeners update state read by handlers, so this runs on the event
+        loop (or the thread that owns them), never in a worker thread.
+
+        Returns:
+            int: Number of keys applied
+        """
+        if lost:
+            week_cache.clear()
+        self._replay.applying = True
+        try:
+            for group_id, week_start in keys:
+                week_cache.invalidate(group_id, week_start)
+                self.db.notify_change(group_id, week_start)
+        finally:
+            self._replay.applying = False
+        self.received += len(keys)
+        return len(keys)
+
+    def poll(self) -> int:
+        """
+        Read and apply changes received on all channels
+
+        Returns:
+            int: Number of distinct keys applied
+        """
+        return self.apply(*self.receive())
+
+    async def run(self):
+        """Poll the channels forever, reading them off the event loop"""
+        while True:
+            try:
+                keys, lost = await asyncio.to_thread(self.receive)
+                self.apply(keys, lost)
+            except Exception as e:
+                logger.error(f"Error in invalidation bus: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        """Start the polling task"""
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        """Stop the polling task and close the channels"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        for channel in self.channels:
+            channel.close()
+
+
+def create_invalidation_bus(db: Database) -> InvalidationBus:
+    """
+    Create the invalidation bus configured in config.py
+
+    Args:
+        db (Database): Database instance
+
+    Returns:
+        InvalidationBus: Bus with the change log channel and, if
+        INVALIDATION_SOCKET_DIR is set, the Unix socket channel
+    """
+    channels: List[InvalidationChannel] = [ChangeLogChannel(db)]
+    if INVALIDATION_SOCKET_DIR:
+        channels.append(UnixSocketChannel(INVALIDATION_SOCKET_DIR))
+    return InvalidationBus(db, channels)
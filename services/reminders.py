@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Lesson reminder scheduler
+"""
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramForbiddenError, TelegramRetryAfter
+from database.models import Database
+from utils.schedule_utils import format_lesson_line
+from config import REMINDER_RATE_LIMIT, REMINDER_WINDOW_MINUTES
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+import asyncio
+import heapq
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Allowed values for "minutes before the lesson"
+MIN_MINUTES_BEFORE = 1
+MAX_MINUTES_BEFORE = 180
+DEFAULT_MINUTES_BEFORE = 15
+
+# Blocking cleanup of a chat the bot can no longer write to
+Cleanup = Optional[Callable[[int], object]]
+
+
+def format_reminder_message(lesson: dict, minutes_before: int) -> str:
+    """
+    Format a reminder about an upcoming lesson
+
+    Args:
+        lesson (dict): Lesson dictionary
+        minutes_before (int): Minutes left until the lesson
+
+    Returns:
+        str: Formatted message
+    """
+    return (
+        f"⏰ <b>Через {minutes_before} мин.</b>\n"
+        f"<blockquote>{format_lesson_line(lesson)}</blockquote>"
+    )
+
+
+class RateLimitedSender:
+    """
+    Queue of outgoing messages drained at a fixed rate
+
+    Keeps the bot under Telegram's broadcast limit no matter how many
+    reminders fire at the same moment. The sender is shared by several
+    services, so each message carries the cleanup of the service that
+    queued it, run when the chat turns out to be unreachable.
+    """
+
+    def __init__(self, bot: Bot, rate: float = REMINDER_RATE_LIMIT):
+        self.bot = bot
+        self.interval = 1 / rate
+        self.queue: "asyncio.Queue[Tuple[int, str, Cleanup]]" = asyncio.Queue()
+        self.sent = 0
+        self.failed = 0
+
+    async def put(
+        self,
+        chat_id: int,
+        text: str,
+        on_forbidden: Cleanup = None,
+    ):
+        """
+        Queue a message
+
+        Args:
+            chat_id (int): Chat to send to
+            text (str): Message text
+            on_forbidden: Blocking cleanup called with chat_id in a worker
+                thread when the bot was blocked or removed from the chat
+        """
+        await self.queue.put((chat_id, text, on_forbidden))
+
+    def qsize(self) -> int:
+        """Number of queued messages"""
+        return self.queue.qsize()
+
+    async def run(self):
+        """Send queued messages forever"""
+        while True:
+            chat_id, text, on_forbidden = await self.queue.get()
+            try:
+                await self._send(chat_id, text, on_forbidden)
+            finally:
+                self.queue.task_done()
+            await asyncio.sleep(self.interval)
+
+    async def _send(
+        self,
+        chat_id: int,
+        text: str,
+        on_forbidden: Cleanup = None,
+    ):
+        try:
+            await self.bot.send_message(chat_id, text)
+            self.sent += 1
+        except TelegramRetryAfter as e:
+            logger.warning(f"Flood control, retrying in {e.retry_after} s")
+            await asyncio.sleep(e.retry_after)
+            await self._send(chat_id, text, on_forbidden)
+        except TelegramForbiddenError:
+            # The user blocked the bot or it was removed from the chat
+            self.failed += 1
+            if on_forbidden:
+                await asyncio.to_thread(on_forbidden, chat_id)
+        except Exception as e:
+            self.failed += 1
+            logger.error(f"Error sending reminder to {chat_id}: {e}")
+
+
+class ReminderScheduler:
+    """
+    Heap-based reminder scheduler
+
+    Upcoming lessons of groups with subscribers are loaded window by window.
+    The heap holds one entry per (lesson, minutes_before) rather than per
+    user; subscribers are resolved only when the entry fires and their
+    messages go through a RateLimitedSender. The fire time of the last
+    dispatched entry is persisted as a single-row cursor, so after a restart
+    nothing is sent twice and reminders missed while the bot was down are
+    still sent if their lesson has not started yet.
+    """
+
+    def __init__(
+        self,
+        db: Database,
+        sender: RateLimitedSender,
+        window: timedelta = timedelta(minutes=REMINDER_WINDOW_MINUTES),
+        clock: Callable[[], datetime] = datetime.now,
+    ):
+        self.db = db
+        self.sender = sender
+        self.window = window
+        self.clock = clock
+        # (fire_at, lesson_id, minutes_before, group_id, lesson)
+        self._heap: List[tuple] = []
+        self._planned_until: Optional[datetime] = None
+        self._subscribers: Dict[Tuple[int, int], List[int]] = {}
+        self.cursor: Optional[datetime] = db.get_reminder_cursor()
+        self.dispatched = 0
+        # Bumped by invalidate() to discard plans computed concurrently
+        self._generation = 0
+
+    def invalidate(self):
+        """Drop the plan so that subscription changes are picked up on the next tick"""
+        self._heap.clear()
+        self._planned_until = None
+        self._generation += 1
+
+    def plan_window(self, now: datetime) -> Tuple[list, dict, datetime]:
+        """
+        Compute reminders that fire before now + window without touching the plan
+
+        Args:
+            now (datetime): Current moment
+
+        Returns:
+            Tuple[list, dict, datetime]: Heap entries, subscribers by
+            (group_id, minutes_before) and the end of the planned window
+        """
+        subscribers: Dict[Tuple[int, int], List[int]] = {}
+        for group_id, minutes_before, chat_id in self.db.get_reminder_subscribers():
+            subscribers.setdefault((group_id, minutes_before), []).append(chat_id)
+
+        leads: Dict[int, List[int]] = {}
+        for group_id, minutes_before in subscribers:
+            leads.setdefault(group_id, []).append(minutes_before)
+
+        window_end = now + self.window
+        if self._planned_until is not None:
+            planned_from, inclusive = self._planned_until, True
+        elif self.cursor is not None:
+            planned_from, inclusive = self.cursor, False
+        else:
+            planned_from, inclusive = now, True
+
+        entries = []
+        max_lead = timedelta(minutes=max(map(max, leads.values()), default=0))
+        lessons = self.db.get_lessons_starting_between(
+            now, window_end + max_lead, list(leads)
+        )
+        for lesson in lessons:
+            for minutes_before in leads[lesson["group_id"]]:
+                fire_at = lesson["start_time"] - timedelta(minutes=minutes_before)
+                if fire_at >= window_end or fire_at < planned_from:
+                    continue
+                if fire_at == planned_from and not inclusive:
+                    continue
+                entries.append(
+                    (fire_at, lesson["id"], minutes_before, lesson["group_id"], lesson)
+                )
+
+        return entries, subscribers, window_end
+
+    def load_window(self, now: datetime):
+        """
+        Plan reminders that fire before now + window
+
+        Args:
+            now (datetime): Current moment
+        """
+        self._apply_plan(*self.plan_window(now))
+
+    def _apply_plan(self, entries: list, subscribers: dict, window_end: datetime):
+        for entry in entries:
+            heapq.heappush(self._heap, entry)
+        self._subscribers = subscribers
+        self._planned_until = window_end
+
+    def pop_due(self, now: datetime) -> List[tuple]:
+        """Remove and return entries whose fire time has come"""
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            due.append(heapq.heappop(self._heap))
+        return due
+
+    async def dispatch(self, due: List[tuple]):
+        """Fan out due entries to their subscribers and advance the cursor"""
+        for fire_at, _, minutes_before, group_id, lesson in due:
+            text = format_reminder_message(lesson, minutes_before)
+            for chat_id in self._subscribers.get((group_id, minutes_before), ()):
+                await self.sender.put(
+                    chat_id, text, on_forbidden=self.db.delete_chat_reminders
+                )
+            self.dispatched += 1
+        if due:
+            self.cursor = due[-1][0]
+            self.db.set_reminder_cursor(self.cursor)
+
+    def next_wakeup(self, now: datetime) -> float:
+        """Seconds to sleep until the next entry fires or the next window is due"""
+        if self._planned_until is None:
+            return 5
+        wakeup = self._planned_until - self.window / 2
+        if self._heap:
+            wakeup = min(wakeup, self._heap[0][0])
+        return min(max((wakeup - now).total_seconds(), 0.5), 60)
+
+    async def tick(self):
+        """Plan the next window if needed and dispatch due reminders"""
+        now = self.clock()
+        if self._planned_until is None or now >= self._planned_until - self.window / 2:
+            generation = self._generation
+            plan = await asyncio.to_thread(self.plan_window, now)
+            if generation == self._generation:
+                self._apply_plan(*plan)
+        await self.dispatch(self.pop_due(now))
+
+    async def run(self):
+        """Run the scheduler forever"""
+        while True:
+            try:
+                await self.tick()
+            except Exception as e:
+                logger.error(f"Error in reminder scheduler: {e}")
+            await asyncio.sleep(self.next_wakeup(self.clock()))
+
+
+class ReminderService:
+    """Reminder scheduler together with its sender, started from bot.main()"""
+
+    def __init__(self, db: Database, bot: Bot):
+        self.sender = RateLimitedSender(bot)
+        self.scheduler = ReminderScheduler(db, self.sender)
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self):
+        """Start the scheduler and sender tasks"""
+        self._tasks = [
+            asyncio.create_task(self.sender.run()),
+            asyncio.create_task(self.scheduler.run()),
+        ]
+        logger.info("Reminder service started")
+
+    async def stop(self):
+        """Stop the scheduler and sender tasks"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Startup warm-up of rendered weeks and recording of group traffic
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from database.models import Database
+from utils.schedule_utils import get_week_schedule
+from utils.traffic import GroupTraffic, group_traffic
+from config import DEFAULT_GROUP, WARMUP_TOP_GROUPS, WARMUP_WORKERS, WARMUP_TIMEOUT
+from datetime import date, timedelta
+from typing import List, Optional, Tuple
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Traffic of this many last days decides which groups are warmed up
+TRAFFIC_WINDOW_DAYS = 7
+# Traffic older than this is deleted
+TRAFFIC_RETENTION_DAYS = 30
+# Seconds between writes of collected traffic
+TRAFFIC_FLUSH_INTERVAL = 60
+# Week offsets rendered for every group: current and next week
+WARMUP_WEEK_OFFSETS = (0, 1)
+
+
+class TrafficRecorder:
+    """Writes request counts collected in memory to the group_traffic table"""
+
+    def __init__(
+        self,
+        db: Database,
+        traffic: GroupTraffic = group_traffic,
+        interval: float = TRAFFIC_FLUSH_INTERVAL,
+    ):
+        self.db = db
+        self.traffic = traffic
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def flush(self):
+        """Write the collected counts and drop old traffic"""
+        today = date.today()
+        self.db.add_group_traffic(self.traffic.drain(), today)
+        self.db.prune_group_traffic(today - timedelta(days=TRAFFIC_RETENTION_DAYS))
+
+    async def run(self):
+        """Flush collected counts forever"""
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await asyncio.to_thread(self.flush)
+            except Exception as e:
+                logger.error(f"Error recording group traffic: {e}")
+
+    def start(self):
+        """Start the recorder task"""
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        """Stop the recorder task and write what is left"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        self.flush()
+
+
+def select_warmup_groups(
+    db: Database, top_n: int, since: date
+) -> Tuple[List[Tuple[int, str, int]], int]:
+    """
+    Get the groups to warm up and the total traffic they are compared against
+
+    The default group is always included since /start shows it.
+
+    Args:
+        db (Database): Database instance
+        top_n (int): Number of groups by traffic
+        since (date): First day of traffic to count
+
+    Returns:
+        Tuple[List[Tuple[int, str, int]], int]: (group_id, group_name, requests)
+        and the number of requests of all groups
+    """
+    groups = db.get_top_groups(since, top_n)
+    if all(name != DEFAULT_GROUP for _, name, _ in groups):
+        default_id = db.get_or_create_group(DEFAULT_GROUP, "Computer Science")
+        groups.append((default_id, DEFAULT_GROUP, 0))
+    return groups, db.get_total_traffic(since)
+
+
+async def warm_up(
+    db: Database,
+    top_n: int = WARMUP_TOP_GROUPS,
+    workers: int = WARMUP_WORKERS,
+    timeout: float = WARMUP_TIMEOUT,
+) -> dict:
+    """
+    Render the current and next week of the busiest groups into the week cache
+
+    Rendering runs in a pool of `workers` threads. Whatever is not done after
+    `timeout` seconds is dropped so polling is never held up for long.
+
+    Args:
+        db (Database): Database instance
+        top_n (int): Number of groups by recent traffic
+        workers (int): Size of the rendering pool
+        timeout (float): Time limit in seconds
+
+    Returns:
+        dict: groups, weeks (rendered), skipped (weeks not rendered in time),
+        elapsed (seconds) and coverage (share of recent requests made for the
+        fully warmed groups, None without traffic)
+    """
+    started = time.perf_counter()
+    since = date.today() - timedelta(days=TRAFFIC_WINDOW_DAYS)
+    groups, total_requests = await asyncio.to_thread(
+        select_warmup_groups, db, top_n, since
+    )
+
+    loop = asyncio.get_running_loop()
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="warmup")
+    futures = {}
+    for group_id, group_name, _ in groups:
+        for week_offset in WARMUP_WEEK_OFFSETS:
+            future = loop.run_in_executor(
+                pool, get_week_schedule, group_id, db, week_offset, group_name, False
+            )
+            futures[future] = group_id
+    try:
+        done, pending = await asyncio.wait(futures, timeout=timeout)
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+    for future in pending:
+        future.cancel()
+
+    unfinished = {futures[future] for future in pending}
+    warmed_requests = sum(
+        requests for group_id, _, requests in groups if group_id not in unfinished
+    )
+    report = {
+        "groups": len(groups),
+        "weeks": len(done),
+        "skipped": len(pending),
+        "elapsed": time.perf_counter() - started,
+        "coverage": warmed_requests / total_requests if total_requests else None,
+    }
+    coverage = (
+        f"{report['coverage']:.0%} of requests in the last {TRAFFIC_WINDOW_DAYS} days"
+        if report["coverage"] is not None
+        else "no recent traffic"
+    )
+    logger.info(
+        f"Warm-up rendered {report['weeks']} weeks of {report['groups']} groups "
+        f"in {report['elapsed']:.2f} s ({report['skipped']} skipped), covering "
+        f"{coverage}"
+    )
+    return report
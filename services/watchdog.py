@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Watchdog reporting what blocks the event loop
+"""
+
+from utils.metrics import registry
+from utils.sampler import describe_frame, MAX_STACK_DEPTH
+from utils.stats import live_stats
+from config import WATCHDOG_THRESHOLD_MS
+from typing import List, Optional, Tuple
+import asyncio
+import logging
+import sys
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Seconds between heartbeats of the loop
+HEARTBEAT_INTERVAL = 0.1
+# Frames of a blocking stack written to the log
+LOGGED_STACK_DEPTH = 20
+
+loop_lag_seconds = registry.histogram(
+    "loop_lag_seconds", "Delay of event loop heartbeats beyond their interval"
+)
+loop_blocked = registry.counter(
+    "loop_blocked", "Times the event loop was blocked over the threshold", ("culprit",)
+)
+
+
+def find_culprit(frame) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Find the handler and the Database method in a stack
+
+    Args:
+        frame: Innermost frame of the blocked thread
+
+    Returns:
+        Tuple[Optional[str], Optional[str]]: Handler ("module.function") and
+        Database method ("Database.method"), outermost handler and outermost
+        public method since those are what a developer would change
+    """
+    handler = method = None
+    depth = 0
+    while frame is not None and depth < MAX_STACK_DEPTH:
+        module = frame.f_globals.get("__name__", "")
+        name = frame.f_code.co_name
+        if module.startswith("handlers."):
+            handler = f"{module}.{name}"
+        elif module == "database.models" and not name.startswith("_"):
+            method = f"Database.{name}"
+        frame = frame.f_back
+        depth += 1
+    return handler, method
+
+
+class LoopWatchdog:
+    """
+    Detects callbacks that hold the event loop longer than a threshold
+
+    A task on the loop stamps a heartbeat every interval. A daemon thread
+    checks the stamp; once it is late by more than the threshold the loop is
+    stuck in one callback, so the thread grabs the loop thread's current
+    stack. The stack is logged when the loop recovers, together with how long
+    it was blocked and the handler / Database method found in it.
+    """
+
+    def __init__(
+        self,
+        threshold: float = WATCHDOG_THRESHOLD_MS / 1000,
+        interval: float = HEARTBEAT_INTERVAL,
+    ):
+        self.threshold = threshold
+        self.interval = interval
+        self.blocks = 0
+        self.last_report: Optional[dict] = None
+        self._beat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        # Stack captured during the current block, reported by the loop
+        self._captured: Optional[List[str]] = None
+        self._culprit: Tuple[Optional[str], Optional[str]] = (None, None)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def heartbeat(self):
+        """Stamp heartbeats and measure their lag forever"""
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            self._beat = time.monotonic()
+            await asyncio.sleep(self.interval)
+            lag = max(loop.time() - started - self.interval, 0.0)
+            self._beat = time.monotonic()
+            live_stats.record_loop_lag(lag)
+            if registry.enabled:
+                loop_lag_seconds.observe(lag)
+            if self._captured is not None:
+                self._report(lag)
+
+    def _report(self, lag: float):
+        stack, (handler, method) = self._captured, self._culprit
+        self._captured = None
+        culprit = " → ".join(part for part in (handler, method) if part)
+        culprit = culprit or (stack[0] if stack else "unknown")
+        self.blocks += 1
+        loop_blocked.inc(culprit)
+        self.last_report = {"culprit": culprit, "lag": lag, "stack": stack}
+        logger.warning(
+            f"Event loop blocked for {lag * 1000:.0f} ms by {culprit}\n"
+            + "\n".join(f"  {line}" for line in stack[:LOGGED_STACK_DEPTH])
+        )
+
+    def _watch(self):
+        while not self._stop.wait(self.threshold / 2):
+            late = time.monotonic() - self._beat - self.interval
+            if late < self.threshold or self._captured is not None:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            culprit = find_culprit(frame)
+            stack = []
+            while frame is not None and len(stack) < MAX_STACK_DEPTH:
+                stack.append(describe_frame(frame))
+                frame = frame.f_back
+            # Published last: the loop reports once it sees the stack
+            self._culprit = culprit
+            self._captured = stack
+
+    def start(self):
+        """Start the heartbeat task and the watching thread"""
+        self._loop_thread_id = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.create_task(self.heartbeat())
+        self._thread = threading.Thread(
+            target=self._watch, name="loop-watchdog", daemon=True
+        )
+        self._thread.start()
+
+    async def stop(self):
+        """Stop the heartbeat task and the watching thread"""
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._thread is not None:
+            await asyncio.to_thread(self._thread.join)
+            self._thread = None
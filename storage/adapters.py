@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Adapters storing user groups and FSM state in a key-value store
+"""
+
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import (
+    BaseStorage,
+    DefaultKeyBuilder,
+    KeyBuilder,
+    StateType,
+    StorageKey,
+)
+from storage.backends import KeyValueStore
+from typing import Any, Dict, Optional, Tuple
+import asyncio
+import json
+
+# The database stays the source of truth, cached entries only save a query
+USER_GROUP_TTL = 24 * 3600
+
+
+class UserGroupCache:
+    """
+    Cache of user -> (group_id, group_name) in front of the user_groups table
+
+    Its methods block on the store; handlers reach it through
+    utils.schedule_utils.get_user_group_or_default_async and
+    set_user_group_async, which run in worker threads.
+    """
+
+    def __init__(self, store: KeyValueStore, ttl: int = USER_GROUP_TTL):
+        self.store = store
+        self.ttl = ttl
+
+    @staticmethod
+    def _key(db_path: str, user_id: int) -> str:
+        return f"user_group:{db_path}:{user_id}"
+
+    def get(self, db_path: str, user_id: int) -> Optional[Tuple[int, str]]:
+        """Get the cached group of a user"""
+        value = self.store.get(self._key(db_path, user_id))
+        if value is None:
+            return None
+        group_id, group_name = json.loads(value)
+        return group_id, group_name
+
+    def set(self, db_path: str, user_id: int, group_id: int, group_name: str):
+        """Cache the group of a user"""
+        self.store.set(
+            self._key(db_path, user_id),
+            json.dumps([group_id, group_name], ensure_ascii=False),
+            self.ttl,
+        )
+
+
+class KeyValueFSMStorage(BaseStorage):
+    """
+    aiogram FSM storage on top of a KeyValueStore
+
+    With a RedisStore the state survives restarts and is shared between
+    replicas; with a MemoryStore it behaves like aiogram's MemoryStorage.
+    Store calls block on the network, so they run in worker threads.
+    """
+
+    def __init__(
+        self,
+        store: KeyValueStore,
+        key_builder: Optional[KeyBuilder] = None,
+        state_ttl: Optional[int] = None,
+        data_ttl: Optional[int] = None,
+    ):
+        self.store = store
+        self.key_builder = key_builder or DefaultKeyBuilder(prefix="fsm")
+        self.state_ttl = state_ttl
+        self.data_ttl = data_ttl
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        storage_key = self.key_builder.build(key, "state")
+        if state is None:
+            await asyncio.to_thread(self.store.delete, storage_key)
+            return
+        await asyncio.to_thread(
+            self.store.set,
+            storage_key,
+            state.state if isinstance(state, State) else state,
+            self.state_ttl,
+        )
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        return await asyncio.to_thread(
+            self.store.get, self.key_builder.build(key, "state")
+        )
+
+    async def set_data(self, key: StorageKey, data: Dict[str, Any]) -> None:
+        storage_key = self.key_builder.build(key, "data")
+        if not data:
+            await asyncio.to_thread(self.store.delete, storage_key)
+            return
+        await asyncio.to_thread(
+            self.store.set,
+            storage_key,
+            json.dumps(data, ensure_ascii=False),
+            self.data_ttl,
+        )
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        value = await asyncio.to_thread(
+            self.store.get, self.key_builder.build(key, "data")
+        )
+        return json.loads(value) if value else {}
+
+    async def close(self) -> None:
+        await asyncio.to_thread(self.store.close)
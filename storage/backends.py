@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Key-value store backends: in-process memory and Redis protocol
+"""
+
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+import socket
+import threading
+import time
+
+
+class StoreError(Exception):
+    """Error reported by a store backend"""
+
+
+class KeyValueStore:
+    """Minimal string key-value store with optional expiry"""
+
+    def get(self, key: str) -> Optional[str]:
+        """Get a value, None if missing or expired"""
+        raise NotImplementedError
+
+    def set(self, key: str, value: str, ttl: Optional[int] = None):
+        """Set a value that expires after ttl seconds (never if None)"""
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        """Delete a value"""
+        raise NotImplementedError
+
+    def close(self):
+        """Release resources of the store"""
+
+
+class MemoryStore(KeyValueStore):
+    """Store kept in a dictionary of this process, lost on restart"""
+
+    def __init__(self, max_entries: int = 100000):
+        self.max_entries = max_entries
+        # key: (value, expires_at on the monotonic clock or None)
+        self._data: Dict[str, Tuple[str, Optional[float]]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if entry[1] is not None and entry[1] <= time.monotonic():
+                del self._data[key]
+                return None
+            return entry[0]
+
+    def set(self, key: str, value: str, ttl: Optional[int] = None):
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = (value, expires_at)
+            # Dictionaries keep insertion order, drop the oldest entries
+            while len(self._data) > self.max_entries:
+                del self._data[next(iter(self._data))]
+
+    def delete(self, key: str):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class RedisStore(KeyValueStore):
+    """
+    Store on a Redis-compatible server, shared by replicas and kept over restarts
+
+    Speaks RESP over a single socket guarded by a lock, so no client library
+    is needed. A broken connection is re-opened once per command.
+    """
+
+    def __init__(self, url: str = "redis://localhost:6379/0", timeout: float = 2.0):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.password = parsed.password
+        self.timeout = timeout
+        self._sock: Optional[socket.socket] = None
+        self._file = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        self._sock = socket.create_connection((self.host, self.port), self.timeout)
+        self._file = self._sock.makefile("rb")
+        if self.password:
+            self._send(("AUTH", self.password))
+            self._read_reply()
+        if self.db:
+            self._send(("SELECT", self.db))
+            self._read_reply()
+
+    def _disconnect(self):
+        if self._sock is not None:
+            try:
+                self._file.close()
+                self._sock.close()
+            except OSError:
+                pass
+        self._sock = None
+        self._file = None
+
+    def _send(self, args: tuple):
+        parts = [f"*{len(args)}\r\n".encode()]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode("utf-8")
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        self._sock.sendall(b"".join(parts))
+
+    def _read_reply(self):
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("Connection closed by the server")
+        prefix, payload = line[:1], line[1:-2]
+        if prefix == b"+":
+            return payload.decode("utf-8")
+        if prefix == b"-":
+            raise StoreError(payload.decode("utf-8"))
+        if prefix == b":":
+            return int(payload)
+        if prefix == b"$":
+            length = int(payload)
+            if length < 0:
+                return None
+            return self._file.read(length + 2)[:-2].decode("utf-8")
+        if prefix == b"*":
+            length = int(payload)
+            if length < 0:
+                return None
+            return [self._read_reply() for _ in range(length)]
+        raise StoreError(f"Unexpected reply: {line!r}")
+
+    def command(self, *args):
+        """Run a command and return its decoded reply"""
+        with self._lock:
+            for attempt in range(2):
+                try:
+                    if self._sock is None:
+                        self._connect()
+                    self._send(args)
+                    return self._read_reply()
+                except (OSError, ConnectionError):
+                    self._disconnect()
+                    if attempt:
+                        raise
+
+    def get(self, key: str) -> Optional[str]:
+        return self.command("GET", key)
+
+    def set(self, key: str, value: str, ttl: Optional[int] = None):
+        if ttl:
+            self.command("SET", key, value, "EX", int(ttl))
+        else:
+            self.command("SET", key, value)
+
+    def delete(self, key: str):
+        self.command("DEL", key)
+
+    def close(self):
+        with self._lock:
+            self._disconnect()
+
+
+def create_store(url: str) -> KeyValueStore:
+    """
+    Create a store from a URL
+
+    Args:
+        url (str): "memory://" or "redis://[:password@]host[:port][/db]"
+
+    Returns:
+        KeyValueStore: Store instance
+    """
+    scheme = urlparse(url).scheme
+    if scheme == "memory":
+        return MemoryStore()
+    if scheme == "redis":
+        return RedisStore(url)
+    raise ValueError(f"Unknown storage URL: {url}")
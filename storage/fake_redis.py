@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for a Redis server (GET/SET/DEL/EXPIRE and friends over RESP)
+
+Used by the tests and for local development without a real Redis:
+
+    python -m storage.fake_redis --port 6379
+"""
+
+from fnmatch import fnmatchcase
+from typing import Dict, Optional, Tuple
+import argparse
+import socketserver
+import threading
+import time
+
+
+class FakeRedisServer:
+    """Threaded TCP server keeping data in memory for as long as it runs"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        # key: (value, expires_at on the monotonic clock or None)
+        self.data: Dict[str, Tuple[bytes, Optional[float]]] = {}
+        self.lock = threading.Lock()
+        self.commands = 0
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                while True:
+                    try:
+                        args = server.read_command(self.rfile)
+                    except (ValueError, IndexError):
+                        self.wfile.write(b"-ERR Protocol error\r\n")
+                        return
+                    if args is None:
+                        return
+                    self.wfile.write(server.execute(args))
+
+        self._server = socketserver.ThreadingTCPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"redis://{host}:{port}/0"
+
+    @staticmethod
+    def read_command(rfile) -> Optional[list]:
+        line = rfile.readline()
+        if not line:
+            return None
+        if not line.startswith(b"*"):
+            # Inline command, e.g. from telnet
+            return line.split()
+        args = []
+        for _ in range(int(line[1:-2])):
+            length = int(rfile.readline()[1:-2])
+            args.append(rfile.read(length + 2)[:-2])
+        return args
+
+    def _get(self, key: str) -> Optional[bytes]:
+        entry = self.data.get(key)
+        if entry is None:
+            return None
+        if entry[1] is not None and entry[1] <= time.monotonic():
+            del self.data[key]
+            return None
+        return entry[0]
+
+    def execute(self, args: list) -> bytes:
+        name = args[0].decode().upper()
+        keys = [arg.decode("utf-8") for arg in args[1:]]
+        with self.lock:
+            self.commands += 1
+            if name == "PING":
+                return b"+PONG\r\n"
+            if name in ("SELECT", "AUTH"):
+                return b"+OK\r\n"
+            if name == "GET":
+                value = self._get(keys[0])
+                if value is None:
+                    return b"$-1\r\n"
+                return b"$%d\r\n%s\r\n" % (len(value), value)
+            if name == "SET":
+                expires_at = None
+                options = [option.upper() for option in keys[2:]]
+                if "EX" in options:
+                    expires_at = time.monotonic() + int(
+                        options[options.index("EX") + 1]
+                    )
+                elif "PX" in options:
+                    expires_at = (
+                        time.monotonic() + int(options[options.index("PX") + 1]) / 1000
+                    )
+                self.data[keys[0]] = (args[2], expires_at)
+                return b"+OK\r\n"
+            if name == "DEL":
+                deleted = sum(self.data.pop(key, None) is not None for key in keys)
+                return b":%d\r\n" % deleted
+            if name == "EXISTS":
+                return b":%d\r\n" % sum(self._get(key) is not None for key in keys)
+            if name == "EXPIRE":
+                value = self._get(keys[0])
+                if value is None:
+                    return b":0\r\n"
+                self.data[keys[0]] = (value, time.monotonic() + int(keys[1]))
+                return b":1\r\n"
+            if name == "TTL":
+                if self._get(keys[0]) is None:
+                    return b":-2\r\n"
+                expires_at = self.data[keys[0]][1]
+                if expires_at is None:
+                    return b":-1\r\n"
+                return b":%d\r\n" % int(expires_at - time.monotonic())
+            if name == "KEYS":
+                found = [
+                    key.encode("utf-8")
+                    for key in list(self.data)
+                    if fnmatchcase(key, keys[0]) and self._get(key) is not None
+                ]
+                return b"*%d\r\n" % len(found) + b"".join(
+                    b"$%d\r\n%s\r\n" % (len(key), key) for key in found
+                )
+            if name == "DBSIZE":
+                return b":%d\r\n" % len(self.data)
+            if name == "FLUSHDB":
+                self.data.clear()
+                return b"+OK\r\n"
+        return b"-ERR unknown command '%s'\r\n" % name.encode()
+
+    def start(self) -> "FakeRedisServer":
+        """Serve in a background thread"""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and close the listening socket"""
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local Redis stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6379)
+    args = parser.parse_args()
+
+    server = FakeRedisServer(args.host, args.port)
+    print(f"Serving {server.url}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
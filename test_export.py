@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Test script to verify streaming schedule export
+"""
+
+from database.models import Database
+from utils.export import iter_ics, iter_csv, encode_chunks
+from utils.schedule_utils import (
+    get_semester_bounds,
+    get_semester_key,
+    parse_semester_key,
+)
+from handlers.export import parse_export_args
+from datetime import datetime, date, timedelta
+import csv
+import io
+import os
+import tempfile
+
+
+def populate_semester(db: Database, weeks: int) -> int:
+    """Add a group with two lessons per week for the given number of weeks"""
+    group_id = db.add_group("М8О-207БВ-24", "Computer Science")
+    subject_id = db.add_subject("Математический анализ, часть 1", "MA101")
+    teacher_id = db.add_teacher("Петров Петр Петрович", "Mathematics")
+
+    week_start = date(2025, 9, 1)
+    for week in range(weeks):
+        monday = week_start + timedelta(weeks=week)
+        schedule_id = db.add_schedule(group_id, monday)
+        for day in (0, 2):
+            start = datetime.combine(monday + timedelta(days=day), datetime.min.time())
+            db.add_lesson(
+                schedule_id=schedule_id,
+                subject_id=subject_id,
+                teacher_id=teacher_id,
+                start_time=start.replace(hour=9),
+                end_time=start.replace(hour=10, minute=30),
+                location="ГУК В-221",
+                day_of_week=day,
+            )
+    return group_id
+
+
+def test_export():
+    """Test streaming export functionality"""
+    print("Testing streaming export functionality...")
+
+    # Semester helpers
+    assert get_semester_bounds(date(2025, 10, 6)) == (date(2025, 9, 1), date(2026, 2, 1))
+    assert get_semester_bounds(date(2026, 1, 20)) == (date(2025, 9, 1), date(2026, 2, 1))
+    assert get_semester_bounds(date(2026, 3, 2)) == (date(2026, 2, 1), date(2026, 9, 1))
+    assert get_semester_key(date(2026, 1, 20)) == "2025-autumn"
+    assert parse_semester_key("2026-spring") == (date(2026, 2, 1), date(2026, 9, 1))
+    print("✓ Semester bounds are correct")
+
+    # Command arguments
+    assert parse_export_args("csv М8О-207БВ-24") == ("csv", "М8О-207БВ-24")
+    assert parse_export_args(None)[0] == "ics"
+    print("✓ Export arguments parsed")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "schedule.db"))
+        group_id = populate_semester(db, weeks=18)
+        start, end = parse_semester_key("2025-autumn")
+
+        # Streaming reads in small batches must return every lesson in order
+        lessons = list(db.iter_lessons_for_period(group_id, start, end, batch_size=7))
+        assert len(lessons) == 36, f"Expected 36 lessons, got {len(lessons)}"
+        assert lessons == sorted(lessons, key=lambda lesson: lesson["start_time"])
+        print(f"✓ Streamed {len(lessons)} lessons")
+
+        # A paused stream (e.g. during an upload) does not block writers
+        paused = db.iter_lessons_for_period(group_id, start, end, batch_size=7)
+        assert next(paused)["id"] == lessons[0]["id"]
+        db.set_user_group(42, group_id)
+        rest = [lesson["id"] for lesson in lessons[1:]]
+        assert [lesson["id"] for lesson in paused] == rest
+        print("✓ Writers are not blocked by a paused stream")
+
+        # Other groups do not affect the version
+        version = db.get_period_version(group_id, start, end)
+        populate_semester(db, weeks=1)
+        assert db.get_period_version(group_id, start, end) == version
+        print("✓ Version is stable for other groups' changes")
+
+        # iCalendar output
+        ics = "".join(
+            iter_ics(
+                db.iter_lessons_for_period(group_id, start, end),
+                "М8О-207БВ-24",
+                stamp=datetime(2025, 9, 1),
+            )
+        )
+        assert ics.startswith("BEGIN:VCALENDAR\r\n")
+        assert ics.endswith("END:VCALENDAR\r\n")
+        assert ics.count("BEGIN:VEVENT") == 36
+        assert "DTSTART:20250901T090000" in ics
+        assert "SUMMARY:Математический анализ\\, часть 1" in ics
+        for line in ics.split("\r\n"):
+            assert len(line.encode("utf-8")) <= 75, f"Line is not folded: {line}"
+        print("✓ iCalendar export is valid")
+
+        # CSV output
+        text = "".join(iter_csv(db.iter_lessons_for_period(group_id, start, end)))
+        rows = list(csv.reader(io.StringIO(text)))
+        assert rows[0][0] == "date"
+        assert len(rows) == 37
+        assert rows[1][:3] == ["2025-09-01", "09:00", "10:30"]
+        print("✓ CSV export is valid")
+
+        # Chunking keeps the content intact
+        chunks = list(encode_chunks(iter_csv(lessons), chunk_size=256))
+        assert all(len(chunk) < 256 + 200 for chunk in chunks)
+        assert b"".join(chunks).decode("utf-8") == text
+        print(f"✓ Export encoded into {len(chunks)} chunks")
+
+    print("\nAll tests passed!")
+
+
+if __name__ == "__main__":
+    test_export()
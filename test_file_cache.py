@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the Telegram file_id cache
+"""
+
+from database.models import Database
+from utils.file_cache import FileIdCache, StreamingInputFile
+from datetime import date, timedelta
+from types import SimpleNamespace
+import asyncio
+import os
+import tempfile
+
+
+class FakeSender:
+    """Records what would have been sent to Telegram"""
+
+    def __init__(self):
+        self.uploads = 0
+        self.sent = []
+
+    async def __call__(self, document):
+        if isinstance(document, StreamingInputFile):
+            self.uploads += 1
+            content = b""
+            async for chunk in document.read(None):
+                content += chunk
+            self.sent.append(content)
+            file_id = f"file-{self.uploads}"
+        else:
+            self.sent.append(document)
+            file_id = document
+        return SimpleNamespace(document=SimpleNamespace(file_id=file_id))
+
+
+def test_file_cache():
+    """Test file_id cache functionality"""
+    print("Testing file_id cache functionality...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "schedule.db"))
+        group_id = db.add_group("М8О-207БВ-24", "Computer Science")
+        cache = FileIdCache(db)
+        send = FakeSender()
+
+        generated = []
+
+        def chunks():
+            generated.append(1)
+            return iter([b"BEGIN:VCALENDAR\r\n", b"END:VCALENDAR\r\n"])
+
+        async def scenario():
+            # First request uploads the file
+            await cache.send(send, "export:1:v1", chunks, "a.ics", group_id)
+            assert send.uploads == 1
+            assert send.sent[0] == b"BEGIN:VCALENDAR\r\nEND:VCALENDAR\r\n"
+
+            # Same key is re-sent by file_id
+            await cache.send(send, "export:1:v1", chunks, "a.ics", group_id)
+            assert send.uploads == 1
+            assert send.sent[-1] == "file-1"
+
+            # Content is generated once, while it is uploaded
+            assert len(generated) == 1
+
+            # A new content version is uploaded again
+            await cache.send(send, "export:1:v2", chunks, "a.ics", group_id)
+            assert send.uploads == 2
+            assert send.sent[-1] == b"BEGIN:VCALENDAR\r\nEND:VCALENDAR\r\n"
+
+        asyncio.run(scenario())
+        assert cache.hits == 1 and cache.misses == 2
+        print("✓ Uploads are re-used by key")
+
+        # A fresh process finds the upload in the file_cache table
+        other = FileIdCache(Database(db.db_path))
+        assert other.get("export:1:v1") == "file-1"
+        print("✓ Cache is persisted in the file_cache table")
+
+        # Keys are versioned, so a schedule change deletes nothing
+        db.add_schedule(group_id, date(2025, 9, 1))
+        assert cache.get("export:1:v1") == "file-1"
+        assert db.get_cached_file("export:1:v2") is not None
+        print("✓ Schedule changes leave versioned uploads alone")
+
+        # Old uploads are pruned at most once per interval
+        assert cache.prune() == 0
+        cache.max_age = timedelta(seconds=-60)
+        assert cache.prune() == 0
+        assert cache.prune(force=True) == 2
+        assert cache.get("export:1:v1") is None
+        print("✓ Old uploads are pruned lazily")
+
+    print("\nAll tests passed!")
+
+
+if __name__ == "__main__":
+    test_file_cache()
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the free room index and /free formatting
+"""
+
+from database.models import Database
+from handlers.free_rooms import format_free_rooms_message, parse_free_query
+from utils.room_index import FreeRoomIndex, RoomTimeline
+from utils.time_index import LessonTimeIndex
+from datetime import date, datetime, timedelta
+import os
+import random
+import tempfile
+
+
+def brute_force_free(intervals, start, end):
+    return all(
+        lesson_end <= start or lesson_start >= end
+        for lesson_start, lesson_end, _ in intervals
+    )
+
+
+def test_room_timeline():
+    """Test overlap queries of a room timeline against a brute-force scan"""
+    print("Testing room timeline overlap queries...")
+
+    day = datetime(2025, 10, 6)
+    rng = random.Random(7)
+    timeline = RoomTimeline()
+    intervals = []
+    for _ in range(300):
+        start = day + timedelta(minutes=rng.randrange(0, 7 * 24 * 60, 15))
+        end = start + timedelta(minutes=rng.choice((45, 90, 180, 600)))
+        group_id = rng.randrange(5)
+        timeline.add(start, end, group_id)
+        intervals.append((start, end, group_id))
+
+    assert timeline.starts == sorted(timeline.starts)
+    for _ in range(500):
+        start = day + timedelta(minutes=rng.randrange(0, 7 * 24 * 60, 5))
+        end = start + timedelta(minutes=rng.randrange(5, 240, 5))
+        assert timeline.is_free(start, end) == brute_force_free(intervals, start, end)
+    print("✓ Overlap queries match a brute-force scan, with long lessons too")
+
+    removed = timeline.remove_group(3, day, day + timedelta(days=3))
+    intervals = [
+        interval
+        for interval in intervals
+        if not (interval[2] == 3 and interval[0] < day + timedelta(days=3))
+    ]
+    assert removed > 0 and len(timeline) == len(intervals)
+    for _ in range(500):
+        start = day + timedelta(minutes=rng.randrange(0, 7 * 24 * 60, 5))
+        end = start + timedelta(minutes=rng.randrange(5, 240, 5))
+        assert timeline.is_free(start, end) == brute_force_free(intervals, start, end)
+    print("✓ Removing a group's week keeps queries correct")
+
+    print("\nAll tests passed!")
+
+
+def test_free_room_index():
+    """Test free room lookups and incremental updates from the database"""
+    print("Testing free room index...")
+
+    week_start = date(2025, 10, 6)
+    monday = datetime(2025, 10, 6, 9, 0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "schedule.db"))
+        group_id = db.add_group("М8О-207БВ-24", "Computer Science")
+        other_group = db.add_group("М8О-208БВ-24", "Computer Science")
+        subject_id = db.add_subject("Программирование", "PR101")
+        teacher_id = db.add_teacher("Иванов Иван Иванович", "Programming")
+        schedule_id = db.add_schedule(group_id, week_start)
+        other_schedule = db.add_schedule(other_group, week_start)
+        lesson = (subject_id, teacher_id)
+        db.add_lesson(
+            schedule_id, *lesson, monday, monday + timedelta(minutes=90), "GUK-101", 0
+        )
+        db.add_lesson(
+            other_schedule,
+            *lesson,
+            monday + timedelta(hours=2),
+            monday + timedelta(hours=3, minutes=30),
+            "GUK-102",
+            0,
+        )
+
+        index = FreeRoomIndex(db)
+        assert index.free_rooms(monday, monday + timedelta(minutes=90)) == [
+            ("GUK-102", monday + timedelta(hours=2))
+        ]
+        assert index.free_rooms(
+            monday + timedelta(minutes=90), monday + timedelta(hours=2)
+        ) == [("GUK-101", None), ("GUK-102", monday + timedelta(hours=2))]
+        assert not index.is_free(
+            "GUK-102", monday + timedelta(hours=3), monday + timedelta(hours=4)
+        )
+        assert not index.is_free("GUK-999", monday, monday + timedelta(hours=1))
+        print("✓ Rooms are free only when no lesson overlaps the range")
+
+        db.add_lesson(
+            schedule_id,
+            *lesson,
+            monday + timedelta(hours=2),
+            monday + timedelta(hours=3, minutes=30),
+            "GUK-103",
+            0,
+        )
+        db.replace_week(other_group, week_start, [])
+        rooms = index.free_rooms(
+            monday + timedelta(hours=2), monday + timedelta(hours=3)
+        )
+        assert rooms == [("GUK-101", None), ("GUK-102", None)]
+        assert len(index) == 3
+        print("✓ Changed weeks are applied before the next query")
+
+    print("\nAll tests passed!")
+
+
+def test_first_partial_week():
+    """Test that a semester starting midweek includes its first week's lessons"""
+    print("Testing the first partial week of a semester...")
+
+    # September 1st 2026 is a Tuesday, its week starts on August 31st
+    week_start = date(2026, 8, 31)
+    lesson_start = datetime(2026, 9, 2, 9, 0)
+    lesson_end = lesson_start + timedelta(minutes=90)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "schedule.db"))
+        group_id = db.add_group("М8О-207БВ-24", "Computer Science")
+        subject_id = db.add_subject("Программирование", "PR101")
+        teacher_id = db.add_teacher("Иванов Иван Иванович", "Programming")
+        schedule_id = db.add_schedule(group_id, week_start)
+        monday = datetime(2026, 8, 31, 9, 0)
+        for start in (monday, lesson_start):
+            db.add_lesson(
+                schedule_id,
+                subject_id,
+                teacher_id,
+                start,
+                start + timedelta(minutes=90),
+                "GUK-101",
+                start.weekday(),
+            )
+
+        lessons = list(
+            db.iter_lessons_for_period(group_id, date(2026, 9, 1), date(2027, 2, 1))
+        )
+        assert [lesson["start_time"] for lesson in lessons] == [lesson_start]
+        index = FreeRoomIndex(db)
+        assert not index.is_free("GUK-101", lesson_start, lesson_end)
+        time_index = LessonTimeIndex(db)
+        assert len(time_index.lessons_on(group_id, lesson_start.date())) == 1
+        print("✓ Lessons of the week before the semester start are included")
+
+        version = db.get_period_version(group_id, date(2026, 9, 1), date(2027, 2, 1))
+        moved = lesson_start + timedelta(days=1)
+        db.replace_week(
+            group_id,
+            week_start,
+            [
+                (
+                    subject_id,
+                    teacher_id,
+                    moved,
+                    moved + timedelta(minutes=90),
+                    "GUK-101",
+                    3,
+                )
+            ],
+        )
+        assert index.is_free("GUK-101", lesson_start, lesson_end)
+        assert not index.is_free("GUK-101", moved, moved + timedelta(minutes=90))
+        assert time_index.lessons_on(group_id, lesson_start.date()) == []
+        assert len(time_index.lessons_on(group_id, moved.date())) == 1
+        assert (
+            db.get_period_version(group_id, date(2026, 9, 1), date(2027, 2, 1))
+            != version
+        )
+        print("✓ Changes to that week are applied")
+
+        store = db.enable_memory_store(date(2026, 9, 1), date(2027, 2, 1))
+        served = db.get_schedule_for_week(group_id, week_start)
+        assert store.hits == 1 and [lesson["start_time"] for lesson in served] == [
+            moved
+        ]
+        print("✓ The memory store serves that week")
+
+    print("\nAll tests passed!")
+
+
+def test_free_command_formatting():
+    """Test parsing and formatting of /free"""
+    print("Testing /free parsing and formatting...")
+
+    now = datetime(2025, 10, 6, 10, 17, 42)
+    start, end, room_filter = parse_free_query(None, now)
+    assert start == datetime(2025, 10, 6, 10, 17) and end - start == timedelta(
+        minutes=90
+    )
+    assert room_filter == ""
+    start, end, room_filter = parse_free_query("13:00-14.30 ГУК В", now)
+    assert (start.hour, start.minute, end.hour, end.minute) == (13, 0, 14, 30)
+    assert room_filter == "ГУК В"
+    for invalid in ("25:00", "14:00-13:00"):
+        try:
+            parse_free_query(invalid, now)
+            assert False, invalid
+        except ValueError:
+            pass
+    print("✓ Times, ranges and room filters are parsed")
+
+    message = format_free_rooms_message(
+        [("GUK-101", datetime(2025, 10, 6, 15, 0)), ("GUK-<2>", None)],
+        datetime(2025, 10, 6, 13, 0),
+        datetime(2025, 10, 6, 14, 30),
+    )
+    assert "Свободные аудитории ~ 06.10 13:00-14:30" in message
+    assert "GUK-101 — до 15:00\nGUK-&lt;2&gt; — до конца дня" in message
+    message = format_free_rooms_message(
+        [(f"GUK-{n}", None) for n in range(5)], now, now, shown=3
+    )
+    assert message.count("до конца дня") == 3 and "и ещё 2" in message
+    print("✓ Free rooms are listed with the time they stay free until")
+
+    print("\nAll tests passed!")
+
+
+if __name__ == "__main__":
+    test_room_timeline()
+    test_free_room_index()
+    test_first_partial_week()
+    test_free_command_formatting()
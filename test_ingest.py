@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the timetable ingestion pipeline
+"""
+
+from database.models import Database
+from ingest.loader import Ingester
+from ingest.readers import detect_format, iter_json_array, read_rows
+from ingest.records import parse_row
+from datetime import date, datetime, timedelta
+import csv
+import io
+import json
+import os
+import tempfile
+import time
+
+
+def make_rows(count: int, groups: int = 50):
+    """Lessons of a semester: 4 a day, 6 days a week, for every group"""
+    rows = []
+    semester_start = date(2025, 9, 1)
+    for index in range(count):
+        week, rest = divmod(index, groups * 24)
+        group, slot = divmod(rest, 24)
+        day = semester_start + timedelta(weeks=week, days=slot // 4)
+        hour = 9 + (slot % 4) * 2
+        rows.append(
+            {
+                "group": f"М8О-{100 + group}БВ-24",
+                "subject": f"Предмет {index % 40}",
+                "teacher": f"Преподаватель {index % 30}",
+                "date": day.isoformat(),
+                "start": f"{hour:02d}:00",
+                "end": f"{hour + 1:02d}:30",
+                "location": f"ГУК-{index % 100}",
+            }
+        )
+    return rows
+
+
+def test_ingest():
+    """Test ingestion functionality"""
+    print("Testing ingestion functionality...")
+
+    record = parse_row(
+        {
+            "Группа": " М8О-207БВ-24 ",
+            "Дисциплина": "Программирование",
+            "Преподаватель": "Смирнов  Владимир Владимирович",
+            "Дата": "08.10.2025",
+            "Начало": "09:00",
+            "Окончание": "10:30",
+            "Аудитория": "ГУК-101",
+        }
+    )
+    assert record.group == "М8О-207БВ-24"
+    assert record.teacher == "Смирнов Владимир Владимирович"
+    assert record.start_time == datetime(2025, 10, 8, 9, 0)
+    assert record.week_start == date(2025, 10, 6)
+    record = parse_row(
+        {"group": "A", "subject": "B", "start": "2025-10-08T09:00", "end": "10:30"}
+    )
+    assert record.end_time == datetime(2025, 10, 8, 10, 30)
+    for bad in (
+        {"group": "A", "subject": "B", "date": "2025-10-08", "start": "9:00"},
+        {"group": "A", "date": "2025-10-08", "start": "9:00", "end": "10:00"},
+        {"group": "A", "subject": "B", "start": "2025-10-08T11:00", "end": "10:00"},
+    ):
+        try:
+            parse_row(bad)
+            assert False, bad
+        except ValueError:
+            pass
+    print("✓ Rows are parsed and validated")
+
+    elements = [{"n": index, "text": "x" * index} for index in range(50)]
+    streamed = list(iter_json_array(io.StringIO(json.dumps(elements)), chunk_size=7))
+    assert streamed == elements
+    assert detect_format("semester.XLSX") == "xlsx"
+    print("✓ JSON arrays are streamed in chunks")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "schedule.db"))
+        existing_group = db.add_group("М8О-100БВ-24", "Computer Science")
+        changes = []
+        db.add_change_listener(lambda group_id, week: changes.append((group_id, week)))
+
+        rows = make_rows(240)
+        # Different spellings of known names
+        rows[1]["group"] = "м8о-100бв-24"
+        rows[2]["teacher"] = "  преподаватель   2 "
+        rows[3]["start"] = "later"
+
+        paths = {
+            "json": os.path.join(tmp, "lessons.json"),
+            "jsonl": os.path.join(tmp, "lessons.jsonl"),
+            "csv": os.path.join(tmp, "lessons.csv"),
+        }
+        with open(paths["json"], "w", encoding="utf-8") as file:
+            json.dump(rows[:80], file, ensure_ascii=False)
+        with open(paths["jsonl"], "w", encoding="utf-8") as file:
+            for row in rows[80:160]:
+                file.write(json.dumps(row, ensure_ascii=False) + "\n")
+        with open(paths["csv"], "w", newline="", encoding="utf-8-sig") as file:
+            writer = csv.DictWriter(file, fieldnames=list(rows[0]), delimiter=";")
+            writer.writeheader()
+            writer.writerows(rows[160:])
+
+        ingester = Ingester(db, batch_size=50)
+        for path in paths.values():
+            report = ingester.ingest(read_rows(path))
+        assert report["rows"] == 240
+        assert report["skipped"] == 1
+        assert report["lessons"] == 239
+        assert report["batches"] >= 5
+        assert report["groups"] == 9, report["groups"]
+        assert report["subjects"] == 40
+        assert report["teachers"] == 30
+        assert db.get_group_id_by_name("М8О-100БВ-24") == existing_group
+        print("✓ JSON, JSON Lines and CSV are loaded with deduplicated names")
+
+        lessons = db.get_schedule_for_week(existing_group, date(2025, 9, 1))
+        assert len(lessons) == 23
+        assert lessons[0]["subject_name"] == "Предмет 0"
+        version, _ = db.get_week_version(existing_group, date(2025, 9, 1))
+        assert version >= 1
+        assert (existing_group, date(2025, 9, 1)) in changes
+        print("✓ Loaded weeks are versioned and announced")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        rows = make_rows(3000)
+        rows[10]["end"] = "08:00"
+        weeks = []
+        for workers in (1, 3):
+            db = Database(os.path.join(tmp, f"parallel-{workers}.db"))
+            report = Ingester(db, batch_size=700).ingest(
+                rows, workers=workers, chunk_size=200
+            )
+            assert report["rows"] == 3000 and report["skipped"] == 1
+            assert report["lessons"] == 2999
+            # Ids depend on the order names were met, so compare content
+            weeks.append(
+                [
+                    [
+                        (
+                            lesson["subject_name"],
+                            lesson["teacher_name"],
+                            lesson["start_time"],
+                            lesson["location"],
+                        )
+                        for lesson in db.get_schedule_for_week(
+                            group_id, date(2025, 9, 1)
+                        )
+                    ]
+                    for group_id, _, _ in sorted(
+                        db.get_all_groups(), key=lambda group: group[1]
+                    )
+                ]
+            )
+        assert weeks[0] == weeks[1]
+        print("✓ Parallel parsing writes the same weeks as serial parsing")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "schedule.db"))
+        rows = make_rows(240, groups=5)
+        Ingester(db, batch_size=50).ingest(rows)
+        group_id = db.get_group_id_by_name(rows[0]["group"])
+        week_start = date(2025, 9, 1)
+        other = db.get_schedule_for_week(group_id, week_start + timedelta(weeks=1))
+        changes = []
+        db.add_change_listener(lambda *change: changes.append(change))
+        # The first lesson moves an hour later and the second is cancelled
+        rows[0] = dict(rows[0], start="10:00", end="11:30")
+        del rows[1]
+        report = Ingester(db, batch_size=50).ingest(rows)
+        assert report["lessons"] == 23
+        lessons = db.get_schedule_for_week(group_id, week_start)
+        assert len(lessons) == 23
+        starts = [lesson["start_time"] for lesson in lessons]
+        assert datetime(2025, 9, 1, 9, 0) not in starts
+        assert datetime(2025, 9, 1, 10, 0) in starts
+        assert datetime(2025, 9, 1, 11, 0) not in starts
+        assert changes == [(group_id, week_start)]
+        assert (
+            db.get_schedule_for_week(group_id, week_start + timedelta(weeks=1))
+            == other
+        )
+        rows[0] = dict(rows[0], start="12:00", end="13:30")
+        Ingester(db, replace=False).ingest(rows)
+        assert len(db.get_schedule_for_week(group_id, week_start)) == 24
+        print("✓ Re-imports replace whole weeks, --no-replace only adds")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "schedule.db"))
+        count = 20000
+        started = time.perf_counter()
+        report = Ingester(db).ingest(make_rows(count))
+        elapsed = time.perf_counter() - started
+        assert report["lessons"] == count
+        rate = count / elapsed
+        # A 100k-lesson semester has to load in well under a minute
+        assert rate > 100000 / 30, rate
+        print(f"✓ Throughput {rate:,.0f} lessons/s ({100000 / rate:.1f} s per 100k)")
+
+    print("\nAll tests passed!")
+
+
+if __name__ == "__main__":
+    test_ingest()
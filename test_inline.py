@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Test script to verify inline schedule queries and the rendered week cache
+"""
+
+from database.models import Database
+from handlers.inline import build_inline_results, INLINE_LATENCY_TARGET_MS
+from utils.schedule_utils import week_cache, get_current_week_start
+from datetime import datetime, timedelta
+import os
+import tempfile
+import time
+
+
+def test_inline():
+    """Test inline query functionality"""
+    print("Testing inline query functionality...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "schedule.db"))
+        group_id = db.add_group("М8О-207БВ-24", "Computer Science")
+        for number in range(200):
+            db.add_group(f"М8О-{number:03d}БВ-25", "Computer Science")
+        subject_id = db.add_subject("Программирование", "PR101")
+        teacher_id = db.add_teacher("Смирнов Владимир Владимирович", "Programming")
+
+        week_start = get_current_week_start()
+        schedule_id = db.add_schedule(group_id, week_start)
+        monday = datetime.combine(week_start, datetime.min.time())
+        db.add_lesson(
+            schedule_id,
+            subject_id,
+            teacher_id,
+            monday.replace(hour=9),
+            monday.replace(hour=10, minute=30),
+            "ГУК В-221",
+            0,
+        )
+
+        # Exact group name gives current and next week
+        results = build_inline_results("м8о-207бв-24", db)
+        assert len(results) == 2, f"Expected 2 results, got {len(results)}"
+        assert results[0].title.startswith("М8О-207БВ-24")
+        assert "Программирование" in results[0].input_message_content.message_text
+        assert results[0].id != results[1].id
+        assert all(len(result.id) <= 64 for result in results)
+        print("✓ Current and next week returned for the group")
+
+        # Ambiguous query is limited to a few groups
+        results = build_inline_results("БВ-25", db)
+        assert 0 < len(results) <= 10
+        print(f"✓ Ambiguous query returned {len(results)} results")
+
+        # Warm queries are served from the rendered week cache
+        build_inline_results("М8О-207БВ-24", db)
+        hits = week_cache.hits
+        started = time.perf_counter()
+        build_inline_results("М8О-207БВ-24", db)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        assert week_cache.hits == hits + 2, "Both weeks should come from the cache"
+        assert (
+            elapsed_ms < INLINE_LATENCY_TARGET_MS
+        ), f"Inline query took {elapsed_ms:.1f} ms"
+        print(f"✓ Warm inline query took {elapsed_ms:.2f} ms")
+
+        # A schedule change is visible immediately
+        db.add_lesson(
+            schedule_id,
+            subject_id,
+            teacher_id,
+            monday.replace(hour=13) + timedelta(days=1),
+            monday.replace(hour=14, minute=30) + timedelta(days=1),
+            "ГУК Б-638",
+            1,
+        )
+        results = build_inline_results("М8О-207БВ-24", db)
+        assert "ГУК Б-638" in results[0].input_message_content.message_text
+        print("✓ Cache is refreshed after a schedule change")
+
+        # New groups are found right away
+        db.add_group("М8О-999БВ-24", "Computer Science")
+        assert build_inline_results("М8О-999БВ-24", db)[0].title.startswith(
+            "М8О-999БВ-24"
+        )
+        print("✓ Group index is refreshed after a group is added")
+
+    print("\nAll tests passed!")
+
+
+if __name__ == "__main__":
+    test_inline()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Test script to verify shared subject, teacher and room strings in query results
+"""
+
+from database.interning import (
+    NameTable,
+    location_names,
+    subject_names,
+    teacher_names,
+)
+from database.models import Database
+from handlers.admin import format_stats
+from ingest.loader import Ingester
+from test_ingest import make_rows
+from datetime import date, datetime, timedelta
+import os
+import tempfile
+
+
+def test_name_table():
+    """Test sharing and renames in a name table"""
+    print("Testing name table...")
+
+    table = NameTable("subjects")
+    first = table.get(1, "".join(["Программи", "рование"]))
+    second = table.get(1, "".join(["Программиро", "вание"]))
+    assert first == second and first is second
+    assert table.shared == 1 and len(table) == 1
+    renamed = table.get(1, "Программирование на C")
+    assert renamed == "Программирование на C"
+    assert table.get(1, "".join(["Программирование", " на C"])) is renamed
+    assert table.get(2, None) is None and len(table) == 1
+    print("✓ Equal names of an id share one string, renames replace it")
+
+    assert table.intern("ГУК-101") is table.intern("".join(["ГУК", "-101"]))
+    table.enabled = False
+    copy = "".join(["ГУК", "-101"])
+    assert table.intern(copy) is copy
+    assert table.memory_usage() > 0
+    table.clear()
+    assert len(table) == 0 and table.shared == 0
+    print("✓ Values without an id are shared, disabled tables pass values through")
+
+    print("\nAll tests passed!")
+
+
+def test_shared_query_results():
+    """Test that query results share name strings"""
+    print("Testing shared strings in query results...")
+
+    week_start = date(2025, 9, 1)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "schedule.db"))
+        Ingester(db).ingest(make_rows(2 * 10 * 24, groups=10))
+        groups = [row[0] for row in db.get_all_groups()]
+
+        lessons = [
+            lesson
+            for group_id in groups
+            for lesson in db.get_schedule_for_week(group_id, week_start)
+        ]
+        lessons += list(
+            db.iter_lessons_for_period(
+                groups[0], week_start, week_start + timedelta(weeks=2)
+            )
+        )
+        teacher_id = db.get_all_teachers()[0][0]
+        lessons += db.get_teacher_schedule_for_week(teacher_id, week_start)
+        lessons += db.get_lessons_starting_between(
+            datetime(2025, 9, 1), datetime(2025, 9, 15), groups
+        )
+
+        for field, distinct in (
+            ("subject_name", 40),
+            ("teacher_name", 30),
+            ("location", 100),
+        ):
+            names = {lesson[field] for lesson in lessons}
+            objects = {id(lesson[field]) for lesson in lessons}
+            assert len(names) == len(objects) == distinct, field
+        assert len(subject_names) >= 40 and len(teacher_names) >= 30
+        assert len(location_names) >= 100
+        print("✓ Every distinct name is one object across all results")
+
+        subject_id = db.get_all_subjects()[0][0]
+        code = db.get_all_subjects()[0][2]
+        db.add_subject("Новое название", code)
+        renamed = {
+            lesson["subject_name"]
+            for group_id in groups
+            for lesson in db.get_schedule_for_week(group_id, week_start)
+        }
+        assert "Новое название" in renamed
+        assert subject_names.get(subject_id, "Новое название") == "Новое название"
+        print("✓ Renamed subjects are picked up")
+
+        assert "Общие строки: " in format_stats()
+        print("✓ /stats shows the table sizes")
+
+    print("\nAll tests passed!")
+
+
+if __name__ == "__main__":
+    test_name_table()
+    test_shared_query_results()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Test script to verify cache invalidation between processes
+"""
+
+from database.models import Database
+from services.invalidation import (
+    ChangeLogChannel,
+    UnixSocketChannel,
+    InvalidationBus,
+)
+from utils.schedule_utils import week_cache, get_week_schedule, get_current_week_start
+from datetime import datetime, date, timedelta
+import asyncio
+import os
+import tempfile
+import threading
+
+
+def test_invalidation():
+    """Test cache invalidation functionality"""
+    print("Testing cache invalidation functionality...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "schedule.db")
+        # Two Database instances on one file behave like two processes
+        bot_db = Database(path)
+        importer_db = Database(path)
+        assert bot_db.origin != importer_db.origin
+
+        group_id = importer_db.add_group("М8О-207БВ-24", "Computer Science")
+        channel = ChangeLogChannel(bot_db)
+        assert channel.poll() == []
+        print("✓ Change log channel starts at the end of the log")
+
+        received = []
+        bot_db.add_change_listener(lambda *key: received.append(key))
+        bus = InvalidationBus(bot_db, [channel])
+
+        # Render a week in the bot process
+        week_start = get_current_week_start()
+        schedule_id = importer_db.add_schedule(group_id, week_start)
+        bus.poll()
+        get_week_schedule(group_id, bot_db, 0, "М8О-207БВ-24")
+        key = (bot_db.db_path, group_id, week_start, "М8О-207БВ-24")
+        assert key in week_cache._entries
+
+        # The importer adds a lesson, the bot picks it up on the next poll
+        subject_id = importer_db.add_subject("Программирование", "PR101")
+        teacher_id = importer_db.add_teacher("Смирнов В.В.", "Programming")
+        start = datetime.combine(week_start, datetime.min.time()) + timedelta(hours=9)
+        received.clear()
+        importer_db.add_lesson(
+            schedule_id,
+            subject_id,
+            teacher_id,
+            start,
+            start + timedelta(minutes=90),
+            "GUK-101",
+            "Monday",
+        )
+        assert bus.poll() == 1
+        assert received == [(group_id, week_start)]
+        assert key not in week_cache._entries
+        print("✓ Changes of another process reach the listeners and the week cache")
+
+        # Own changes are not replayed
+        received.clear()
+        bot_db.add_schedule(group_id, week_start + timedelta(days=7))
+        received.clear()
+        assert bus.poll() == 0
+        assert received == []
+        print("✓ Own changes are skipped")
+
+        # Old entries are pruned
+        channel.keep = 5
+        for week in range(12):
+            importer_db.add_schedule(group_id, date(2026, 2, 2) + timedelta(weeks=week))
+        assert bus.poll() == 12
+        first_id, last_id = bot_db.get_change_log_bounds()
+        assert last_id - first_id + 1 == 5
+        print("✓ Change log is pruned")
+
+        # The running bus reads the channels in a worker thread and replays
+        # the changes to the listeners on the event loop
+        threads = []
+        bot_db.add_change_listener(
+            lambda *key: threads.append(threading.current_thread())
+        )
+        log_channel = ChangeLogChannel(bot_db)
+        read_threads = []
+        read_log = log_channel.poll
+
+        def traced_poll():
+            read_threads.append(threading.current_thread())
+            return read_log()
+
+        log_channel.poll = traced_poll
+        running_bus = InvalidationBus(bot_db, [log_channel], 0.01)
+
+        async def run_bus():
+            running_bus.start()
+            importer_db.add_schedule(group_id, date(2026, 5, 4))
+            for _ in range(200):
+                if running_bus.received:
+                    break
+                await asyncio.sleep(0.01)
+            await running_bus.stop()
+
+        asyncio.run(run_bus())
+        assert running_bus.received == 1
+        assert threads == [threading.main_thread()]
+        assert read_threads and threading.main_thread() not in read_threads
+        print("✓ The running bus reads off the event loop and replays on it")
+
+        # Unix socket broadcast
+        socket_dir = os.path.join(tmp, "sockets")
+        first = UnixSocketChannel(socket_dir, "first")
+        second = UnixSocketChannel(socket_dir, "second")
+        third = UnixSocketChannel(socket_dir, "third")
+        third.close()
+        first.publish(group_id, week_start)
+        first.publish(group_id, None)
+        assert second.poll() == [(group_id, week_start), (group_id, None)]
+        assert first.poll() == []
+        print("✓ Unix socket channel broadcasts to other processes")
+
+        # Dead sockets are removed on publish
+        open(os.path.join(socket_dir, "dead.sock"), "w").close()
+        first.publish(group_id, week_start)
+        assert not os.path.exists(os.path.join(socket_dir, "dead.sock"))
+        assert second.poll() == [(group_id, week_start)]
+        print("✓ Sockets of dead processes are removed")
+
+        # The bus publishes local writes but does not echo replayed ones
+        socket_bus = InvalidationBus(bot_db, [first])
+        bot_db.add_schedule(group_id, date(2026, 6, 1))
+        assert second.poll() == [(group_id, date(2026, 6, 1))]
+        second.publish(group_id, date(2026, 6, 8))
+        assert socket_bus.poll() == 1
+        assert second.poll() == []
+        print("✓ Replayed changes are not echoed")
+
+        first.close()
+        second.close()
+
+    print("\nAll tests passed!")
+
+
+if __name__ == "__main__":
+    test_invalidation()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the in-memory columnar store behind get_schedule_for_week
+"""
+
+from database.models import Database
+from handlers.admin import format_stats
+from ingest.loader import Ingester
+from test_ingest import make_rows
+from datetime import date, datetime, timedelta
+import os
+import tempfile
+
+
+def sql_week(db: Database, group_id: int, week_start: date):
+    store, db.memory_store = db.memory_store, None
+    try:
+        return db.get_schedule_for_week(group_id, week_start)
+    finally:
+        db.memory_store = store
+
+
+def test_memory_store():
+    """Test serving weeks from the columnar store"""
+    print("Testing memory store functionality...")
+
+    semester = (date(2025, 9, 1), date(2026, 2, 1))
+    weeks = [semester[0] + timedelta(weeks=week) for week in range(4)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "schedule.db"))
+        Ingester(db).ingest(make_rows(4 * 10 * 24, groups=10))
+        groups = [row[0] for row in db.get_all_groups()]
+        store = db.enable_memory_store(*semester)
+
+        assert len(store) == 960
+        for group_id in groups:
+            for week_start in weeks + [date(2025, 12, 1)]:
+                assert db.get_schedule_for_week(group_id, week_start) == sql_week(
+                    db, group_id, week_start
+                )
+        assert store.hits == len(groups) * 5 and store.misses == 0
+        assert db.get_schedule_for_week(groups[0], date(2026, 3, 2)) == []
+        assert store.hits == len(groups) * 5
+        print("✓ Weeks served from memory equal the SQLite results")
+
+        usage = store.columns.memory_usage()
+        assert usage["rows"] == 960 and usage["columns"] == 960 * 34
+        assert len(store.columns.subject_names) == 40
+        assert usage["total"] < 960 * 200
+        assert "Семестр в памяти: 100% (50/50), 960 занятий" in format_stats(
+            memory_store=store
+        )
+        print(f"✓ {usage['total'] / 960:.0f} bytes per lesson in memory")
+
+        group_id, week_start = groups[0], weeks[1]
+        lessons = sql_week(db, group_id, week_start)
+        moved = datetime.combine(week_start, datetime.min.time()) + timedelta(
+            days=5, hours=18, seconds=30
+        )
+        db.replace_week(
+            group_id,
+            week_start,
+            [(1, 1, moved, moved + timedelta(minutes=90), "ГУК-1", 5)],
+        )
+        served = db.get_schedule_for_week(group_id, week_start)
+        assert served == sql_week(db, group_id, week_start)
+        assert len(served) == 1 and served[0]["start_time"] == moved
+        assert store.misses == 1 and len(lessons) == 24
+        print("✓ Changed weeks are read from SQLite until the next rebuild")
+
+        store.load()
+        assert store.rebuilds == 2
+        assert db.get_schedule_for_week(group_id, week_start) == served
+        # Seconds do not fit the minute columns, so the week stays in SQLite
+        assert store.misses == 2
+        other_week = db.get_schedule_for_week(groups[1], week_start)
+        assert other_week == sql_week(db, groups[1], week_start)
+        assert store.hits > len(groups) * 5
+        print("✓ Rebuilds pick up changes, unsupported weeks stay in SQLite")
+
+        store.max_dirty_weeks = 0
+        db.replace_week(groups[2], weeks[2], [])
+        hits = store.hits
+        assert db.get_schedule_for_week(groups[2], weeks[2]) == []
+        store.wait_for_rebuild(10)
+        assert store.rebuilds == 3
+        assert db.get_schedule_for_week(groups[2], weeks[2]) == []
+        assert store.hits == hits + 1
+        print("✓ Too many changed weeks start a background rebuild")
+
+    print("\nAll tests passed!")
+
+
+if __name__ == "__main__":
+    test_memory_store()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Test script to verify metrics, spans and the Prometheus endpoint
+"""
+
+from aiogram.types import InlineQuery, Update, User
+from database.models import Database
+from middlewares.timing import (
+    TimingMiddleware,
+    RequestTimingMiddleware,
+    handler_seconds,
+    handler_errors,
+    update_seconds,
+    api_seconds,
+)
+from utils.metrics import (
+    registry,
+    span,
+    traced,
+    db_call_seconds,
+    span_seconds,
+    start_metrics_server,
+)
+from utils.schedule_utils import format_schedule_message
+from datetime import date
+import aiohttp
+import asyncio
+import os
+import tempfile
+import time
+
+
+class FakeHandlerObject:
+    def __init__(self, callback):
+        self.callback = callback
+
+
+async def today_handler(event, data):
+    return "handled"
+
+
+async def failing_handler(event, data):
+    raise ValueError("boom")
+
+
+class SendMessage:
+    """Stands in for an aiogram method object"""
+
+
+def test_metrics():
+    """Test metrics functionality"""
+    print("Testing metrics functionality...")
+
+    registry.reset()
+    registry.enabled = False
+
+    @traced("noop")
+    def noop():
+        return 1
+
+    # Disabled: nothing is recorded and the overhead is one attribute check
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "schedule.db"))
+        db.get_all_groups()
+        with span("block"):
+            pass
+        assert db_call_seconds.count("get_all_groups") == 0
+        assert span_seconds.count("block") == 0
+
+        calls = 100000
+        started = time.perf_counter()
+        for _ in range(calls):
+            noop()
+        per_call = (time.perf_counter() - started) / calls
+        assert per_call < 5e-6, per_call
+        print(f"✓ Disabled tracing records nothing ({per_call * 1e9:.0f} ns per call)")
+
+        registry.enabled = True
+        try:
+            db.get_all_groups()
+            format_schedule_message([], date(2025, 10, 6), 0, "М8О-207БВ-24")
+            with span("block"):
+                pass
+            assert db_call_seconds.count("get_all_groups") == 1
+            assert span_seconds.count("format_schedule_message") == 1
+            assert span_seconds.count("block") == 1
+            print("✓ Database calls and formatting are traced")
+
+            async def check_middlewares():
+                middleware = TimingMiddleware()
+                update = Update(
+                    update_id=1,
+                    inline_query=InlineQuery(
+                        id="1",
+                        from_user=User(id=1, is_bot=False, first_name="Иван"),
+                        query="М8О",
+                        offset="",
+                    ),
+                )
+                assert await middleware(today_handler, update, {}) == "handled"
+                data = {"handler": FakeHandlerObject(today_handler)}
+                assert await middleware(today_handler, object(), data) == "handled"
+                data = {"handler": FakeHandlerObject(failing_handler)}
+                try:
+                    await middleware(failing_handler, object(), data)
+                    assert False, "exception was swallowed"
+                except ValueError:
+                    pass
+
+                async def make_request(bot, method):
+                    return "ok"
+
+                request_middleware = RequestTimingMiddleware()
+                assert await request_middleware(make_request, None, SendMessage())
+
+            asyncio.run(check_middlewares())
+            assert update_seconds.count("inline_query") == 1
+            assert handler_seconds.count("today_handler") == 1
+            assert handler_seconds.count("failing_handler") == 1
+            assert handler_errors.value("failing_handler") == 1
+            assert api_seconds.count("SendMessage") == 1
+            assert handler_seconds.quantile(0.95, "today_handler") is not None
+            print("✓ Updates, handlers and Bot API requests are timed")
+
+            async def scrape():
+                runner = await start_metrics_server("127.0.0.1", 0)
+                try:
+                    host, port = runner.addresses[0][:2]
+                    async with aiohttp.ClientSession() as session:
+                        async with session.get(f"http://{host}:{port}/metrics") as r:
+                            assert r.status == 200
+                            return await r.text()
+                finally:
+                    await runner.cleanup()
+
+            text = asyncio.run(scrape())
+            assert "# TYPE bot_handler_seconds histogram" in text
+            assert 'bot_handler_seconds_count{handler="today_handler"} 1' in text
+            assert (
+                'bot_handler_seconds_bucket{handler="today_handler",le="+Inf"} 1'
+                in text
+            )
+            assert 'bot_handler_errors_total{handler="failing_handler"} 1' in text
+            assert 'db_call_seconds_count{method="get_all_groups"} 1' in text
+            print("✓ Prometheus endpoint serves the metrics")
+        finally:
+            registry.enabled = False
+            registry.reset()
+
+    print("\nAll tests passed!")
+
+
+if __name__ == "__main__":
+    test_metrics()
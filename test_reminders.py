@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the lesson reminder scheduler
+"""
+
+from aiogram.exceptions import TelegramForbiddenError
+from aiogram.methods import SendMessage
+from database.models import Database
+from services.reminders import ReminderScheduler, RateLimitedSender
+from datetime import datetime, date, timedelta
+import asyncio
+import os
+import tempfile
+import time
+
+
+class FakeSender:
+    """Collects queued messages instead of sending them"""
+
+    def __init__(self):
+        self.messages = []
+
+    async def put(self, chat_id, text, on_forbidden=None):
+        self.messages.append((chat_id, text))
+
+
+class FakeBot:
+    """Records send_message calls with their time"""
+
+    def __init__(self):
+        self.calls = []
+
+    async def send_message(self, chat_id, text):
+        self.calls.append((time.perf_counter(), chat_id))
+
+
+class BlockedBot:
+    """Fails every send as if the bot was removed from the chat"""
+
+    async def send_message(self, chat_id, text):
+        raise TelegramForbiddenError(
+            method=SendMessage(chat_id=chat_id, text=text),
+            message="Forbidden: bot was kicked from the group chat",
+        )
+
+
+class Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_reminders():
+    """Test reminder scheduler functionality"""
+    print("Testing reminder scheduler functionality...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "schedule.db"))
+        group_id = db.add_group("М8О-207БВ-24", "Computer Science")
+        other_group_id = db.add_group("М8О-208БВ-24", "Computer Science")
+        subject_id = db.add_subject("Программирование", "PR101")
+        teacher_id = db.add_teacher("Смирнов Владимир Владимирович", "Programming")
+
+        schedule_id = db.add_schedule(group_id, date(2025, 10, 6))
+        monday = datetime(2025, 10, 6)
+        for hour in (9, 11, 13):
+            db.add_lesson(
+                schedule_id,
+                subject_id,
+                teacher_id,
+                monday.replace(hour=hour),
+                monday.replace(hour=hour) + timedelta(minutes=90),
+                "ГУК В-221",
+                0,
+            )
+
+        # Three users of the first group, one of them with a longer lead time
+        for user_id, minutes_before in ((1, 15), (2, 15), (3, 60)):
+            db.set_user_group(user_id, group_id)
+            db.set_reminder(user_id, user_id, minutes_before)
+        # A user of a group without lessons
+        db.set_user_group(4, other_group_id)
+        db.set_reminder(4, 4, 15)
+
+        clock = Clock(monday.replace(hour=7))
+        sender = FakeSender()
+        scheduler = ReminderScheduler(db, sender, timedelta(hours=1), clock)
+
+        async def run_until(moment):
+            while clock.now < moment:
+                clock.now = min(clock.now + timedelta(minutes=5), moment)
+                await scheduler.tick()
+
+        asyncio.run(run_until(monday.replace(hour=8, minute=50)))
+        # 8:00 (60 min before 9:00) and 8:45 (15 min before 9:00)
+        assert sorted(chat for chat, _ in sender.messages) == [1, 2, 3]
+        assert all("Программирование" in text for _, text in sender.messages)
+        assert len(scheduler._heap) < 10, "Heap holds entries per lesson, not per user"
+        print("✓ Reminders sent to every subscriber at the right time")
+
+        # Restart: a new scheduler resumes from the persisted cursor
+        assert db.get_reminder_cursor() == monday.replace(hour=8, minute=45)
+        sender = FakeSender()
+        scheduler = ReminderScheduler(db, sender, timedelta(hours=1), clock)
+        asyncio.run(run_until(monday.replace(hour=8, minute=55)))
+        assert sender.messages == [], "Nothing should be sent twice after a restart"
+
+        # Reminders missed while the bot was down are still sent
+        clock.now = monday.replace(hour=10, minute=50)
+        scheduler = ReminderScheduler(db, sender, timedelta(hours=1), clock)
+        asyncio.run(scheduler.tick())
+        assert sorted(chat for chat, _ in sender.messages) == [1, 2, 3]
+        print("✓ Cursor survives restarts")
+
+        # Unsubscribing takes effect after invalidation
+        db.delete_reminder(1)
+        scheduler.invalidate()
+        sender.messages.clear()
+        asyncio.run(run_until(monday.replace(hour=12, minute=50)))
+        assert sorted(chat for chat, _ in sender.messages) == [2, 3]
+        print("✓ Subscription changes picked up")
+
+    # Rate-limited sending
+    async def send_burst():
+        bot = FakeBot()
+        limited = RateLimitedSender(bot, rate=200)
+        task = asyncio.create_task(limited.run())
+        for chat_id in range(20):
+            await limited.put(chat_id, "test")
+        await limited.queue.join()
+        task.cancel()
+        return bot.calls
+
+    calls = asyncio.run(send_burst())
+    assert [chat for _, chat in calls] == list(range(20))
+    elapsed = calls[-1][0] - calls[0][0]
+    assert elapsed >= 19 / 200 * 0.9, f"Sent too fast: {elapsed:.3f} s"
+    print(f"✓ 20 messages sent in {elapsed * 1000:.0f} ms at 200 msg/s")
+
+    # Unreachable chats are cleaned up by the service that queued the message
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "schedule.db"))
+        group_id = db.add_group("М8О-207БВ-24", "Computer Science")
+        db.set_user_group(5, group_id)
+        # A /remind made in a group chat, and a change subscription in private
+        db.set_reminder(5, -100500, 15)
+        db.set_change_subscription(5, 5)
+
+        async def send_blocked():
+            limited = RateLimitedSender(BlockedBot(), rate=200)
+            task = asyncio.create_task(limited.run())
+            await limited.put(-100500, "test", on_forbidden=db.delete_chat_reminders)
+            await limited.queue.join()
+            task.cancel()
+            return limited.failed
+
+        assert asyncio.run(send_blocked()) == 1
+        assert db.get_reminder_subscribers() == []
+        assert db.get_change_subscribers(group_id) == [5]
+        print("✓ Reminders of a chat that removed the bot are deleted by chat")
+
+    print("\nAll tests passed!")
+
+
+if __name__ == "__main__":
+    test_reminders()
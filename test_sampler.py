@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the sampling profiler
+"""
+
+from utils.sampler import (
+    SamplingProfiler,
+    _signal_tasks,
+    install_profile_signal,
+    profile_for,
+)
+import asyncio
+import os
+import signal
+import tempfile
+import time
+
+
+def busy_loop(seconds):
+    deadline = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < deadline:
+        total += 1
+    return total
+
+
+def test_sampler():
+    """Test sampling profiler functionality"""
+    print("Testing sampling profiler functionality...")
+
+    profiler = SamplingProfiler(interval=0.002)
+    profiler.start()
+    busy_loop(0.3)
+    profiler.stop()
+    assert profiler.samples > 10
+    collapsed = profiler.collapsed()
+    busy_lines = [line for line in collapsed.splitlines() if "busy_loop" in line]
+    assert busy_lines
+    stack, count = busy_lines[0].rsplit(" ", 1)
+    assert stack.startswith("MainThread;") and int(count) > 0
+    assert "sampling-profiler" not in collapsed
+    print(f"✓ {profiler.samples} samples, busy function found in collapsed stacks")
+
+    with tempfile.TemporaryDirectory() as tmp:
+
+        async def run():
+            task = asyncio.create_task(profile_for(0.3, tmp, interval=0.002))
+            await asyncio.sleep(0.05)
+            # A second profile is refused while one runs
+            try:
+                await profile_for(0.1, tmp)
+                assert False, "second profile was started"
+            except RuntimeError:
+                pass
+            await asyncio.to_thread(busy_loop, 0.1)
+            return await task
+
+        path = asyncio.run(run())
+        assert os.path.exists(path) and path.endswith(".collapsed")
+        with open(path, encoding="utf-8") as file:
+            assert "busy_loop" in file.read()
+        print("✓ profile_for writes a collapsed-stack file")
+
+        async def run_signal():
+            install_profile_signal(0.1, tmp)
+            os.kill(os.getpid(), signal.SIGUSR2)
+            await asyncio.sleep(0.05)
+            # The running profile is referenced until it finishes
+            assert len(_signal_tasks) == 1
+            await asyncio.sleep(0.45)
+            assert not _signal_tasks
+            asyncio.get_running_loop().remove_signal_handler(signal.SIGUSR2)
+
+        before = len(os.listdir(tmp))
+        time.sleep(1)  # file names have one-second resolution
+        asyncio.run(run_signal())
+        assert len(os.listdir(tmp)) == before + 1
+        print("✓ SIGUSR2 starts a profile")
+
+    print("\nAll tests passed!")
+
+
+if __name__ == "__main__":
+    test_sampler()
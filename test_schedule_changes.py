@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Test script to verify schedule change detection and notifications
+"""
+
+from database.models import Database
+from services.change_notifier import ScheduleChangeNotifier, format_changes_message
+from utils.schedule_diff import (
+    ADDED,
+    REMOVED,
+    MOVED,
+    CHANGED,
+    diff_weeks,
+)
+from utils.schedule_utils import get_current_week_start
+from datetime import datetime, timedelta
+import asyncio
+import os
+import tempfile
+
+
+class FakeSender:
+    """Collects queued messages instead of sending them"""
+
+    def __init__(self):
+        self.messages = []
+
+    async def put(self, chat_id, text, on_forbidden=None):
+        self.messages.append((chat_id, text))
+
+
+def make_lesson(subject, start, location="GUK-101", teacher="Смирнов В.В."):
+    return {
+        "subject_name": subject,
+        "teacher_name": teacher,
+        "start_time": start,
+        "end_time": start + timedelta(minutes=90),
+        "location": location,
+        "day_of_week": start.strftime("%A"),
+    }
+
+
+def test_schedule_changes():
+    """Test schedule change detection functionality"""
+    print("Testing schedule change detection functionality...")
+
+    monday = datetime(2025, 10, 6, 9, 0)
+    math = make_lesson("Математика", monday)
+    physics = make_lesson("Физика", monday + timedelta(hours=2))
+    history = make_lesson("История", monday + timedelta(days=1))
+
+    # Unchanged weeks produce no diff
+    assert diff_weeks([math, physics], [physics, math]) == []
+    print("✓ Identical weeks produce no changes")
+
+    changed_room = make_lesson("Математика", monday, location="GUK-202")
+    moved_physics = make_lesson("Физика", monday + timedelta(days=2))
+    new_lesson = make_lesson("Английский", monday + timedelta(days=3))
+    changes = diff_weeks(
+        [math, physics, history], [changed_room, moved_physics, new_lesson]
+    )
+    kinds = sorted(kind for kind, _, _ in changes)
+    assert kinds == sorted([CHANGED, MOVED, REMOVED, ADDED]), changes
+    assert (CHANGED, math, changed_room) in changes
+    assert (MOVED, physics, moved_physics) in changes
+    assert (REMOVED, history, None) in changes
+    assert (ADDED, None, new_lesson) in changes
+    print("✓ Changed, moved, removed and added lessons are recognised")
+
+    message = format_changes_message("М8О-207БВ-24", changes)
+    assert "GUK-202" in message and "Английский" in message
+    print("✓ Changes message is formatted")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "schedule.db"))
+        group_id = db.add_group("М8О-207БВ-24", "Computer Science")
+        subject_id = db.add_subject("Программирование", "PR101")
+        teacher_id = db.add_teacher("Смирнов Владимир Владимирович", "Programming")
+        week_start = get_current_week_start() + timedelta(days=7)
+        schedule_id = db.add_schedule(group_id, week_start)
+        start = datetime.combine(week_start, datetime.min.time()) + timedelta(hours=9)
+        db.add_lesson(
+            schedule_id,
+            subject_id,
+            teacher_id,
+            start,
+            start + timedelta(minutes=90),
+            "GUK-101",
+            "Monday",
+        )
+
+        sender = FakeSender()
+        notifier = ScheduleChangeNotifier(db, sender, batch_size=2)
+        assert notifier.prime() == 1
+        assert notifier.prime() == 0
+        print("✓ Existing weeks are primed once")
+
+        for user_id in range(5):
+            db.set_user_group(user_id, group_id)
+            db.set_change_subscription(user_id, 1000 + user_id)
+        db.delete_change_subscription(4)
+
+        # Unchanged week: only a fingerprint comparison, nothing sent
+        db.notify_change(group_id, week_start)
+        asyncio.run(notifier.flush())
+        assert sender.messages == []
+        print("✓ Unchanged week sends nothing")
+
+        # Several writes to the same week are diffed once
+        for hours in (11, 13):
+            lesson_start = start + timedelta(hours=hours - 9)
+            db.add_lesson(
+                schedule_id,
+                subject_id,
+                teacher_id,
+                lesson_start,
+                lesson_start + timedelta(minutes=90),
+                "GUK-101",
+                "Monday",
+            )
+        checked = notifier.detector.weeks_checked
+        asyncio.run(notifier.flush())
+        assert notifier.detector.weeks_checked == checked + 1
+        assert sorted(chat_id for chat_id, _ in sender.messages) == [
+            1000,
+            1001,
+            1002,
+            1003,
+        ]
+        assert all(text.count("➕") == 2 for _, text in sender.messages)
+        print("✓ Changes are diffed once and sent to subscribers only")
+
+    print("\nAll tests passed!")
+
+
+if __name__ == "__main__":
+    test_schedule_changes()
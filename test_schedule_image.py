@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Test script to verify schedule image rendering
+"""
+
+from utils.schedule_image import (
+    THEMES,
+    is_image_rendering_available,
+    render_week_png,
+    render_week_png_async,
+    shutdown_render_pool,
+)
+from utils.schedule_utils import get_current_week_start
+from datetime import datetime, timedelta
+import asyncio
+import io
+
+
+def test_schedule_image():
+    """Test schedule image rendering functionality"""
+    print("Testing schedule image rendering functionality...")
+
+    if not is_image_rendering_available():
+        print("Pillow is not installed, skipping")
+        return
+
+    from PIL import Image
+
+    week_start = get_current_week_start()
+    monday = datetime.combine(week_start, datetime.min.time())
+    lessons = [
+        {
+            "id": 1,
+            "subject_name": "Физическая культура",
+            "teacher_name": "Иванов Иван Иванович",
+            "start_time": monday.replace(hour=9),
+            "end_time": monday.replace(hour=10, minute=30),
+            "location": None,
+            "day_of_week": 0,
+        },
+        {
+            "id": 2,
+            "subject_name": "Общая физика",
+            "teacher_name": "Кузнецов Алексей Владимирович",
+            "start_time": monday.replace(hour=13) + timedelta(days=2),
+            "end_time": monday.replace(hour=14, minute=30) + timedelta(days=2),
+            "location": "ГУК Б-638",
+            "day_of_week": 2,
+        },
+    ]
+
+    for theme in THEMES:
+        png = render_week_png(lessons, week_start, "М8О-207БВ-24", theme)
+        assert png.startswith(b"\x89PNG"), "Output should be a PNG image"
+        image = Image.open(io.BytesIO(png))
+        assert image.width > image.height / 2
+    print("✓ Rendered week in every theme")
+
+    # Rendering is deterministic, which keeps content hashes stable
+    assert render_week_png(lessons, week_start, "М8О-207БВ-24") == render_week_png(
+        lessons, week_start, "М8О-207БВ-24"
+    )
+    print("✓ Rendering is deterministic")
+
+    try:
+        render_week_png(lessons, week_start, "М8О-207БВ-24", "neon")
+        assert False, "Unknown theme should be rejected"
+    except ValueError:
+        print("✓ Unknown theme rejected")
+
+    # Rendering in the process pool
+    try:
+        png = asyncio.run(render_week_png_async(lessons, week_start, "М8О-207БВ-24"))
+        assert png == render_week_png(lessons, week_start, "М8О-207БВ-24")
+    finally:
+        shutdown_render_pool()
+    print("✓ Rendered week in the process pool")
+
+    print("\nAll tests passed!")
+
+
+if __name__ == "__main__":
+    test_schedule_image()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Test script to verify coalescing of identical schedule renders
+"""
+
+from database.models import Database
+from utils.schedule_utils import (
+    get_week_schedule,
+    get_week_schedule_async,
+    get_current_week_start,
+    week_cache,
+    week_renders,
+)
+from utils.singleflight import SingleFlight, singleflight_calls
+from datetime import datetime, time as dt_time
+from threading import Barrier, Thread
+import asyncio
+import os
+import tempfile
+import time
+
+
+def test_singleflight():
+    """Test single-flight functionality"""
+    print("Testing single-flight functionality...")
+
+    flight = SingleFlight("test")
+    barrier = Barrier(10)
+    runs = []
+
+    def work():
+        runs.append(1)
+        time.sleep(0.1)
+        return "done"
+
+    results = []
+
+    def call():
+        barrier.wait()
+        results.append(flight.do("key", work))
+
+    threads = [Thread(target=call) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == ["done"] * 10
+    assert len(runs) == 1
+    assert flight.calls == 1 and flight.coalesced == 9
+    assert singleflight_calls.value("test", "coalesced") == 9
+    assert len(flight) == 0
+    print("✓ Concurrent calls share one run")
+
+    assert flight.do("key", work) == "done"
+    assert len(runs) == 2
+    print("✓ Results are not cached after the call")
+
+    def failing():
+        time.sleep(0.05)
+        raise ValueError("boom")
+
+    errors = []
+
+    def call_failing():
+        try:
+            flight.do("failing", failing)
+        except ValueError as e:
+            errors.append(e)
+
+    threads = [Thread(target=call_failing) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(errors) == 3
+    assert len(flight) == 0
+    print("✓ Exceptions reach every waiting caller")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "schedule.db"))
+        group_id = db.add_group("М8О-207БВ-24", "Computer Science")
+        subject_id = db.add_subject("Программирование", "PR101")
+        teacher_id = db.add_teacher("Смирнов Владимир Владимирович", "Programming")
+        week_start = get_current_week_start()
+        schedule_id = db.add_schedule(group_id, week_start)
+        monday = datetime.combine(week_start, dt_time(9, 0))
+        db.add_lesson(
+            schedule_id,
+            subject_id,
+            teacher_id,
+            monday,
+            monday.replace(hour=10, minute=30),
+            "GUK-101",
+            0,
+        )
+
+        queries = []
+        get_schedule_for_week = db.get_schedule_for_week
+
+        def slow_get_schedule_for_week(*args):
+            queries.append(args)
+            time.sleep(0.1)
+            return get_schedule_for_week(*args)
+
+        db.get_schedule_for_week = slow_get_schedule_for_week
+        week_cache.clear()
+        coalesced = week_renders.coalesced
+        hits = week_cache.hits
+
+        async def morning_rush():
+            return await asyncio.gather(
+                *(get_week_schedule_async(group_id, db) for _ in range(30))
+            )
+
+        messages = asyncio.run(morning_rush())
+        assert len(set(messages)) == 1
+        assert "Программирование" in messages[0]
+        assert len(queries) == 1, len(queries)
+        # Requests that found no worker thread free at first get the cached week
+        coalesced = week_renders.coalesced - coalesced
+        assert coalesced >= 1
+        assert coalesced + week_cache.hits - hits == 29
+        print("✓ 30 concurrent requests for a week run one query and render")
+
+        assert get_week_schedule(group_id, db) == messages[0]
+        assert len(queries) == 1
+        print("✓ Later requests are served from the week cache")
+
+    print("\nAll tests passed!")
+
+
+if __name__ == "__main__":
+    test_singleflight()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the SQL profiler
+"""
+
+from database.models import Database
+from database.profiler import profiler, fingerprint, is_table_scan
+from handlers.admin import format_sql_top, format_sql_slow
+from datetime import datetime, date, timedelta
+import os
+import tempfile
+
+
+def test_sql_profiler():
+    """Test SQL profiler functionality"""
+    print("Testing SQL profiler functionality...")
+
+    assert (
+        fingerprint(
+            "SELECT *  FROM t\n WHERE id = 5 AND name = 'x''y' AND g IN (?, ?, ?)"
+        )
+        == "SELECT * FROM t WHERE id = ? AND name = ? AND g IN (?+)"
+    )
+    assert is_table_scan(["SCAN lessons"])
+    assert not is_table_scan(
+        ["SEARCH l USING INDEX idx_lessons_start_time (start_time>?)"]
+    )
+    assert not is_table_scan(
+        ["SCAN schedules USING COVERING INDEX idx_schedules_group_week"]
+    )
+    print("✓ Fingerprints and table scan detection")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "schedule.db"))
+        group_id = db.add_group("М8О-207БВ-24", "Computer Science")
+        subject_id = db.add_subject("Программирование", "PR101")
+        teacher_id = db.add_teacher("Смирнов Владимир Владимирович", "Programming")
+        schedule_id = db.add_schedule(group_id, date(2025, 10, 6))
+
+        # Disabled by default
+        profiler.reset()
+        db.get_all_groups()
+        assert not profiler.recent
+        print("✓ Nothing is recorded while disabled")
+
+        profiler.enabled = True
+        slow_ms = profiler.slow_ms
+        profiler.slow_ms = 0
+        try:
+            start = datetime(2025, 10, 6, 9, 0)
+            db.add_lessons(
+                schedule_id,
+                [
+                    (
+                        subject_id,
+                        teacher_id,
+                        start + timedelta(hours=2 * index),
+                        start + timedelta(hours=2 * index, minutes=90),
+                        "GUK-101",
+                        "Monday",
+                    )
+                    for index in range(3)
+                ],
+            )
+            lessons = db.get_schedule_for_week(group_id, date(2025, 10, 6))
+            assert len(lessons) == 3
+
+            entries = [
+                entry
+                for entry in profiler.recent
+                if entry["fingerprint"].startswith("SELECT l.id")
+            ]
+            assert len(entries) == 1 and entries[0]["rows"] == 3
+            assert entries[0]["plan"]
+            insert = [
+                entry
+                for entry in profiler.recent
+                if entry["fingerprint"].startswith("INSERT INTO lessons")
+            ]
+            assert insert[0]["rows"] == 3
+            print("✓ Statements are recorded with timings and row counts")
+
+            # A query without a usable index is reported as a table scan
+            conn = db.connect()
+            conn.execute(
+                "SELECT id FROM lessons WHERE end_time = ?", (start,)
+            ).fetchall()
+            conn.close()
+            scans = [entry for entry in profiler.slow if entry.get("scan")]
+            assert any("end_time" in entry["fingerprint"] for entry in scans)
+            assert "SCAN" in format_sql_slow()
+            short = format_sql_slow(max_length=len(format_sql_slow()) - 1)
+            assert short.endswith("\n…")
+            assert short.count("<pre>") == short.count("</pre>")
+            print("✓ Slow statements get their query plan and table scans are flagged")
+
+            top = profiler.top(3)
+            assert len(top) == 3
+            assert "SQL: top 10" in format_sql_top()
+            print("✓ Totals per fingerprint are ranked")
+        finally:
+            profiler.enabled = False
+            profiler.slow_ms = slow_ms
+            profiler.reset()
+
+    print("\nAll tests passed!")
+
+
+if __name__ == "__main__":
+    test_sql_profiler()
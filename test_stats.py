@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the in-memory counters behind /stats
+"""
+
+from database.models import Database
+from handlers.admin import format_stats
+from middlewares.stats import StatsMiddleware
+from utils.stats import (
+    LatencyWindow,
+    RateCounter,
+    live_stats,
+    read_rss_bytes,
+)
+import asyncio
+import os
+import tempfile
+import time
+
+
+class FakeHandlerObject:
+    def __init__(self, callback):
+        self.callback = callback
+
+
+async def schedule_handler(event, data):
+    return "handled"
+
+
+async def failing_handler(event, data):
+    raise ValueError("boom")
+
+
+def test_stats():
+    """Test /stats counters"""
+    print("Testing /stats counters...")
+
+    # Rates count complete seconds only
+    counter = RateCounter(window=5)
+    counter.add(3)
+    assert counter.total == 3
+    counter = RateCounter(window=5)
+    second = int(time.monotonic())
+    counter._seconds[(second - 1) % 5] = second - 1
+    counter._counts[(second - 1) % 5] = 8
+    counter._seconds[(second - 9) % 5] = second - 9
+    counter._counts[(second - 9) % 5] = 100
+    assert counter.rate() == 2, counter.rate()
+    print("✓ Rate counter averages over its window")
+
+    window = LatencyWindow(size=100)
+    assert window.percentile(0.95) is None
+    for value in range(200):
+        window.add(value / 1000)
+    assert window.count == 200
+    assert window.percentile(0.95) == 0.195
+    print("✓ Latency window keeps the latest samples")
+
+    async def check_middleware():
+        middleware = StatsMiddleware()
+        updates = live_stats.updates.total
+        errors = live_stats.handler_errors
+        assert await middleware(schedule_handler, object(), {}) == "handled"
+        data = {"handler": FakeHandlerObject(schedule_handler)}
+        assert await middleware(schedule_handler, object(), data) == "handled"
+        data = {"handler": FakeHandlerObject(failing_handler)}
+        try:
+            await middleware(failing_handler, object(), data)
+            assert False, "exception was swallowed"
+        except ValueError:
+            pass
+        assert live_stats.updates.total == updates + 1
+        assert live_stats.handler_errors == errors + 1
+        assert live_stats.handlers["schedule_handler"].count >= 1
+        assert live_stats.handlers["failing_handler"].count >= 1
+
+    asyncio.run(check_middleware())
+    print("✓ Middleware counts updates, handler durations and errors")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "schedule.db"))
+        queries = live_stats.db_queries.total
+        db.get_all_groups()
+        db.get_all_groups()
+        assert live_stats.db_queries.total == queries + 2
+    print("✓ Database queries are counted")
+
+    rss = read_rss_bytes()
+    assert rss is not None and rss > 1 << 20
+    text = format_stats()
+    assert "Обновления:" in text
+    assert "<code>schedule_handler</code>" in text
+    assert "Недели:" in text
+    assert "RSS:" in text
+    short = format_stats(max_length=len(text) - 1)
+    assert len(short) < len(text) and short.endswith("\n…")
+    assert short.count("<b>") == short.count("</b>")
+    print("✓ Stats are formatted")
+
+    print("\nAll tests passed!")
+
+
+if __name__ == "__main__":
+    test_stats()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Test script to verify storage backends and adapters
+"""
+
+from aiogram.fsm.state import State, StatesGroup
+from aiogram.fsm.storage.base import StorageKey
+from database.models import Database
+from storage.backends import MemoryStore, RedisStore, create_store
+from storage.adapters import KeyValueFSMStorage
+from storage.fake_redis import FakeRedisServer
+from utils import schedule_utils
+from utils.schedule_utils import (
+    RenderedWeekCache,
+    configure_storage,
+    get_user_group_or_default,
+    get_user_group_or_default_async,
+    set_user_group,
+    set_user_group_async,
+)
+from datetime import date
+import asyncio
+import os
+import tempfile
+import time
+
+
+class Form(StatesGroup):
+    waiting_for_group = State()
+
+
+def check_store(store):
+    assert store.get("missing") is None
+    store.set("key", "значение")
+    assert store.get("key") == "значение"
+    store.set("short", "value", ttl=1)
+    assert store.get("short") == "value"
+    store.delete("key")
+    assert store.get("key") is None
+
+
+def test_storage():
+    """Test storage functionality"""
+    print("Testing storage functionality...")
+
+    memory = MemoryStore(max_entries=3)
+    check_store(memory)
+    for index in range(5):
+        memory.set(f"k{index}", str(index))
+    assert len(memory) == 3 and memory.get("k0") is None and memory.get("k4") == "4"
+    print("✓ Memory store works and stays bounded")
+
+    server = FakeRedisServer().start()
+    try:
+        redis = create_store(server.url)
+        assert isinstance(redis, RedisStore)
+        check_store(redis)
+        assert redis.command("TTL", "short") in (0, 1)
+        time.sleep(1.1)
+        assert redis.get("short") is None
+        print("✓ Redis store works against the local stand-in")
+
+        # A rendered week written by one process is served to the next one
+        version = (3, "00000000000000ff")
+        key = ("schedule.db", 1, date(2025, 10, 6), "М8О-207БВ-24")
+        first = RenderedWeekCache(backend=RedisStore(server.url))
+        assert first.get(key, version) is None
+        first.put(key, version, "<b>Расписание</b>")
+        second = RenderedWeekCache(backend=RedisStore(server.url))
+        assert second.get(key, version) == "<b>Расписание</b>"
+        assert second.backend_hits == 1
+        assert second.get(key, version) == "<b>Расписание</b>"
+        assert second.backend_hits == 1
+        assert second.get(key, (4, "00000000000000ff")) is None
+        print("✓ Rendered weeks survive a restart and respect the week version")
+
+        # User groups
+        previous = (
+            schedule_utils.week_cache.backend,
+            schedule_utils.user_group_cache.store,
+        )
+        configure_storage(RedisStore(server.url))
+        try:
+            with tempfile.TemporaryDirectory() as tmp:
+                db = Database(os.path.join(tmp, "schedule.db"))
+                group_id = db.add_group("М8О-208БВ-24", "Computer Science")
+                set_user_group(42, group_id, db)
+                commands = server.commands
+                assert get_user_group_or_default(42, db) == (group_id, "М8О-208БВ-24")
+                assert server.commands == commands + 1
+                # The group is still known when the database row is gone
+                os.remove(db.db_path)
+                assert get_user_group_or_default(42, Database(db.db_path)) == (
+                    group_id,
+                    "М8О-208БВ-24",
+                )
+
+                # Handlers reach the store from worker threads
+                other_db = Database(os.path.join(tmp, "other.db"))
+                other_id = other_db.add_group("М8О-209БВ-24", "Computer Science")
+                asyncio.run(set_user_group_async(43, other_id, other_db))
+                assert asyncio.run(get_user_group_or_default_async(43, other_db)) == (
+                    other_id,
+                    "М8О-209БВ-24",
+                )
+        finally:
+            schedule_utils.week_cache.backend = previous[0]
+            schedule_utils.user_group_cache.store = previous[1]
+        print("✓ User groups are served from the store")
+
+        # FSM state
+        async def check_fsm():
+            key = StorageKey(bot_id=1, chat_id=2, user_id=3)
+            storage = KeyValueFSMStorage(RedisStore(server.url))
+            await storage.set_state(key, Form.waiting_for_group)
+            await storage.update_data(key, {"query": "М8О"})
+            await storage.close()
+
+            restarted = KeyValueFSMStorage(RedisStore(server.url))
+            assert await restarted.get_state(key) == "Form:waiting_for_group"
+            assert await restarted.get_data(key) == {"query": "М8О"}
+            await restarted.set_state(key, None)
+            await restarted.set_data(key, {})
+            assert await restarted.get_state(key) is None
+            assert await restarted.get_data(key) == {}
+            await restarted.close()
+
+        asyncio.run(check_fsm())
+        print("✓ FSM state survives a restart")
+
+        # Broken connections are re-opened
+        redis.set("key", "value")
+        redis._sock.close()
+        assert redis.get("key") == "value"
+        print("✓ Redis store reconnects")
+        redis.close()
+    finally:
+        server.stop()
+
+    print("\nAll tests passed!")
+
+
+if __name__ == "__main__":
+    test_storage()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the teacher and room week views
+"""
+
+from database.models import Database
+from handlers.lookup import render_teacher_week
+from keyboards.navigation import (
+    get_lookup_callback_data,
+    get_lookup_navigation_keyboard,
+)
+from utils.lookup_index import get_room_index, get_teacher_index
+from utils.schedule_utils import format_schedule_message, merge_lesson_groups
+from datetime import date, datetime, timedelta
+import asyncio
+import os
+import tempfile
+
+
+def test_teacher_room_views():
+    """Test teacher and room schedules, search indexes and rendering"""
+    print("Testing teacher and room views...")
+
+    week_start = date(2025, 10, 6)
+    monday = datetime(2025, 10, 6, 9, 0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "schedule.db"))
+        first_group = db.add_group("М8О-207БВ-24", "Computer Science")
+        second_group = db.add_group("М8О-208БВ-24", "Computer Science")
+        subject_id = db.add_subject("Программирование", "PR101")
+        ivanov = db.add_teacher("Иванов Иван Иванович", "Programming")
+        ivanova = db.add_teacher("Иванова Мария Петровна", "Programming")
+        fyodorov = db.add_teacher("Фёдоров Пётр", "Math")
+
+        lecture = (monday, monday + timedelta(minutes=90))
+        for group_id in (first_group, second_group):
+            schedule_id = db.add_schedule(group_id, week_start)
+            db.add_lesson(schedule_id, subject_id, ivanov, *lecture, "GUK-101", 0)
+        next_week = db.add_schedule(first_group, week_start + timedelta(days=7))
+        db.add_lesson(
+            next_week,
+            subject_id,
+            ivanov,
+            monday + timedelta(days=7),
+            monday + timedelta(days=7, minutes=90),
+            "GUK-101",
+            0,
+        )
+        db.add_lesson(
+            schedule_id,
+            subject_id,
+            ivanova,
+            monday + timedelta(days=1),
+            monday + timedelta(days=1, minutes=90),
+            "ГУК В-201",
+            1,
+        )
+
+        conn = db.connect()
+        indexes = {row[1] for row in conn.execute("PRAGMA index_list(lessons)")}
+        plan = " ".join(
+            row[3]
+            for row in conn.execute(
+                "EXPLAIN QUERY PLAN SELECT id FROM lessons "
+                "WHERE teacher_id = ? AND start_time >= ? AND start_time < ?",
+                (ivanov, "2025-10-06", "2025-10-13"),
+            )
+        )
+        conn.close()
+        assert "idx_lessons_teacher_start" in indexes
+        assert "idx_lessons_location_start" in indexes
+        assert "idx_lessons_teacher_start" in plan
+        print("✓ Teacher and room lookups use their indexes")
+
+        lessons = db.get_teacher_schedule_for_week(ivanov, week_start)
+        assert [lesson["group_name"] for lesson in lessons] == [
+            "М8О-207БВ-24",
+            "М8О-208БВ-24",
+        ]
+        assert (
+            len(db.get_teacher_schedule_for_week(ivanov, week_start + timedelta(7)))
+            == 1
+        )
+        assert db.get_teacher_schedule_for_week(fyodorov, week_start) == []
+        assert len(db.get_room_schedule_for_week("GUK-101", week_start)) == 2
+        assert db.get_teacher_name(ivanov) == "Иванов Иван Иванович"
+        print("✓ Week queries return the lessons of the teacher or room only")
+
+        merged = merge_lesson_groups(lessons)
+        assert len(merged) == 1
+        assert merged[0]["group_name"] == "М8О-207БВ-24, М8О-208БВ-24"
+        message = format_schedule_message(
+            merged, week_start, 0, "Иванов Иван Иванович", "group_name"
+        )
+        assert message.startswith("<blockquote>Иванов Иван Иванович</blockquote>")
+        assert "Программирование · М8О-207БВ-24, М8О-208БВ-24\n" in message
+        plain = format_schedule_message(lessons, week_start)
+        assert "Программирование\n" in plain and "·" not in plain
+        rendered = asyncio.run(render_teacher_week(db, ivanov, 0))
+        assert rendered.startswith("<blockquote>Иванов Иван Иванович</blockquote>")
+        print("✓ Lecture streams are merged and groups are shown")
+
+        teachers = get_teacher_index(db)
+        assert [match["id"] for match in teachers.search("иванов")] == [
+            ivanov,
+            ivanova,
+        ]
+        assert teachers.search("Иванов Иван Иванович")[0]["match_type"] == "exact"
+        assert [match["id"] for match in teachers.search("И. Иванова")] == [ivanova]
+        assert [match["id"] for match in teachers.search("федоров")] == [fyodorov]
+        assert teachers.search("Сидоров") == []
+        assert teachers.search("...") == []
+        print("✓ Teacher search matches word prefixes, exact names first")
+
+        rooms = get_room_index(db)
+        assert rooms.search("гук в 201") == [
+            {"location": "ГУК В-201", "match_type": "exact"}
+        ]
+        assert [match["location"] for match in rooms.search("101")] == ["GUK-101"]
+        new_teacher = db.add_teacher("Сидоров Олег", "Math")
+        db.add_lesson(
+            schedule_id,
+            subject_id,
+            new_teacher,
+            monday + timedelta(days=2),
+            monday + timedelta(days=2, minutes=90),
+            "GUK-303",
+            2,
+        )
+        assert teachers.search("Сидоров")[0]["id"] == new_teacher
+        assert rooms.search("GUK-303")[0]["location"] == "GUK-303"
+        assert get_teacher_index(db) is teachers
+        print("✓ Indexes pick up new teachers and rooms after writes")
+
+        keyboard = get_lookup_navigation_keyboard("r", "GUK-101", 2)
+        buttons = keyboard.inline_keyboard[0]
+        assert [button.callback_data for button in buttons] == [
+            "lk_r:1:GUK-101",
+            "lk_r:0:GUK-101",
+            "lk_r:3:GUK-101",
+        ]
+        assert get_lookup_callback_data("r", 0, "Я" * 40) is None
+        assert get_lookup_navigation_keyboard("r", "Я" * 40) is None
+        print("✓ Navigation callback data stays within Telegram's limit")
+
+    print("\nAll tests passed!")
+
+
+if __name__ == "__main__":
+    test_teacher_room_views()
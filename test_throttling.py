@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Test script to verify coalescing of week navigation taps
+"""
+
+from aiogram.types import CallbackQuery, User
+from middlewares.throttling import NavigationThrottleMiddleware
+import asyncio
+
+
+def make_callback(user_id: int, data: str) -> CallbackQuery:
+    return CallbackQuery(
+        id=str(user_id),
+        from_user=User(id=user_id, is_bot=False, first_name="Иван"),
+        chat_instance="1",
+        data=data,
+    )
+
+
+def test_throttling():
+    """Test navigation throttling functionality"""
+    print("Testing navigation throttling functionality...")
+
+    async def run():
+        rendered = []
+
+        async def handler(event, data):
+            # A query and a message edit
+            await asyncio.sleep(0.01)
+            rendered.append((event.from_user.id, event.data))
+            return "rendered"
+
+        middleware = NavigationThrottleMiddleware(window=0.1, max_users=2)
+
+        # A single tap is handled at once
+        assert await middleware(handler, make_callback(1, "sch_next:1:0"), {})
+        assert rendered == [(1, "sch_next:1:0")]
+        print("✓ Single tap is rendered")
+
+        # A burst renders the first and the last tap
+        rendered.clear()
+        taps = []
+        for offset in range(1, 11):
+            callback = make_callback(1, f"sch_next:{offset}:{offset - 1}")
+            taps.append(asyncio.create_task(middleware(handler, callback, {})))
+            await asyncio.sleep(0.005)
+        await asyncio.gather(*taps)
+        assert rendered == [(1, "sch_next:1:0"), (1, "sch_next:10:9")], rendered
+        assert middleware.coalesced == 8
+        assert not middleware._bursts
+        print("✓ Burst of 10 taps is coalesced into 2 renders")
+
+        # Taps further apart than the window are all rendered
+        rendered.clear()
+        for offset in range(3):
+            await middleware(handler, make_callback(1, f"sch_prev:{-offset}:0"), {})
+        assert len(rendered) == 3
+        print("✓ Spaced taps are not throttled")
+
+        # Users are throttled separately
+        rendered.clear()
+        taps = []
+        for _ in range(5):
+            for user_id in (1, 2):
+                callback = make_callback(user_id, f"sch_next:{user_id}:0")
+                taps.append(asyncio.create_task(middleware(handler, callback, {})))
+            await asyncio.sleep(0.002)
+        await asyncio.gather(*taps)
+        assert sorted(rendered) == [
+            (1, "sch_next:1:0"),
+            (1, "sch_next:1:0"),
+            (2, "sch_next:2:0"),
+            (2, "sch_next:2:0"),
+        ], rendered
+        print("✓ Users are throttled separately")
+
+        # State stays bounded
+        taps = [
+            asyncio.create_task(
+                middleware(handler, make_callback(user_id, "sch_curr:0:1"), {})
+            )
+            for user_id in range(100, 110)
+        ]
+        await asyncio.sleep(0)
+        assert len(middleware._bursts) <= 2
+        await asyncio.gather(*taps)
+        assert not middleware._bursts
+        print("✓ Tracked users are bounded")
+
+        # Other callbacks pass through
+        rendered.clear()
+        taps = [
+            asyncio.create_task(middleware(handler, make_callback(1, "group_1"), {}))
+            for _ in range(3)
+        ]
+        await asyncio.gather(*taps)
+        assert len(rendered) == 3
+        print("✓ Other callbacks are not throttled")
+
+    asyncio.run(run())
+
+    print("\nAll tests passed!")
+
+
+if __name__ == "__main__":
+    test_throttling()
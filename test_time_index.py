@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the lesson time index behind /today and /next
+"""
+
+from database.models import Database
+from utils.time_index import GroupTimeline, get_time_index
+from utils.schedule_utils import (
+    format_day_message,
+    format_next_lesson_message,
+    get_user_group_or_default,
+)
+from datetime import datetime, date, timedelta
+import os
+import tempfile
+
+
+def test_time_index():
+    """Test lesson time index functionality"""
+    print("Testing lesson time index functionality...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "schedule.db"))
+        group_id = db.add_group("М8О-207БВ-24", "Computer Science")
+        subject_id = db.add_subject("Общая физика", "GP101")
+        teacher_id = db.add_teacher("Кузнецов Алексей Владимирович", "Physics")
+
+        week_start = date(2025, 10, 6)
+        schedule_id = db.add_schedule(group_id, week_start)
+        tuesday = datetime(2025, 10, 7)
+        for hour, minute in ((9, 0), (10, 45), (13, 0)):
+            start = tuesday.replace(hour=hour, minute=minute)
+            db.add_lesson(
+                schedule_id,
+                subject_id,
+                teacher_id,
+                start,
+                start + timedelta(minutes=90),
+                f"ГУК Б-{hour}",
+                1,
+            )
+
+        index = get_time_index(db)
+        assert get_time_index(db) is index, "Index should be created once per db"
+
+        lessons = index.lessons_on(group_id, tuesday.date())
+        assert [lesson["location"] for lesson in lessons] == [
+            "ГУК Б-9",
+            "ГУК Б-10",
+            "ГУК Б-13",
+        ]
+        assert index.lessons_on(group_id, date(2025, 10, 8)) == []
+        print("✓ Lessons of a day found")
+
+        current, upcoming = index.current_and_next(
+            group_id, tuesday.replace(hour=9, minute=30)
+        )
+        assert current["location"] == "ГУК Б-9"
+        assert upcoming["location"] == "ГУК Б-10"
+
+        current, upcoming = index.current_and_next(
+            group_id, tuesday.replace(hour=12, minute=30)
+        )
+        assert current is None
+        assert upcoming["location"] == "ГУК Б-13"
+
+        current, upcoming = index.current_and_next(group_id, tuesday.replace(hour=18))
+        assert current is None and upcoming is None
+        print("✓ Current and next lesson found")
+
+        # Adding a lesson updates only the changed week of the timeline
+        timeline = index.get_timeline(group_id, tuesday)
+        start = tuesday.replace(hour=16)
+        db.add_lesson(
+            schedule_id,
+            subject_id,
+            teacher_id,
+            start,
+            start + timedelta(minutes=90),
+            "3-403",
+            1,
+        )
+        assert index.get_timeline(group_id, tuesday) is timeline, "No full reload"
+        current, upcoming = index.current_and_next(group_id, tuesday.replace(hour=15))
+        assert upcoming["location"] == "3-403"
+        assert timeline.starts == sorted(timeline.starts)
+        print("✓ Index updated incrementally")
+
+        # An all-day lesson stays current behind any number of short ones
+        wednesday = datetime(2025, 10, 8)
+        practice = {
+            "start_time": wednesday.replace(hour=8),
+            "end_time": wednesday.replace(hour=20),
+        }
+        short = [
+            {
+                "start_time": wednesday.replace(hour=hour),
+                "end_time": wednesday.replace(hour=hour, minute=30),
+            }
+            for hour in range(9, 15)
+        ]
+        timeline = GroupTimeline([practice, *short], week_start, date(2025, 10, 13))
+        current, upcoming = timeline.current_and_next(
+            wednesday.replace(hour=14, minute=45)
+        )
+        assert current is practice and upcoming is None
+        current, _ = timeline.current_and_next(wednesday.replace(hour=14, minute=15))
+        assert current is short[-1]
+        timeline.replace_range(wednesday.replace(hour=8), wednesday.replace(hour=9), [])
+        assert timeline.max_ends == [lesson["end_time"] for lesson in short]
+        current, upcoming = timeline.current_and_next(
+            wednesday.replace(hour=14, minute=45)
+        )
+        assert current is None and upcoming is None
+        print("✓ Long lessons found through the running maximum of ends")
+
+        # Message formatting
+        text = format_day_message(lessons, tuesday.date(), "М8О-207БВ-24")
+        assert text.startswith("<blockquote>М8О-207БВ-24</blockquote>\n")
+        assert "<b>Вт ~ 07.10</b>" in text
+        assert text.count("Общая физика") == 3
+        assert "Выходной" in format_day_message([], date(2025, 10, 8))
+
+        now = tuesday.replace(hour=9, minute=30)
+        text = format_next_lesson_message(lessons[0], lessons[1], now)
+        assert "ещё 60 мин." in text and "сегодня" in text
+        assert "Занятий больше нет" in format_next_lesson_message(None, None, now)
+        print("✓ Messages formatted")
+
+        # User group mapping
+        assert get_user_group_or_default(42, db)[0] == group_id
+        other_group_id = db.add_group("М8О-208БВ-24", "Computer Science")
+        db.set_user_group(42, other_group_id)
+        assert get_user_group_or_default(42, db) == (other_group_id, "М8О-208БВ-24")
+        print("✓ User group remembered")
+
+    print("\nAll tests passed!")
+
+
+if __name__ == "__main__":
+    test_time_index()
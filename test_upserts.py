@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Test script to verify natural keys, upserts and week replacement
+"""
+
+from database.models import Database, EMPTY_WEEK_HASH
+from ingest.loader import Ingester
+from test_ingest import make_rows
+from datetime import date, datetime, timedelta
+import os
+import sqlite3
+import tempfile
+
+
+def count(db: Database, table: str) -> int:
+    conn = db.connect()
+    rows = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    conn.close()
+    return rows
+
+
+def test_upserts():
+    """Test upsert functionality"""
+    print("Testing upsert functionality...")
+
+    week_start = date(2025, 10, 6)
+    monday = datetime(2025, 10, 6, 9, 0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "schedule.db"))
+        group_id = db.add_group("М8О-207БВ-24", "Computer Science")
+        assert db.add_group("М8О-207БВ-24", "Институт №8") == group_id
+        assert db.get_all_groups() == [(group_id, "М8О-207БВ-24", "Институт №8")]
+        teacher_id = db.add_teacher("Смирнов Владимир Владимирович", "Programming")
+        assert db.add_teacher("Смирнов Владимир Владимирович", None) == teacher_id
+        assert db.get_all_teachers()[0][2] == "Programming"
+        subject_id = db.add_subject("Программирование", "PR101")
+        assert db.add_subject("Программирование на C", "PR101") == subject_id
+        assert db.get_all_subjects()[0][1] == "Программирование на C"
+        print("✓ Groups, teachers and subjects are upserted by name / code")
+
+        schedule_id = db.add_schedule(group_id, week_start)
+        assert db.add_schedule(group_id, week_start) == schedule_id
+        assert db.get_week_version(group_id, week_start) == (1, EMPTY_WEEK_HASH)
+        print("✓ A week has one schedule")
+
+        lesson = (subject_id, teacher_id, monday, monday + timedelta(minutes=90))
+        lesson_id = db.add_lesson(schedule_id, *lesson, "GUK-101", 0)
+        version = db.get_week_version(group_id, week_start)
+        assert db.add_lesson(schedule_id, *lesson, "GUK-101", 0) == lesson_id
+        assert db.get_week_version(group_id, week_start) == version
+        assert db.add_lesson(schedule_id, *lesson, "GUK-202", 0) == lesson_id
+        moved_version = db.get_week_version(group_id, week_start)
+        assert moved_version[0] == version[0] + 1
+        assert count(db, "lessons") == 1
+        assert (
+            db.get_schedule_for_week(group_id, week_start)[0]["location"] == "GUK-202"
+        )
+        print("✓ Lessons are upserted by subject, teacher and start time")
+
+        changes = []
+        db.add_change_listener(lambda *change: changes.append(change))
+        db.add_subject("Программирование на Python", "PR101")
+        renamed_version = db.get_week_version(group_id, week_start)
+        assert renamed_version[0] == moved_version[0] + 1
+        assert renamed_version[1] == moved_version[1]
+        assert changes == [(group_id, week_start)]
+        db.add_subject("Программирование на Python", "PR101")
+        db.add_teacher("Смирнов Владимир Владимирович", "Programming")
+        assert db.get_week_version(group_id, week_start) == renamed_version
+        db.add_teacher("Смирнов Владимир Владимирович", "Software Engineering")
+        assert db.get_week_version(group_id, week_start)[0] == renamed_version[0] + 1
+        assert len(changes) == 2
+        db.add_subject("Программирование на C", "PR101")
+        print("✓ Renaming a subject or teacher bumps and reports their weeks")
+
+        other = Database(os.path.join(tmp, "other.db"))
+        other_group = other.add_group("М8О-207БВ-24", "Computer Science")
+        other_subject = other.add_subject("Программирование на C", "PR101")
+        other_teacher = other.add_teacher("Смирнов Владимир Владимирович", "")
+        other_schedule = other.add_schedule(other_group, week_start)
+        other.add_lesson(
+            other_schedule,
+            other_subject,
+            other_teacher,
+            monday,
+            monday + timedelta(minutes=90),
+            "GUK-202",
+            0,
+        )
+        assert other.get_week_version(other_group, week_start)[1] == moved_version[1]
+        print("✓ Content hash follows updated lessons")
+
+        lessons = [
+            (
+                subject_id,
+                teacher_id,
+                monday + timedelta(days=day),
+                monday + timedelta(days=day, minutes=90),
+                "GUK-101",
+                day,
+            )
+            for day in range(5)
+        ]
+        assert db.add_lessons(schedule_id, lessons) == 5
+        version = db.get_week_version(group_id, week_start)
+        assert db.add_lessons(schedule_id, lessons) == 0
+        assert db.get_week_version(group_id, week_start) == version
+        assert count(db, "lessons") == 5
+        print("✓ Re-adding stored lessons writes nothing")
+
+        assert not db.replace_week(group_id, week_start, lessons)
+        assert db.get_week_version(group_id, week_start) == version
+        assert db.replace_week(group_id, week_start, lessons[:2])
+        assert len(db.get_schedule_for_week(group_id, week_start)) == 2
+        assert db.get_week_version(group_id, week_start)[0] == version[0] + 1
+        assert db.replace_weeks(
+            {
+                (group_id, week_start): [],
+                (group_id, week_start + timedelta(weeks=1)): [],
+            }
+        ) == [(group_id, week_start)]
+        assert db.get_week_version(group_id, week_start)[1] == EMPTY_WEEK_HASH
+        assert count(db, "lessons") == 0
+        print("✓ Weeks are replaced, unchanged weeks are skipped")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "schedule.db"))
+        rows = make_rows(2000)
+        first = Ingester(db).ingest(rows)
+        assert first["lessons"] == 2000
+        versions = db.get_schedule_weeks(date(2025, 1, 1))
+        changes = []
+        db.add_change_listener(lambda *change: changes.append(change))
+        again = Ingester(db).ingest(rows)
+        assert again["lessons"] == 0
+        assert again["groups"] == again["subjects"] == again["teachers"] == 0
+        assert count(db, "lessons") == 2000
+        assert db.get_schedule_weeks(date(2025, 1, 1)) == versions
+        assert not changes
+        print("✓ Re-importing an export is a no-op")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "old.db")
+        conn = sqlite3.connect(path)
+        conn.executescript("""
+            CREATE TABLE groups (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, faculty TEXT NOT NULL);
+            CREATE TABLE subjects (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, code TEXT UNIQUE);
+            CREATE TABLE teachers (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, department TEXT);
+            CREATE TABLE schedules (id INTEGER PRIMARY KEY AUTOINCREMENT, group_id INTEGER NOT NULL, week_start DATE NOT NULL);
+            CREATE TABLE lessons (id INTEGER PRIMARY KEY AUTOINCREMENT, schedule_id INTEGER NOT NULL, subject_id INTEGER NOT NULL,
+                teacher_id INTEGER NOT NULL, start_time DATETIME NOT NULL, end_time DATETIME NOT NULL, location TEXT, day_of_week INTEGER NOT NULL);
+            CREATE TABLE user_groups (user_id INTEGER PRIMARY KEY, group_id INTEGER NOT NULL, updated_at DATETIME DEFAULT CURRENT_TIMESTAMP);
+            INSERT INTO groups (name, faculty) VALUES ('М8О-207БВ-24', 'CS'), ('М8О-207БВ-24', 'CS');
+            INSERT INTO subjects (name, code) VALUES ('Программирование', 'PR101');
+            INSERT INTO teachers (name, department) VALUES ('Смирнов', 'P'), ('Смирнов', 'P');
+            INSERT INTO schedules (group_id, week_start) VALUES (1, '2025-10-06'), (2, '2025-10-06');
+            INSERT INTO lessons (schedule_id, subject_id, teacher_id, start_time, end_time, location, day_of_week) VALUES
+                (1, 1, 1, '2025-10-06 09:00:00', '2025-10-06 10:30:00', 'GUK-101', 0),
+                (2, 1, 2, '2025-10-06 09:00:00', '2025-10-06 10:30:00', 'GUK-101', 0),
+                (2, 1, 2, '2025-10-07 09:00:00', '2025-10-07 10:30:00', 'GUK-101', 1);
+            INSERT INTO user_groups (user_id, group_id) VALUES (42, 2);
+        """)
+        conn.commit()
+        conn.close()
+
+        db = Database(path)
+        assert db.get_all_groups() == [(1, "М8О-207БВ-24", "CS")]
+        assert len(db.get_all_teachers()) == 1
+        assert db.get_user_group(42)[0] == 1
+        assert len(db.get_schedule_for_week(1, week_start)) == 2
+        fresh = Database(os.path.join(tmp, "fresh.db"))
+        fresh_group = fresh.add_group("М8О-207БВ-24", "CS")
+        fresh.add_subject("Программирование", "PR101")
+        fresh.add_teacher("Смирнов", "P")
+        fresh_schedule = fresh.add_schedule(fresh_group, week_start)
+        for day in range(2):
+            start = monday + timedelta(days=day)
+            fresh.add_lesson(
+                fresh_schedule,
+                1,
+                1,
+                start,
+                start + timedelta(minutes=90),
+                "GUK-101",
+                day,
+            )
+        assert (
+            db.get_week_version(1, week_start)[1]
+            == fresh.get_week_version(fresh_group, week_start)[1]
+        )
+        print("✓ Existing duplicates are merged before natural keys are added")
+
+    print("\nAll tests passed!")
+
+
+if __name__ == "__main__":
+    test_upserts()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the startup warm-up of rendered weeks
+"""
+
+from database.models import Database
+from services.warmup import TrafficRecorder, warm_up
+from utils.schedule_utils import week_cache, get_week_schedule, get_current_week_start
+from utils.traffic import GroupTraffic
+from config import DEFAULT_GROUP
+from datetime import date, datetime, timedelta
+import asyncio
+import os
+import tempfile
+
+
+def test_warmup():
+    """Test warm-up functionality"""
+    print("Testing warm-up functionality...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "schedule.db"))
+        subject_id = db.add_subject("Программирование", "PR101")
+        teacher_id = db.add_teacher("Смирнов Владимир Владимирович", "Programming")
+        week_start = get_current_week_start()
+        start = datetime.combine(week_start, datetime.min.time()) + timedelta(hours=9)
+
+        group_ids = []
+        for index in range(6):
+            group_id = db.add_group(f"М8О-2{index:02d}БВ-24", "Computer Science")
+            schedule_id = db.add_schedule(group_id, week_start)
+            db.add_lesson(
+                schedule_id,
+                subject_id,
+                teacher_id,
+                start,
+                start + timedelta(minutes=90),
+                "GUK-101",
+                "Monday",
+            )
+            group_ids.append(group_id)
+
+        # Traffic is collected in memory and written in one batch
+        traffic = GroupTraffic()
+        for index, group_id in enumerate(group_ids):
+            for _ in range(10 * (index + 1)):
+                traffic.record(group_id)
+        recorder = TrafficRecorder(db, traffic)
+        recorder.flush()
+        assert traffic.drain() == {}
+        assert db.get_total_traffic(date.today()) == 210
+        top = db.get_top_groups(date.today(), 3)
+        assert [group_id for group_id, _, _ in top] == group_ids[:2:-1]
+        print("✓ Traffic is recorded and ranked")
+
+        # Old traffic is pruned
+        db.add_group_traffic({group_ids[0]: 5}, date.today() - timedelta(days=90))
+        recorder.flush()
+        assert db.get_total_traffic(date.today() - timedelta(days=365)) == 210
+        print("✓ Old traffic is pruned")
+
+        week_cache.clear()
+        report = asyncio.run(warm_up(db, top_n=3, workers=2))
+        # Three busiest groups plus the default group, two weeks each
+        assert report["groups"] == 4
+        assert report["weeks"] == 8 and report["skipped"] == 0
+        assert abs(report["coverage"] - (40 + 50 + 60) / 210) < 1e-9
+        print(
+            f"✓ Warm-up rendered {report['weeks']} weeks in "
+            f"{report['elapsed'] * 1000:.1f} ms, coverage {report['coverage']:.0%}"
+        )
+
+        # Requests for warmed groups are cache hits and warm-up is not traffic
+        hits, misses = week_cache.hits, week_cache.misses
+        for group_id, group_name, _ in top:
+            get_week_schedule(group_id, db, 0, group_name)
+            get_week_schedule(group_id, db, 1, group_name)
+        assert week_cache.hits == hits + 6 and week_cache.misses == misses
+        assert db.get_group_id_by_name(DEFAULT_GROUP) is not None
+        print("✓ Warmed weeks are served from the cache")
+
+        # Without traffic only the default group is warmed
+        empty_db = Database(os.path.join(tmp, "empty.db"))
+        report = asyncio.run(warm_up(empty_db))
+        assert report["groups"] == 1 and report["coverage"] is None
+        print("✓ Warm-up works without traffic")
+
+    print("\nAll tests passed!")
+
+
+if __name__ == "__main__":
+    test_warmup()
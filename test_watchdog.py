@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the event loop watchdog
+"""
+
+from database.models import Database
+from services.watchdog import LoopWatchdog, find_culprit, loop_blocked
+from utils.stats import live_stats
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+
+def test_watchdog():
+    """Test event loop watchdog functionality"""
+    print("Testing event loop watchdog functionality...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "schedule.db"))
+        original_connect = db.connect
+
+        def slow_connect():
+            # A slow sqlite call holding the loop
+            time.sleep(0.3)
+            return original_connect()
+
+        db.connect = slow_connect
+
+        # A handler of a module under handlers/ calling the slow method
+        namespace = {"__name__": "handlers.timetable", "db": db}
+        exec("def blocking_handler():\n    return db.get_all_groups()", namespace)
+        blocking_handler = namespace["blocking_handler"]
+
+        assert find_culprit(sys._getframe()) == (None, None)
+        print("✓ Stacks without handlers have no culprit")
+
+        async def run():
+            watchdog = LoopWatchdog(threshold=0.05, interval=0.02)
+            watchdog.start()
+            try:
+                await asyncio.sleep(0.1)
+                assert watchdog.blocks == 0
+                blocking_handler()
+                await asyncio.sleep(0.1)
+            finally:
+                await watchdog.stop()
+            return watchdog
+
+        watchdog = asyncio.run(run())
+        assert watchdog.blocks == 1, watchdog.blocks
+        report = watchdog.last_report
+        culprit = "handlers.timetable.blocking_handler → Database.get_all_groups"
+        assert report["culprit"] == culprit, report["culprit"]
+        assert report["lag"] >= 0.2, report["lag"]
+        assert any("slow_connect" in line for line in report["stack"])
+        assert loop_blocked.value(culprit) == 1
+        assert live_stats.max_loop_lag >= 0.2
+        print(f"✓ Blocking call is reported: {culprit} ({report['lag'] * 1000:.0f} ms)")
+
+    print("\nAll tests passed!")
+
+
+if __name__ == "__main__":
+    test_watchdog()
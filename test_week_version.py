@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Test script to verify week versions and content hashes of schedules
+"""
+
+from database.models import Database, EMPTY_WEEK_HASH
+from datetime import datetime, date, timedelta
+import os
+import sqlite3
+import tempfile
+
+
+def make_lessons(subject_id, teacher_id, monday):
+    lessons = []
+    for hour in (9, 11, 13):
+        start = monday + timedelta(hours=hour)
+        lessons.append(
+            (
+                subject_id,
+                teacher_id,
+                start,
+                start + timedelta(minutes=90),
+                "GUK-101",
+                "Monday",
+            )
+        )
+    return lessons
+
+
+def test_week_version():
+    """Test week version functionality"""
+    print("Testing week version functionality...")
+
+    week_start = date(2025, 10, 6)
+    monday = datetime(2025, 10, 6)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "schedule.db"))
+        group_id = db.add_group("М8О-207БВ-24", "Computer Science")
+        subject_id = db.add_subject("Программирование", "PR101")
+        teacher_id = db.add_teacher("Смирнов Владимир Владимирович", "Programming")
+
+        assert db.get_week_version(group_id, week_start) is None
+        schedule_id = db.add_schedule(group_id, week_start)
+        assert db.get_week_version(group_id, week_start) == (1, EMPTY_WEEK_HASH)
+        print("✓ New week starts with version 1 and an empty hash")
+
+        lessons = make_lessons(subject_id, teacher_id, monday)
+        versions = []
+        for lesson in lessons:
+            db.add_lesson(schedule_id, *lesson)
+            versions.append(db.get_week_version(group_id, week_start))
+        assert [version for version, _ in versions] == [2, 3, 4]
+        assert len({content_hash for _, content_hash in versions}) == 3
+        print("✓ Every lesson increases the version and changes the hash")
+
+        # The same lessons in another order (and in bulk) give the same hash
+        other_db = Database(os.path.join(tmp, "other.db"))
+        other_group_id = other_db.add_group("М8О-207БВ-24", "Computer Science")
+        other_subject_id = other_db.add_subject("Программирование", "PR101")
+        other_teacher_id = other_db.add_teacher("Смирнов В.В.", "Programming")
+        other_schedule_id = other_db.add_schedule(other_group_id, week_start)
+        assert other_db.add_lessons(
+            other_schedule_id,
+            list(reversed(make_lessons(other_subject_id, other_teacher_id, monday))),
+        )
+        other_version = other_db.get_week_version(other_group_id, week_start)
+        assert other_version == (2, versions[-1][1])
+        print("✓ Bulk insert bumps the version once with an order-independent hash")
+
+        # Lookup is a single indexed query
+        conn = sqlite3.connect(db.db_path)
+        plan = conn.execute(
+            "EXPLAIN QUERY PLAN SELECT version, content_hash FROM schedules "
+            "WHERE group_id = ? AND week_start = ? LIMIT 1",
+            (group_id, week_start),
+        ).fetchall()
+        conn.close()
+        assert "idx_schedules_group_week" in str(plan), plan
+        print("✓ get_week_version uses the (group_id, week_start) index")
+
+        # Databases created before the columns existed are migrated
+        legacy_path = os.path.join(tmp, "legacy.db")
+        conn = sqlite3.connect(legacy_path)
+        conn.execute(
+            "CREATE TABLE schedules (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "group_id INTEGER NOT NULL, week_start DATE NOT NULL)"
+        )
+        conn.execute(
+            "CREATE TABLE lessons (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "schedule_id INTEGER NOT NULL, subject_id INTEGER NOT NULL, "
+            "teacher_id INTEGER NOT NULL, start_time DATETIME NOT NULL, "
+            "end_time DATETIME NOT NULL, location TEXT, "
+            "day_of_week INTEGER NOT NULL)"
+        )
+        conn.execute(
+            "INSERT INTO schedules (group_id, week_start) VALUES (?, ?)",
+            (group_id, week_start),
+        )
+        conn.executemany(
+            "INSERT INTO lessons (schedule_id, subject_id, teacher_id, start_time, "
+            "end_time, location, day_of_week) VALUES (1, ?, ?, ?, ?, ?, ?)",
+            make_lessons(subject_id, teacher_id, monday),
+        )
+        conn.commit()
+        conn.close()
+        legacy_db = Database(legacy_path)
+        legacy_version = legacy_db.get_week_version(group_id, week_start)
+        assert legacy_version[1] == versions[-1][1]
+        print("✓ Existing schedules are migrated with their content hash")
+
+    print("\nAll tests passed!")
+
+
+if __name__ == "__main__":
+    test_week_version()
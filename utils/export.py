@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Streaming export of group schedules to iCalendar and CSV
+"""
+
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, Optional
+import csv
+import io
+
+# Upload/write chunk size for encoded export data
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+# Supported formats: extension -> MIME type
+EXPORT_FORMATS = {
+    "ics": "text/calendar",
+    "csv": "text/csv",
+}
+
+CSV_COLUMNS = [
+    "date",
+    "start_time",
+    "end_time",
+    "subject",
+    "teacher",
+    "location",
+]
+
+
+def _escape_ics_text(value: str) -> str:
+    """Escape a TEXT value according to RFC 5545"""
+    return (
+        value.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\n", "\\n")
+    )
+
+
+def _fold_ics_line(line: str) -> str:
+    """Fold a content line to 75 octets as required by RFC 5545"""
+    encoded = line.encode("utf-8")
+    if len(encoded) <= 75:
+        return line + "\r\n"
+
+    parts = []
+    current = ""
+    current_size = 0
+    limit = 75
+    for char in line:
+        char_size = len(char.encode("utf-8"))
+        if current_size + char_size > limit:
+            parts.append(current)
+            current = ""
+            current_size = 0
+            # Continuation lines start with a space which takes one octet
+            limit = 74
+        current += char
+        current_size += char_size
+    parts.append(current)
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def _format_ics_datetime(value: datetime) -> str:
+    """Format a naive datetime as an iCalendar floating local time"""
+    return value.strftime("%Y%m%dT%H%M%S")
+
+
+def iter_ics(
+    lessons: Iterable[Dict], group_name: str, stamp: Optional[datetime] = None
+) -> Iterator[str]:
+    """
+    Generate an iCalendar document line by line
+
+    Args:
+        lessons (Iterable[Dict]): Lessons as returned by the database
+        group_name (str): Name of the group, used as calendar name
+        stamp (datetime): DTSTAMP value (default: now)
+
+    Yields:
+        str: Folded content lines terminated with CRLF
+    """
+    dtstamp = (stamp or datetime.utcnow()).strftime("%Y%m%dT%H%M%SZ")
+
+    yield "BEGIN:VCALENDAR\r\n"
+    yield "VERSION:2.0\r\n"
+    yield "PRODID:-//chelgu//schedule bot//RU\r\n"
+    yield "CALSCALE:GREGORIAN\r\n"
+    yield _fold_ics_line(f"X-WR-CALNAME:{_escape_ics_text(group_name)}")
+
+    for lesson in lessons:
+        yield "BEGIN:VEVENT\r\n"
+        yield f"UID:lesson-{lesson['id']}@chelgu-schedule\r\n"
+        yield f"DTSTAMP:{dtstamp}\r\n"
+        yield f"DTSTART:{_format_ics_datetime(lesson['start_time'])}\r\n"
+        yield f"DTEND:{_format_ics_datetime(lesson['end_time'])}\r\n"
+        yield _fold_ics_line(f"SUMMARY:{_escape_ics_text(lesson['subject_name'])}")
+        if lesson["location"]:
+            yield _fold_ics_line(f"LOCATION:{_escape_ics_text(lesson['location'])}")
+        if lesson["teacher_name"]:
+            yield _fold_ics_line(
+                f"DESCRIPTION:{_escape_ics_text(lesson['teacher_name'])}"
+            )
+        yield "END:VEVENT\r\n"
+
+    yield "END:VCALENDAR\r\n"
+
+
+def iter_csv(lessons: Iterable[Dict]) -> Iterator[str]:
+    """
+    Generate a CSV document row by row
+
+    Args:
+        lessons (Iterable[Dict]): Lessons as returned by the database
+
+    Yields:
+        str: CSV rows including the header
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush() -> str:
+        row = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return row
+
+    writer.writerow(CSV_COLUMNS)
+    yield flush()
+
+    for lesson in lessons:
+        writer.writerow(
+            [
+                lesson["start_time"].strftime("%Y-%m-%d"),
+                lesson["start_time"].strftime("%H:%M"),
+                lesson["end_time"].strftime("%H:%M"),
+                lesson["subject_name"],
+                lesson["teacher_name"],
+                lesson["location"] or "",
+            ]
+        )
+        yield flush()
+
+
+def iter_export(
+    lessons: Iterable[Dict], export_format: str, group_name: str
+) -> Iterator[str]:
+    """
+    Generate an export document in the requested format
+
+    Args:
+        lessons (Iterable[Dict]): Lessons as returned by the database
+        export_format (str): One of EXPORT_FORMATS
+        group_name (str): Name of the group
+
+    Returns:
+        Iterator[str]: Generator of document pieces
+    """
+    if export_format == "ics":
+        return iter_ics(lessons, group_name)
+    if export_format == "csv":
+        return iter_csv(lessons)
+    raise ValueError(f"Unsupported export format: {export_format}")
+
+
+def encode_chunks(
+    pieces: Iterable[str], chunk_size: int = EXPORT_CHUNK_SIZE
+) -> Iterator[bytes]:
+    """
+    Encode text pieces to UTF-8 and regroup them into chunks of about chunk_size
+
+    Args:
+        pieces (Iterable[str]): Text pieces
+        chunk_size (int): Target chunk size in bytes
+
+    Yields:
+        bytes: Encoded chunks
+    """
+    buffer = bytearray()
+    for piece in pieces:
+        buffer += piece.encode("utf-8")
+        if len(buffer) >= chunk_size:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+def get_export_filename(group_name: str, semester: str, export_format: str) -> str:
+    """
+    Build the file name for an export
+
+    Args:
+        group_name (str): Name of the group
+        semester (str): Semester identifier
+        export_format (str): One of EXPORT_FORMATS
+
+    Returns:
+        str: File name
+    """
+    return f"{group_name}_{semester}.{export_format}"
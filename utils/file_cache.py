@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Cache of Telegram file_id values for uploaded documents and images
+"""
+
+from aiogram.types import InputFile, Message
+from database.models import Database
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, Iterator, Optional
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+# Uploads older than this are forgotten and sent again on the next request
+FILE_CACHE_MAX_AGE = timedelta(days=30)
+# Seconds between prunes of old uploads
+FILE_CACHE_PRUNE_INTERVAL = 3600
+
+
+class StreamingInputFile(InputFile):
+    """
+    Input file that is produced chunk by chunk while it is being uploaded
+
+    Producing a chunk may query the database, so every chunk is pulled from
+    the iterator in a worker thread.
+    """
+
+    def __init__(
+        self,
+        chunks_factory: Callable[[], Iterator[bytes]],
+        filename: str,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ):
+        super().__init__(filename=filename, chunk_size=chunk_size)
+        # A factory rather than an iterator so the upload can be retried
+        self.chunks_factory = chunks_factory
+
+    async def read(self, bot):
+        chunks = self.chunks_factory()
+        while True:
+            chunk = await asyncio.to_thread(next, chunks, None)
+            if chunk is None:
+                break
+            yield chunk
+
+
+def get_document_file_id(message: Message) -> str:
+    """Get file_id of the document attached to a sent message"""
+    return message.document.file_id
+
+
+def get_photo_file_id(message: Message) -> str:
+    """Get file_id of the largest photo size attached to a sent message"""
+    return message.photo[-1].file_id
+
+
+class FileIdCache:
+    """
+    Cache of Telegram file_id values by artifact key
+
+    Cache keys carry the content version of what the artifact was generated
+    from (the week's content hash, the period version), so a key identifies
+    the bytes without generating them again and a schedule change needs no
+    eviction: requests simply ask for the new key. The in-memory map is backed
+    by the ``file_cache`` table. Superseded keys are never asked for again, so
+    uploads older than FILE_CACHE_MAX_AGE are pruned lazily, at most once per
+    FILE_CACHE_PRUNE_INTERVAL, when a new upload is saved.
+    """
+
+    def __init__(
+        self,
+        db: Database,
+        max_age: timedelta = FILE_CACHE_MAX_AGE,
+        prune_interval: float = FILE_CACHE_PRUNE_INTERVAL,
+    ):
+        self.db = db
+        self.max_age = max_age
+        self.prune_interval = prune_interval
+        self._by_key: Dict[str, str] = {}
+        self._pruned_at: Optional[float] = None
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, cache_key: str) -> Optional[str]:
+        """Get file_id by cache key"""
+        file_id = self._by_key.get(cache_key)
+        if file_id is None:
+            cached = self.db.get_cached_file(cache_key)
+            if cached is None:
+                return None
+            file_id, _ = cached
+            self._by_key[cache_key] = file_id
+        return file_id
+
+    def put(self, cache_key: str, file_id: str, group_id: Optional[int] = None):
+        """Remember the file_id of an uploaded artifact"""
+        self.prune()
+        self.db.save_cached_file(cache_key, file_id, group_id)
+        self._by_key[cache_key] = file_id
+
+    def prune(self, force: bool = False) -> int:
+        """
+        Forget uploads older than max_age, unless pruned recently
+
+        The in-memory map is cleared as well; entries still in the table are
+        loaded again on their next use.
+
+        Args:
+            force (bool): Prune even if the last prune was recent
+
+        Returns:
+            int: Number of uploads deleted from the table
+        """
+        now = time.monotonic()
+        if (
+            not force
+            and self._pruned_at is not None
+            and now - self._pruned_at < self.prune_interval
+        ):
+            return 0
+        self._pruned_at = now
+        self._by_key.clear()
+        return self.db.prune_cached_files(datetime.utcnow() - self.max_age)
+
+    async def send_if_cached(
+        self, send: Callable[[str], Awaitable[Message]], cache_key: str
+    ) -> Optional[Message]:
+        """
+        Re-send an artifact by file_id if it was uploaded under cache_key
+
+        Args:
+            send: Coroutine function that sends a file_id, e.g. message.answer_photo
+            cache_key (str): Key identifying the artifact
+
+        Returns:
+            Optional[Message]: Sent message or None on a cache miss
+        """
+        file_id = self.get(cache_key)
+        if file_id is None:
+            return None
+        self.hits += 1
+        return await send(file_id)
+
+    async def send(
+        self,
+        send: Callable[[InputFile], Awaitable[Message]],
+        cache_key: str,
+        chunks_factory: Callable[[], Iterator[bytes]],
+        filename: str,
+        group_id: Optional[int] = None,
+        get_file_id: Callable[[Message], str] = get_document_file_id,
+    ) -> Message:
+        """
+        Send an artifact, re-using an earlier upload of the same key
+
+        The content is generated only on a miss, while it is being uploaded.
+
+        Args:
+            send: Coroutine function that sends a file or file_id, e.g. message.answer_document
+            cache_key (str): Key identifying the artifact and its content version
+            chunks_factory: Function returning the content as an iterator of chunks
+            filename (str): File name of the upload
+            group_id (Optional[int]): Group the artifact was generated from
+            get_file_id: Function extracting file_id from the sent message
+
+        Returns:
+            Message: Sent message
+        """
+        sent = await self.send_if_cached(send, cache_key)
+        if sent is not None:
+            return sent
+
+        self.misses += 1
+        sent = await send(StreamingInputFile(chunks_factory, filename=filename))
+        self.put(cache_key, get_file_id(sent), group_id)
+        return sent
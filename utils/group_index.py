@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+In-memory search index of group names
+"""
+
+from database.models import Database
+from datetime import date
+from typing import List, Optional, Tuple
+import re
+import time
+import weakref
+
+# Groups added by other processes are picked up after this many seconds
+INDEX_MAX_AGE = 60
+
+_indexes: "weakref.WeakKeyDictionary[Database, GroupSearchIndex]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def normalize_group_name(name: str) -> str:
+    """
+    Normalize a group name for matching (lowercase, no spaces and hyphens)
+
+    Args:
+        name (str): Group name or user input
+
+    Returns:
+        str: Normalized name
+    """
+    return re.sub(r"[\s\-]+", "", name.lower())
+
+
+class GroupSearchIndex:
+    """
+    Group names with their normalized forms, loaded once instead of per search
+
+    The index is rebuilt when a group is added through the same Database
+    instance and, as a safety net for other writers, when it gets older than
+    INDEX_MAX_AGE seconds.
+    """
+
+    def __init__(self, db: Database, max_age: float = INDEX_MAX_AGE):
+        # Weak reference: the index is kept alive by the database, not vice versa
+        self._db = weakref.ref(db)
+        self.max_age = max_age
+        # (id, name, faculty, lowercase name, normalized name)
+        self._groups: List[Tuple[int, str, str, str, str]] = []
+        self._loaded_at: Optional[float] = None
+        db.add_change_listener(self._on_change)
+
+    def _on_change(self, group_id: int, week_start: Optional[date]):
+        if week_start is None:
+            self._loaded_at = None
+
+    def refresh(self):
+        """Reload all groups from the database"""
+        self._groups = [
+            (group_id, name, faculty, name.lower(), normalize_group_name(name))
+            for group_id, name, faculty in self._db().get_all_groups()
+        ]
+        self._loaded_at = time.monotonic()
+
+    def _ensure_fresh(self):
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > self.max_age:
+            self.refresh()
+
+    def search(self, user_input: str) -> List[dict]:
+        """
+        Search for groups that match the user input
+
+        Exact matches come first, followed by partial matches in both
+        directions; matching ignores case, spaces and hyphens.
+
+        Args:
+            user_input (str): User's group name input
+
+        Returns:
+            list: List of matching groups
+        """
+        self._ensure_fresh()
+        lower_input = user_input.lower()
+        normalized_input = normalize_group_name(user_input)
+
+        matching_groups = []
+        for group in self._groups:
+            lower_name, normalized_name = group[3], group[4]
+
+            if lower_name == lower_input:
+                matching_groups.append(self._to_match(group, "exact"))
+                # If exact match, prioritize it
+                if len(matching_groups) > 1:
+                    matching_groups.insert(0, matching_groups.pop())
+                continue
+
+            if normalized_input in normalized_name:
+                matching_groups.append(self._to_match(group, "partial_contains"))
+
+            if normalized_name in normalized_input:
+                matching_groups.append(self._to_match(group, "group_contains"))
+
+        return matching_groups
+
+    @staticmethod
+    def _to_match(group: Tuple[int, str, str, str, str], match_type: str) -> dict:
+        return {
+            "id": group[0],
+            "name": group[1],
+            "faculty": group[2],
+            "match_type": match_type,
+        }
+
+
+def get_group_index(db: Database) -> GroupSearchIndex:
+    """
+    Get the search index of a database, creating it on first use
+
+    Args:
+        db (Database): Database instance
+
+    Returns:
+        GroupSearchIndex: Index bound to the database
+    """
+    index = _indexes.get(db)
+    if index is None:
+        index = GroupSearchIndex(db)
+        _indexes[db] = index
+    return index
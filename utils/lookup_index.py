@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+In-memory search indexes of teacher names and rooms
+"""
+
+from abc import ABC, abstractmethod
+from database.models import Database
+from datetime import date
+from typing import List, Optional, Tuple
+import re
+import time
+import weakref
+
+# Teachers and rooms added by other processes are picked up after this many seconds
+INDEX_MAX_AGE = 60
+
+_teacher_indexes: "weakref.WeakKeyDictionary[Database, TeacherSearchIndex]" = (
+    weakref.WeakKeyDictionary()
+)
+_room_indexes: "weakref.WeakKeyDictionary[Database, RoomSearchIndex]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def name_tokens(name: str) -> Tuple[str, ...]:
+    """
+    Split a teacher name into lowercase tokens for matching
+
+    Initials are split apart ("Иванов И.И." gives "иванов", "и", "и") and "ё"
+    matches "е".
+
+    Args:
+        name (str): Teacher name or user input
+
+    Returns:
+        Tuple[str, ...]: Tokens in order
+    """
+    return tuple(re.findall(r"\w+", name.lower().replace("ё", "е")))
+
+
+def normalize_room(location: str) -> str:
+    """Normalize a room for matching (lowercase, no spaces, hyphens and dots)"""
+    return re.sub(r"[\s\-.]+", "", location.lower())
+
+
+class _SearchIndex(ABC):
+    """Rows loaded once instead of per search, reloaded after writes"""
+
+    def __init__(self, db: Database, max_age: float = INDEX_MAX_AGE):
+        # Weak reference: the index is kept alive by the database, not vice versa
+        self._db = weakref.ref(db)
+        self.max_age = max_age
+        self._loaded_at: Optional[float] = None
+        db.add_change_listener(self._on_change)
+
+    def _on_change(self, group_id: int, week_start: Optional[date]):
+        # New teachers and rooms arrive with lessons, so any write may add one;
+        # the reload happens on the next search, not per write
+        self._loaded_at = None
+
+    @abstractmethod
+    def refresh(self):
+        """Reload the index from the database"""
+
+    def _ensure_fresh(self):
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > self.max_age:
+            self.refresh()
+            self._loaded_at = time.monotonic()
+
+
+class TeacherSearchIndex(_SearchIndex):
+    """
+    Teacher names with their tokens
+
+    Every word of the input has to start a word of the name, so "иван и" and
+    "И.И. Иванов" both find "Иванов И.И.".
+    """
+
+    def __init__(self, db: Database, max_age: float = INDEX_MAX_AGE):
+        super().__init__(db, max_age)
+        # (id, name, tokens)
+        self._teachers: List[Tuple[int, str, Tuple[str, ...]]] = []
+
+    def refresh(self):
+        """Reload all teachers from the database"""
+        self._teachers = [
+            (teacher_id, name, name_tokens(name))
+            for teacher_id, name, _ in self._db().get_all_teachers()
+            if name
+        ]
+
+    def search(self, user_input: str) -> List[dict]:
+        """
+        Search for teachers that match the user input
+
+        Exact matches come first, followed by prefix matches by name.
+
+        Args:
+            user_input (str): User's teacher name input
+
+        Returns:
+            list: Matching teachers as dictionaries with id, name and match_type
+        """
+        self._ensure_fresh()
+        input_tokens = name_tokens(user_input)
+        if not input_tokens:
+            return []
+
+        exact = []
+        partial = []
+        for teacher_id, name, tokens in self._teachers:
+            if tokens == input_tokens:
+                exact.append({"id": teacher_id, "name": name, "match_type": "exact"})
+            elif all(
+                any(token.startswith(part) for token in tokens) for part in input_tokens
+            ):
+                partial.append(
+                    {"id": teacher_id, "name": name, "match_type": "partial"}
+                )
+        partial.sort(key=lambda match: match["name"])
+        return exact + partial
+
+
+class RoomSearchIndex(_SearchIndex):
+    """Rooms of all lessons with their normalized forms"""
+
+    def __init__(self, db: Database, max_age: float = INDEX_MAX_AGE):
+        super().__init__(db, max_age)
+        # (location, normalized location)
+        self._rooms: List[Tuple[str, str]] = []
+
+    def refresh(self):
+        """Reload all rooms from the database"""
+        self._rooms = [
+            (location, normalize_room(location))
+            for location in self._db().get_all_locations()
+        ]
+
+    def search(self, user_input: str) -> List[dict]:
+        """
+        Search for rooms that match the user input
+
+        Exact matches come first, followed by rooms containing the input;
+        matching ignores case, spaces, hyphens and dots.
+
+        Args:
+            user_input (str): User's room input
+
+        Returns:
+            list: Matching rooms as dictionaries with location and match_type
+        """
+        self._ensure_fresh()
+        normalized_input = normalize_room(user_input)
+        if not normalized_input:
+            return []
+
+        exact = []
+        partial = []
+        for location, normalized in self._rooms:
+            if normalized == normalized_input:
+                exact.append({"location": location, "match_type": "exact"})
+            elif normalized_input in normalized:
+                partial.append({"location": location, "match_type": "partial"})
+        return exact + partial
+
+
+def get_teacher_index(db: Database) -> TeacherSearchIndex:
+    """
+    Get the teacher search index of a database, creating it on first use
+
+    Args:
+        db (Database): Database instance
+
+    Returns:
+        TeacherSearchIndex: Index bound to the database
+    """
+    index = _teacher_indexes.get(db)
+    if index is None:
+        index = TeacherSearchIndex(db)
+        _teacher_indexes[db] = index
+    return index
+
+
+def get_room_index(db: Database) -> RoomSearchIndex:
+    """
+    Get the room search index of a database, creating it on first use
+
+    Args:
+        db (Database): Database instance
+
+    Returns:
+        RoomSearchIndex: Index bound to the database
+    """
+    index = _room_indexes.get(db)
+    if index is None:
+        index = RoomSearchIndex(db)
+        _room_indexes[db] = index
+    return index
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Counters, latency histograms and timing spans exported in Prometheus text format
+"""
+
+from bisect import bisect_left
+from typing import Callable, Dict, Optional, Tuple
+import functools
+import inspect
+import threading
+import time
+
+# Upper bounds of histogram buckets in seconds
+DEFAULT_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra="") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    """Monotonic counter with labels"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self._values: Dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount: float = 1):
+        """Increase the counter of a label combination"""
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def value(self, *label_values) -> float:
+        """Get the current value of a label combination"""
+        return self._values.get(label_values, 0)
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for label_values, value in sorted(values.items()):
+            yield f"{self.name}_total{_format_labels(self.labels, label_values)} {value}"
+
+
+class Histogram:
+    """Latency histogram with labels and cumulative buckets"""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labels: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.buckets = buckets
+        # label values: [bucket counts..., +Inf count, sum]
+        self._values: Dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float, *label_values):
+        """Record a duration for a label combination"""
+        position = bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self._values.get(label_values)
+            if series is None:
+                series = self._values[label_values] = [0] * (len(self.buckets) + 2)
+            series[position] += 1
+            series[-1] += seconds
+
+    def count(self, *label_values) -> int:
+        """Get the number of observations of a label combination"""
+        series = self._values.get(label_values)
+        return sum(series[:-1]) if series else 0
+
+    def quantile(self, q: float, *label_values) -> Optional[float]:
+        """Estimate a quantile as the upper bound of the bucket that holds it"""
+        series = self._values.get(label_values)
+        if not series:
+            return None
+        rank = q * sum(series[:-1])
+        seen = 0
+        for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def series(self):
+        """Label combinations that have observations"""
+        return list(self._values)
+
+    def samples(self):
+        with self._lock:
+            values = {key: list(series) for key, series in self._values.items()}
+        for label_values, series in sorted(values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                labels = _format_labels(self.labels, label_values, f'le="{le}"')
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labels, label_values)
+            yield f"{self.name}_sum{labels} {series[-1]}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+class MetricsRegistry:
+    """
+    Set of metrics rendered together
+
+    Recording is skipped while the registry is disabled, so instrumented code
+    only pays for one attribute check.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._metrics: Dict[str, object] = {}
+
+    def counter(self, name: str, help_text: str, labels=()) -> Counter:
+        """Get or create a counter"""
+        if name not in self._metrics:
+            self._metrics[name] = Counter(name, help_text, tuple(labels))
+        return self._metrics[name]
+
+    def histogram(self, name: str, help_text: str, labels=()) -> Histogram:
+        """Get or create a histogram"""
+        if name not in self._metrics:
+            self._metrics[name] = Histogram(name, help_text, tuple(labels))
+        return self._metrics[name]
+
+    def render(self) -> str:
+        """Render all metrics in Prometheus text exposition format"""
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help_text}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        """Drop all recorded values"""
+        for metric in self._metrics.values():
+            metric._values.clear()
+
+
+registry = MetricsRegistry()
+
+span_seconds = registry.histogram(
+    "span_seconds", "Duration of traced functions", ("span",)
+)
+db_call_seconds = registry.histogram(
+    "db_call_seconds", "Duration of Database method calls", ("method",)
+)
+
+
+class _NoopSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class _Span:
+    __slots__ = ("histogram", "labels", "started")
+
+    def __init__(self, histogram: Histogram, labels: tuple):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.started, *self.labels)
+        return False
+
+
+def span(name: str, histogram: Histogram = span_seconds):
+    """
+    Time a block of code
+
+    Args:
+        name (str): Label value of the span
+        histogram (Histogram): Histogram to record into (default: span_seconds)
+
+    Returns:
+        Context manager, a shared no-op one while metrics are disabled
+    """
+    if not registry.enabled:
+        return _NOOP_SPAN
+    return _Span(histogram, (name,))
+
+
+def traced(name: Optional[str] = None, histogram: Histogram = span_seconds):
+    """Decorator timing every call of a function as a span"""
+
+    def decorator(func: Callable) -> Callable:
+        label = name or func.__name__
+
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if not registry.enabled:
+                    return await func(*args, **kwargs)
+                started = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    histogram.observe(time.perf_counter() - started, label)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not registry.enabled:
+                return func(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - started, label)
+
+        return wrapper
+
+    return decorator
+
+
+def trace_methods(histogram: Histogram):
+    """
+    Class decorator timing every public method (generators are skipped since
+    their work happens after the call returns)
+    """
+
+    def decorator(cls):
+        for attr, value in list(vars(cls).items()):
+            if (
+                attr.startswith("_")
+                or not inspect.isfunction(value)
+                or inspect.isgeneratorfunction(value)
+            ):
+                continue
+            setattr(cls, attr, traced(attr, histogram)(value))
+        return cls
+
+    return decorator
+
+
+async def start_metrics_server(host: str, port: int):
+    """
+    Serve GET /metrics in Prometheus text format and enable recording
+
+    Args:
+        host (str): Interface to listen on
+        port (int): Port to listen on (0 picks a free one)
+
+    Returns:
+        aiohttp.web.AppRunner: Runner to clean up on shutdown, its address is
+        in runner.addresses
+    """
+    from aiohttp import web
+
+    async def metrics_handler(request):
+        return web.Response(
+            text=registry.render(), content_type="text/plain", charset="utf-8"
+        )
+
+    app = web.Application()
+    app.router.add_get("/metrics", metrics_handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    registry.enabled = True
+    return runner
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+In-memory per-room index of occupied intervals for free room lookups
+"""
+
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime, date, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+from database.models import Database
+from utils.schedule_utils import get_semester_bounds
+import threading
+import time
+import weakref
+
+# Changes made by other processes are picked up after this many seconds
+INDEX_MAX_AGE = 300
+# More changed weeks than this are applied by reloading the whole period
+MAX_PENDING_WEEKS = 500
+
+
+class RoomTimeline:
+    """
+    Lessons of one room sorted by start time, with a running maximum of ends
+
+    max_ends[i] is the latest end among the first i + 1 lessons, so whether
+    any lesson overlaps [start, end) is one binary search: the lessons that
+    start before `end` are a prefix, and one of them is still running at
+    `start` exactly when the latest end of that prefix is after `start`.
+    This is the stabbing query of an interval tree, kept in flat lists.
+    """
+
+    def __init__(self):
+        self.starts: List[datetime] = []
+        self.ends: List[datetime] = []
+        self.groups: List[int] = []
+        self.max_ends: List[datetime] = []
+
+    def add(self, start: datetime, end: datetime, group_id: int):
+        """Insert a lesson, keeping the lists sorted by start time"""
+        position = bisect_right(self.starts, start)
+        self.starts.insert(position, start)
+        self.ends.insert(position, end)
+        self.groups.insert(position, group_id)
+        self.max_ends.insert(position, end)
+        self._update_max_ends(position)
+
+    def remove_group(self, group_id: int, start: datetime, end: datetime) -> int:
+        """Remove lessons of a group starting in [start, end), returning how many"""
+        left = bisect_left(self.starts, start)
+        right = bisect_left(self.starts, end)
+        kept = [index for index in range(left, right) if self.groups[index] != group_id]
+        removed = right - left - len(kept)
+        if removed:
+            for values in (self.starts, self.ends, self.groups):
+                values[left:right] = [values[index] for index in kept]
+            del self.max_ends[left + len(kept) : right]
+            self._update_max_ends(left)
+        return removed
+
+    def _update_max_ends(self, position: int):
+        latest = self.max_ends[position - 1] if position else None
+        for index in range(position, len(self.starts)):
+            end = self.ends[index]
+            latest = end if latest is None or end > latest else latest
+            self.max_ends[index] = latest
+
+    def is_free(self, start: datetime, end: datetime) -> bool:
+        """Check that no lesson overlaps [start, end)"""
+        position = bisect_left(self.starts, end)
+        return position == 0 or self.max_ends[position - 1] <= start
+
+    def next_start(self, moment: datetime) -> Optional[datetime]:
+        """Get the start of the first lesson starting at or after a moment"""
+        position = bisect_left(self.starts, moment)
+        return self.starts[position] if position < len(self.starts) else None
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+
+class FreeRoomIndex:
+    """
+    Occupied intervals of every room in the current semester, answering
+    "which rooms are free from a to b" with one binary search per room
+
+    The index is loaded on first use. Changed weeks reported through the same
+    Database instance are queued and applied before the next query, so an
+    import of many weeks costs one reload per touched week at most; after
+    MAX_PENDING_WEEKS changes or INDEX_MAX_AGE seconds the period is reloaded
+    instead.
+    """
+
+    def __init__(self, db: Database, max_age: float = INDEX_MAX_AGE):
+        self._db = weakref.ref(db)
+        self.max_age = max_age
+        self._rooms: Dict[str, RoomTimeline] = {}
+        self._names: List[str] = []
+        # Rooms holding lessons of a (group_id, week_start)
+        self._week_rooms: Dict[Tuple[int, date], Set[str]] = {}
+        self._pending: Set[Tuple[int, date]] = set()
+        self._period: Optional[Tuple[date, date]] = None
+        self._loaded_at: Optional[float] = None
+        # Queries run in worker threads, loading and updates must not interleave
+        self._lock = threading.Lock()
+        db.add_change_listener(self._on_change)
+
+    def _load(self, moment: datetime):
+        start, end = get_semester_bounds(moment.date())
+        # Changes reported from here on are applied on top of the loaded rows
+        self._pending = set()
+        rooms: Dict[str, RoomTimeline] = {}
+        week_rooms: Dict[Tuple[int, date], Set[str]] = {}
+        lessons = sorted(
+            self._db().iter_room_occupancy(start, end), key=lambda row: row[3]
+        )
+        for location, group_id, week_start, lesson_start, lesson_end in lessons:
+            timeline = rooms.get(location)
+            if timeline is None:
+                timeline = rooms[location] = RoomTimeline()
+            # Appending in start order keeps the lists sorted
+            timeline.starts.append(lesson_start)
+            timeline.ends.append(lesson_end)
+            timeline.groups.append(group_id)
+            timeline.max_ends.append(lesson_end)
+            week_rooms.setdefault((group_id, week_start), set()).add(location)
+        for timeline in rooms.values():
+            timeline._update_max_ends(0)
+        self._rooms = rooms
+        self._names = sorted(rooms)
+        self._week_rooms = week_rooms
+        self._period = (start, end)
+        self._loaded_at = time.monotonic()
+
+    def _on_change(self, group_id: int, week_start: Optional[date]):
+        if self._period is None or week_start is None:
+            return
+        # The first week of a semester may start before it
+        if self._period[0] - timedelta(days=6) <= week_start < self._period[1]:
+            self._pending.add((group_id, week_start))
+
+    def _apply_pending(self):
+        pending, self._pending = self._pending, set()
+        period_start = datetime.combine(self._period[0], datetime.min.time())
+        period_end = datetime.combine(self._period[1], datetime.min.time())
+        for group_id, week_start in sorted(pending):
+            week_begin = datetime.combine(week_start, datetime.min.time())
+            week_end = week_begin + timedelta(days=7)
+            for location in self._week_rooms.pop((group_id, week_start), ()):
+                self._rooms[location].remove_group(group_id, week_begin, week_end)
+            lessons = self._db().get_schedule_for_week(group_id, week_start)
+            for lesson in lessons:
+                location = lesson["location"]
+                if (
+                    not location
+                    or not period_start <= lesson["start_time"] < period_end
+                ):
+                    continue
+                timeline = self._rooms.get(location)
+                if timeline is None:
+                    timeline = self._rooms[location] = RoomTimeline()
+                    insort(self._names, location)
+                timeline.add(lesson["start_time"], lesson["end_time"], group_id)
+                self._week_rooms.setdefault((group_id, week_start), set()).add(location)
+
+    def _ensure_fresh(self, moment: datetime):
+        if (
+            self._period is None
+            or not self._period[0] <= moment.date() < self._period[1]
+            or time.monotonic() - self._loaded_at > self.max_age
+            or len(self._pending) > MAX_PENDING_WEEKS
+        ):
+            self._load(moment)
+        elif self._pending:
+            self._apply_pending()
+
+    def free_rooms(
+        self, start: datetime, end: datetime
+    ) -> List[Tuple[str, Optional[datetime]]]:
+        """
+        Get rooms with no lesson overlapping [start, end)
+
+        Args:
+            start (datetime): Start of the range
+            end (datetime): End of the range
+
+        Returns:
+            List[Tuple[str, Optional[datetime]]]: Free rooms sorted by name,
+            each with the start of its next lesson (None when there is none
+            this semester)
+        """
+        with self._lock:
+            self._ensure_fresh(start)
+            free = []
+            for location in self._names:
+                timeline = self._rooms[location]
+                if timeline.is_free(start, end):
+                    free.append((location, timeline.next_start(end)))
+            return free
+
+    def is_free(self, location: str, start: datetime, end: datetime) -> bool:
+        """Check whether a known room has no lesson overlapping [start, end)"""
+        with self._lock:
+            self._ensure_fresh(start)
+            timeline = self._rooms.get(location)
+            return timeline is not None and timeline.is_free(start, end)
+
+    def __len__(self) -> int:
+        return len(self._rooms)
+
+
+_indexes: "weakref.WeakKeyDictionary[Database, FreeRoomIndex]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_free_room_index(db: Database) -> FreeRoomIndex:
+    """
+    Get the free room index of a database, creating it on first use
+
+    Args:
+        db (Database): Database instance
+
+    Returns:
+        FreeRoomIndex: Index bound to the database
+    """
+    index = _indexes.get(db)
+    if index is None:
+        index = FreeRoomIndex(db)
+        _indexes[db] = index
+    return index
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Sampling profiler writing flame-graph-compatible collapsed stacks
+"""
+
+from collections import Counter
+from datetime import datetime
+from typing import Optional, Set
+import asyncio
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Seconds between samples (200 Hz)
+SAMPLE_INTERVAL = 0.005
+# Deepest stack kept per sample
+MAX_STACK_DEPTH = 128
+
+
+def describe_frame(frame) -> str:
+    """Describe a frame as "function (file:line)" """
+    code = frame.f_code
+    return (
+        f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+    )
+
+
+class SamplingProfiler:
+    """
+    Samples the stacks of all threads from a background thread
+
+    Nothing is installed into the interpreter (no sys.setprofile hooks, no
+    signal timers), so code runs at full speed while the profiler is idle and
+    pays only for periodic stack walks while it runs.
+    """
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Start sampling"""
+        if self.running:
+            raise RuntimeError("Profiler is already running")
+        self.stacks.clear()
+        self.samples = 0
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="sampling-profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Stop sampling and wait for the sampler thread"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < MAX_STACK_DEPTH:
+                    stack.append(describe_frame(frame))
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def collapsed(self) -> str:
+        """Render samples as collapsed stacks, one "frame;frame;... count" per line"""
+        return "".join(
+            f"{stack} {count}\n" for stack, count in self.stacks.most_common()
+        )
+
+    def dump(self, path: str) -> str:
+        """Write collapsed stacks to a file and return its path"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(self.collapsed())
+        return path
+
+
+# Only one profile runs at a time
+_active_profile: Optional[SamplingProfiler] = None
+# Profiles started by a signal; the loop keeps only weak references to tasks
+_signal_tasks: Set[asyncio.Task] = set()
+
+
+async def profile_for(
+    seconds: float, directory: str, interval: float = SAMPLE_INTERVAL
+) -> str:
+    """
+    Sample all threads for a number of seconds and write a collapsed-stack file
+
+    The file can be turned into a flame graph with flamegraph.pl or opened in
+    speedscope.
+
+    Args:
+        seconds (float): Sampling duration
+        directory (str): Directory for the output file
+        interval (float): Seconds between samples
+
+    Returns:
+        str: Path of the written file
+    """
+    global _active_profile
+    if _active_profile is not None:
+        raise RuntimeError("Profiler is already running")
+    profiler = _active_profile = SamplingProfiler(interval)
+    try:
+        started = time.perf_counter()
+        profiler.start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            profiler.stop()
+        path = os.path.join(
+            directory, f"profile-{datetime.now().strftime('%Y%m%d-%H%M%S')}.collapsed"
+        )
+        await asyncio.to_thread(profiler.dump, path)
+    finally:
+        _active_profile = None
+    logger.info(
+        f"Profiled {time.perf_counter() - started:.1f} s, "
+        f"{profiler.samples} samples written to {path}"
+    )
+    return path
+
+
+def install_profile_signal(seconds: float, directory: str, signum=None):
+    """
+    Start a profile of `seconds` when the process receives a signal (SIGUSR2
+    by default), e.g. `kill -USR2 <pid>`
+
+    Args:
+        seconds (float): Sampling duration
+        directory (str): Directory for the output files
+        signum: Signal number (default: SIGUSR2)
+    """
+    signum = signum or signal.SIGUSR2
+    loop = asyncio.get_running_loop()
+
+    async def run_profile():
+        try:
+            await profile_for(seconds, directory)
+        except Exception as e:
+            logger.error(f"Error profiling on signal: {e}")
+
+    def start_profile():
+        task = loop.create_task(run_profile())
+        _signal_tasks.add(task)
+        task.add_done_callback(_signal_tasks.discard)
+
+    loop.add_signal_handler(signum, start_profile)
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Snapshots and diffs of week schedules
+"""
+
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import json
+
+# Lesson fields that make up the content of a week (the row id is not part of it,
+# so re-imported but identical lessons produce the same snapshot)
+LESSON_FIELDS = (
+    "subject_name",
+    "teacher_name",
+    "start_time",
+    "end_time",
+    "location",
+    "day_of_week",
+)
+
+# Kinds of changes produced by diff_weeks
+ADDED = "added"
+REMOVED = "removed"
+MOVED = "moved"
+CHANGED = "changed"
+
+
+def lesson_signature(lesson: Dict) -> tuple:
+    """
+    Get the content of a lesson as a comparable tuple
+
+    Args:
+        lesson (Dict): Lesson dictionary
+
+    Returns:
+        tuple: Values of LESSON_FIELDS with datetimes in ISO format
+    """
+    return tuple(
+        (
+            lesson[field].isoformat(" ")
+            if isinstance(lesson[field], datetime)
+            else lesson[field]
+        )
+        for field in LESSON_FIELDS
+    )
+
+
+def serialize_week(lessons: List[Dict]) -> str:
+    """Serialize lessons of a week for storing as a snapshot"""
+    return json.dumps(
+        sorted(lesson_signature(lesson) for lesson in lessons),
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+
+
+def deserialize_week(snapshot: str) -> List[Dict]:
+    """Restore lessons of a week from a snapshot"""
+    lessons = []
+    for values in json.loads(snapshot):
+        lesson = dict(zip(LESSON_FIELDS, values))
+        lesson["start_time"] = datetime.fromisoformat(lesson["start_time"])
+        lesson["end_time"] = datetime.fromisoformat(lesson["end_time"])
+        lessons.append(lesson)
+    return lessons
+
+
+def diff_weeks(
+    old: List[Dict], new: List[Dict]
+) -> List[Tuple[str, Optional[Dict], Optional[Dict]]]:
+    """
+    Compare two versions of a week and return only what changed
+
+    Identical lessons are skipped, a lesson whose slot stayed but whose
+    content differs is "changed", a lesson of the same subject that left one
+    slot and appeared in another is "moved", everything else is "added" or
+    "removed".
+
+    Args:
+        old (List[Dict]): Previous lessons of the week
+        new (List[Dict]): Current lessons of the week
+
+    Returns:
+        List[Tuple[str, Optional[Dict], Optional[Dict]]]: (kind, old lesson, new lesson)
+    """
+    # Drop lessons present in both versions
+    remaining_new: Dict[tuple, List[Dict]] = {}
+    for lesson in new:
+        remaining_new.setdefault(lesson_signature(lesson), []).append(lesson)
+    removed = []
+    for lesson in old:
+        same = remaining_new.get(lesson_signature(lesson))
+        if same:
+            same.pop()
+        else:
+            removed.append(lesson)
+    added = [lesson for lessons in remaining_new.values() for lesson in lessons]
+
+    changes = []
+
+    # Same start time, different content
+    added_by_start: Dict[datetime, List[Dict]] = {}
+    for lesson in added:
+        added_by_start.setdefault(lesson["start_time"], []).append(lesson)
+    still_removed = []
+    for lesson in removed:
+        candidates = added_by_start.get(lesson["start_time"])
+        if candidates:
+            changes.append((CHANGED, lesson, candidates.pop(0)))
+        else:
+            still_removed.append(lesson)
+    added = [lesson for lessons in added_by_start.values() for lesson in lessons]
+
+    # Same subject, different slot
+    added_by_subject: Dict[str, List[Dict]] = {}
+    for lesson in sorted(added, key=lambda lesson: lesson["start_time"]):
+        added_by_subject.setdefault(lesson["subject_name"], []).append(lesson)
+    for lesson in sorted(still_removed, key=lambda lesson: lesson["start_time"]):
+        candidates = added_by_subject.get(lesson["subject_name"])
+        if candidates:
+            changes.append((MOVED, lesson, candidates.pop(0)))
+        else:
+            changes.append((REMOVED, lesson, None))
+    for lessons in added_by_subject.values():
+        for lesson in lessons:
+            changes.append((ADDED, None, lesson))
+
+    changes.sort(key=lambda change: (change[2] or change[1])["start_time"])
+    return changes
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Rendering of a week schedule as a PNG image (optional, requires Pillow)
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+from config import SCHEDULE_IMAGE_FONT, IMAGE_RENDER_WORKERS
+from utils.schedule_utils import DAYS_OF_WEEK
+import asyncio
+import io
+import logging
+
+try:
+    from PIL import Image, ImageDraw, ImageFont
+except ImportError:  # Pillow is optional
+    Image = ImageDraw = ImageFont = None
+
+logger = logging.getLogger(__name__)
+
+THEMES = {
+    "light": {
+        "background": (255, 255, 255),
+        "header": (38, 70, 122),
+        "header_text": (255, 255, 255),
+        "day_cell": (231, 237, 246),
+        "grid": (200, 208, 220),
+        "text": (33, 37, 41),
+        "muted": (120, 127, 136),
+    },
+    "dark": {
+        "background": (24, 26, 31),
+        "header": (52, 91, 156),
+        "header_text": (255, 255, 255),
+        "day_cell": (36, 40, 48),
+        "grid": (60, 66, 78),
+        "text": (230, 232, 236),
+        "muted": (150, 156, 166),
+    },
+}
+DEFAULT_THEME = "light"
+
+WIDTH = 960
+PADDING = 16
+HEADER_HEIGHT = 64
+DAY_COLUMN_WIDTH = 120
+LINE_HEIGHT = 26
+FONT_SIZE = 18
+
+_fonts = {}
+_render_pool: Optional[ProcessPoolExecutor] = None
+
+
+def is_image_rendering_available() -> bool:
+    """Check whether Pillow is installed"""
+    return Image is not None
+
+
+def _get_font(size: int):
+    """Load (and memoize per process) the TrueType font used for rendering"""
+    font = _fonts.get(size)
+    if font is None:
+        try:
+            font = ImageFont.truetype(SCHEDULE_IMAGE_FONT, size)
+        except OSError:
+            logger.warning(
+                f"Font {SCHEDULE_IMAGE_FONT} not found, falling back to default font"
+            )
+            font = ImageFont.load_default()
+        _fonts[size] = font
+    return font
+
+
+def render_week_png(
+    lessons: List[Dict],
+    week_start: date,
+    group_name: str,
+    theme: str = DEFAULT_THEME,
+) -> bytes:
+    """
+    Render lessons of a week as a PNG grid with one row per day
+
+    Args:
+        lessons (List[Dict]): List of lesson dictionaries
+        week_start (date): Start date of the week
+        group_name (str): Name of the group
+        theme (str): One of THEMES
+
+    Returns:
+        bytes: PNG image
+    """
+    if not is_image_rendering_available():
+        raise RuntimeError("Pillow is required to render schedule images")
+    if theme not in THEMES:
+        raise ValueError(f"Unknown theme: {theme}")
+    colors = THEMES[theme]
+    font = _get_font(FONT_SIZE)
+    title_font = _get_font(FONT_SIZE + 6)
+
+    lessons_by_day = {}
+    for lesson in lessons:
+        lessons_by_day.setdefault(lesson["day_of_week"], []).append(lesson)
+
+    row_heights = [
+        max(1, len(lessons_by_day.get(day_index, []))) * LINE_HEIGHT + PADDING
+        for day_index in range(7)
+    ]
+    height = HEADER_HEIGHT + sum(row_heights) + PADDING
+
+    image = Image.new("RGB", (WIDTH, height), colors["background"])
+    draw = ImageDraw.Draw(image)
+
+    # Header with group name and week range
+    week_end = week_start + timedelta(days=6)
+    draw.rectangle((0, 0, WIDTH, HEADER_HEIGHT), fill=colors["header"])
+    draw.text(
+        (PADDING, HEADER_HEIGHT // 2),
+        f"{group_name}   {week_start.strftime('%d.%m')} – {week_end.strftime('%d.%m')}",
+        font=title_font,
+        fill=colors["header_text"],
+        anchor="lm",
+    )
+
+    top = HEADER_HEIGHT
+    for day_index in range(7):
+        bottom = top + row_heights[day_index]
+        day_date = week_start + timedelta(days=day_index)
+
+        draw.rectangle((0, top, DAY_COLUMN_WIDTH, bottom), fill=colors["day_cell"])
+        draw.text(
+            (PADDING, top + PADDING // 2),
+            f"{DAYS_OF_WEEK[day_index]} {day_date.strftime('%d.%m')}",
+            font=font,
+            fill=colors["text"],
+        )
+
+        y = top + PADDING // 2
+        day_lessons = lessons_by_day.get(day_index)
+        if day_lessons:
+            for lesson in day_lessons:
+                start_time = lesson["start_time"].strftime("%H:%M")
+                end_time = lesson["end_time"].strftime("%H:%M")
+                location = lesson["location"] or "--каф."
+                x = DAY_COLUMN_WIDTH + PADDING
+                draw.text(
+                    (x, y), f"{start_time}-{end_time}", font=font, fill=colors["muted"]
+                )
+                draw.text(
+                    (x + 130, y), lesson["subject_name"], font=font, fill=colors["text"]
+                )
+                draw.text(
+                    (WIDTH - PADDING, y),
+                    location,
+                    font=font,
+                    fill=colors["muted"],
+                    anchor="ra",
+                )
+                y += LINE_HEIGHT
+        else:
+            draw.text(
+                (DAY_COLUMN_WIDTH + PADDING, y),
+                "Выходной",
+                font=font,
+                fill=colors["muted"],
+            )
+
+        draw.line((0, bottom, WIDTH, bottom), fill=colors["grid"], width=1)
+        top = bottom
+
+    draw.line(
+        (DAY_COLUMN_WIDTH, HEADER_HEIGHT, DAY_COLUMN_WIDTH, top), fill=colors["grid"]
+    )
+
+    output = io.BytesIO()
+    image.save(output, format="PNG", optimize=False)
+    return output.getvalue()
+
+
+def get_render_pool() -> ProcessPoolExecutor:
+    """Get the process pool used for rendering, creating it on first use"""
+    global _render_pool
+    if _render_pool is None:
+        _render_pool = ProcessPoolExecutor(max_workers=IMAGE_RENDER_WORKERS)
+    return _render_pool
+
+
+def shutdown_render_pool():
+    """Stop the rendering processes"""
+    global _render_pool
+    if _render_pool is not None:
+        _render_pool.shutdown(wait=False, cancel_futures=True)
+        _render_pool = None
+
+
+async def render_week_png_async(
+    lessons: List[Dict],
+    week_start: date,
+    group_name: str,
+    theme: str = DEFAULT_THEME,
+) -> bytes:
+    """
+    Render a week image in the process pool so the event loop is not blocked
+
+    Args:
+        lessons (List[Dict]): List of lesson dictionaries
+        week_start (date): Start date of the week
+        group_name (str): Name of the group
+        theme (str): One of THEMES
+
+    Returns:
+        bytes: PNG image
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_render_pool(), render_week_png, lessons, week_start, group_name, theme
+    )
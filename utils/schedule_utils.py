@@ -1,7 +1,17 @@
+from collections import OrderedDict
 from datetime import datetime, timedelta, date
-from typing import List, Dict
+from typing import List, Dict, Tuple, Optional
 from database.models import Database
+from storage.backends import KeyValueStore, MemoryStore
+from storage.adapters import UserGroupCache
+from utils.traffic import group_traffic
+from utils.metrics import traced
+from utils.singleflight import SingleFlight
+from config import DEFAULT_GROUP
+import asyncio
+import json
 import logging
+import threading
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +27,129 @@ DAYS_OF_WEEK = [
 ]
 
 
+class RenderedWeekCache:
+    """
+    LRU cache of formatted week messages
+
+    Every entry stores the version of the week it was rendered from
+    (Database.get_week_version) and is only returned while the week still has
+    that version, so writes from any process are picked up without explicit
+    invalidation.
+
+    An optional backend store (see configure_storage) is consulted on local
+    misses and written on every put, so rendered weeks survive restarts and
+    are shared between replicas.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 2048,
+        backend: Optional[KeyValueStore] = None,
+        backend_ttl: int = 7 * 24 * 3600,
+    ):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, Tuple[Optional[tuple], str]]" = OrderedDict()
+        self.backend = backend
+        self.backend_ttl = backend_ttl
+        self.hits = 0
+        self.misses = 0
+        self.backend_hits = 0
+        # Weeks may be rendered from worker threads (e.g. during warm-up)
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _backend_key(key: tuple) -> str:
+        return "week:" + ":".join(str(part) for part in key)
+
+    def _get_stored(self, key: tuple, version: Optional[tuple]) -> Optional[str]:
+        try:
+            value = self.backend.get(self._backend_key(key))
+        except Exception as e:
+            logger.warning(f"Error reading rendered week from storage: {e}")
+            return None
+        if value is None:
+            return None
+        stored_version, message = json.loads(value)
+        if (tuple(stored_version) if stored_version else None) != version:
+            return None
+        return message
+
+    def get(self, key: tuple, version: Optional[tuple]) -> Optional[str]:
+        """Get a rendered message if it was rendered from the given version"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+
+        message = self._get_stored(key, version) if self.backend else None
+        if message is None:
+            self.misses += 1
+            return None
+        self._put_local(key, version, message)
+        self.backend_hits += 1
+        self.hits += 1
+        return message
+
+    def _put_local(self, key: tuple, version: Optional[tuple], message: str):
+        with self._lock:
+            self._entries[key] = (version, message)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def put(self, key: tuple, version: Optional[tuple], message: str):
+        """Store a rendered message"""
+        self._put_local(key, version, message)
+        if self.backend is not None:
+            try:
+                self.backend.set(
+                    self._backend_key(key),
+                    json.dumps([version, message], ensure_ascii=False),
+                    self.backend_ttl,
+                )
+            except Exception as e:
+                logger.warning(f"Error writing rendered week to storage: {e}")
+
+    def invalidate(self, group_id: int, week_start: Optional[date] = None):
+        """Drop rendered weeks of a group (all weeks if week_start is None)"""
+        with self._lock:
+            for key in list(self._entries):
+                if key[1] == group_id and (week_start is None or key[2] == week_start):
+                    del self._entries[key]
+
+    def clear(self):
+        """Drop all entries"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Process-wide cache of rendered weeks,
+# key: (db_path, group_id, week_start, group_name)
+week_cache = RenderedWeekCache()
+
+# Renders of the same week version in flight, shared by concurrent requests
+week_renders = SingleFlight("week_render")
+
+# Process-wide cache of user groups in front of the user_groups table
+user_group_cache = UserGroupCache(MemoryStore())
+
+
+def configure_storage(store: KeyValueStore):
+    """
+    Keep rendered weeks and user groups in a shared store
+
+    Args:
+        store (KeyValueStore): Store created by storage.backends.create_store
+    """
+    week_cache.backend = store
+    user_group_cache.store = store
+
+
 def get_current_week_start() -> date:
     """
     Get the start date (Monday) of the current week
@@ -46,30 +179,131 @@ def get_week_start_with_offset(offset: int) -> date:
     return current_week_start + timedelta(weeks=offset)
 
 
+def get_semester_bounds(day: date) -> Tuple[date, date]:
+    """
+    Get the first day and the day after the last day of the semester
+
+    The autumn semester runs from September to January, the spring one
+    from February to August.
+
+    Args:
+        day (date): Any date inside the semester
+
+    Returns:
+        Tuple[date, date]: Semester start (inclusive) and end (exclusive)
+    """
+    if day.month >= 9:
+        return date(day.year, 9, 1), date(day.year + 1, 2, 1)
+    if day.month == 1:
+        return date(day.year - 1, 9, 1), date(day.year, 2, 1)
+    return date(day.year, 2, 1), date(day.year, 9, 1)
+
+
+def get_semester_key(day: date) -> str:
+    """
+    Get a short semester identifier such as "2025-autumn" or "2026-spring"
+
+    Args:
+        day (date): Any date inside the semester
+
+    Returns:
+        str: Semester identifier
+    """
+    start, _ = get_semester_bounds(day)
+    season = "autumn" if start.month == 9 else "spring"
+    return f"{start.year}-{season}"
+
+
+def parse_semester_key(key: str) -> Tuple[date, date]:
+    """
+    Get semester bounds from an identifier produced by get_semester_key
+
+    Args:
+        key (str): Semester identifier, e.g. "2025-autumn"
+
+    Returns:
+        Tuple[date, date]: Semester start (inclusive) and end (exclusive)
+    """
+    year, season = key.split("-", 1)
+    if season not in ("autumn", "spring"):
+        raise ValueError(f"Unknown semester: {key}")
+    month = 9 if season == "autumn" else 2
+    return get_semester_bounds(date(int(year), month, 1))
+
+
 def get_week_schedule(
-    group_id: int, db: Database, week_offset: int = 0, group_name: str = "М8О-207БВ-24"
+    group_id: int,
+    db: Database,
+    week_offset: int = 0,
+    group_name: str = "М8О-207БВ-24",
+    track: bool = True,
 ) -> str:
     """
     Get formatted schedule for a specific week
 
+    Concurrent requests for a week that is not cached wait for one render
+    instead of each querying and formatting it.
+
     Args:
         group_id (int): ID of the group
         db (Database): Database instance
         week_offset (int): Week offset from current week (default: 0)
         group_name (str): Name of the group
+        track (bool): Count the request in the group traffic (default: True)
 
     Returns:
         str: Formatted schedule message
     """
     try:
+        if track:
+            group_traffic.record(group_id)
         week_start = get_week_start_with_offset(week_offset)
-        lessons = db.get_schedule_for_week(group_id, week_start)
-        return format_schedule_message(lessons, week_start, week_offset, group_name)
+        key = (db.db_path, group_id, week_start, group_name)
+        version = db.get_week_version(group_id, week_start)
+        message = week_cache.get(key, version)
+        if message is None:
+
+            def render() -> str:
+                lessons = db.get_schedule_for_week(group_id, week_start)
+                rendered = format_schedule_message(
+                    lessons, week_start, week_offset, group_name
+                )
+                week_cache.put(key, version, rendered)
+                return rendered
+
+            message = week_renders.do((key, version), render)
+        return message
     except Exception as e:
         logger.error(f"Error getting week schedule: {e}")
         return "Ошибка при получении расписания. Пожалуйста, попробуйте позже."
 
 
+async def get_week_schedule_async(
+    group_id: int,
+    db: Database,
+    week_offset: int = 0,
+    group_name: str = "М8О-207БВ-24",
+) -> str:
+    """
+    Get formatted schedule for a specific week without blocking the event loop
+
+    The query and rendering run in a worker thread, so concurrent handlers
+    asking for the same week share one render (see get_week_schedule).
+
+    Args:
+        group_id (int): ID of the group
+        db (Database): Database instance
+        week_offset (int): Week offset from current week (default: 0)
+        group_name (str): Name of the group
+
+    Returns:
+        str: Formatted schedule message
+    """
+    return await asyncio.to_thread(
+        get_week_schedule, group_id, db, week_offset, group_name
+    )
+
+
 def get_current_week_schedule(
     group_id: int, db: Database, group_name: str = "М8О-207БВ-24"
 ) -> str:
@@ -87,11 +321,13 @@ def get_current_week_schedule(
     return get_week_schedule(group_id, db, 0, group_name)
 
 
+@traced()
 def format_schedule_message(
     lessons: List[Dict],
     week_start: date,
     week_offset: int = 0,
     group_name: str = "М8О-207БВ-24",
+    detail_key: Optional[str] = None,
 ) -> str:
     """
     Format lessons into a readable schedule message
@@ -100,7 +336,10 @@ def format_schedule_message(
         lessons (List[Dict]): List of lesson dictionaries
         week_start (date): Start date of the week
         week_offset (int): Week offset from current week
-        group_name (str): Name of the group
+        group_name (str): Name of the group, or the title of a teacher or
+            room view
+        detail_key (Optional[str]): Lesson field shown after the subject,
+            e.g. "group_name" in teacher and room views
 
     Returns:
         str: Formatted schedule message
@@ -134,6 +373,9 @@ def format_schedule_message(
                 # teacher = lesson["teacher_name"]
                 location = lesson["location"] or "--каф."
 
+                if detail_key and lesson.get(detail_key):
+                    subject = f"{subject} · {lesson[detail_key]}"
+
                 message += f"{subject}\n"
                 message += f"{start_time}-{end_time}   ПЗ   {location}\n"
         else:
@@ -144,3 +386,182 @@ def format_schedule_message(
         message += "</blockquote>"
 
     return message
+
+
+def merge_lesson_groups(lessons: List[Dict]) -> List[Dict]:
+    """
+    Merge lessons held together by several groups (e.g. a lecture stream)
+
+    Args:
+        lessons (List[Dict]): Lessons with "group_name", ordered by start time
+
+    Returns:
+        List[Dict]: One lesson per start, subject and room with the group names
+        joined by commas
+    """
+    merged = {}
+    for lesson in lessons:
+        key = (lesson["start_time"], lesson["subject_name"], lesson["location"])
+        if key in merged:
+            merged[key]["group_name"] += f", {lesson['group_name']}"
+        else:
+            merged[key] = dict(lesson)
+    return list(merged.values())
+
+
+def format_lesson_line(lesson: Dict) -> str:
+    """
+    Format a single lesson the same way as in the week schedule
+
+    Args:
+        lesson (Dict): Lesson dictionary
+
+    Returns:
+        str: Subject line and time/location line
+    """
+    start_time = lesson["start_time"].strftime("%H:%M")
+    end_time = lesson["end_time"].strftime("%H:%M")
+    location = lesson["location"] or "--каф."
+    return f"{lesson['subject_name']}\n{start_time}-{end_time}   ПЗ   {location}\n"
+
+
+def format_day_message(
+    lessons: List[Dict], day: date, group_name: str = "М8О-207БВ-24"
+) -> str:
+    """
+    Format lessons of a single day
+
+    Args:
+        lessons (List[Dict]): Lessons of the day sorted by start time
+        day (date): The day
+        group_name (str): Name of the group
+
+    Returns:
+        str: Formatted day message
+    """
+    message = f"<blockquote>{group_name}</blockquote>\n"
+    message += (
+        f"<blockquote><b>{DAYS_OF_WEEK[day.weekday()]} ~ {day.strftime('%d.%m')}</b>\n"
+    )
+    if lessons:
+        for lesson in lessons:
+            message += format_lesson_line(lesson)
+    else:
+        message += "Выходной\n"
+    message += "</blockquote>"
+    return message
+
+
+def format_next_lesson_message(
+    current: Optional[Dict],
+    upcoming: Optional[Dict],
+    now: datetime,
+    group_name: str = "М8О-207БВ-24",
+) -> str:
+    """
+    Format the lesson in progress and the next lesson
+
+    Args:
+        current (Optional[Dict]): Lesson in progress
+        upcoming (Optional[Dict]): Next lesson
+        now (datetime): Current moment
+        group_name (str): Name of the group
+
+    Returns:
+        str: Formatted message
+    """
+    message = f"<blockquote>{group_name}</blockquote>\n"
+    if current:
+        minutes_left = int((current["end_time"] - now).total_seconds() // 60)
+        message += f"<blockquote><b>Сейчас</b> (ещё {minutes_left} мин.)\n"
+        message += format_lesson_line(current)
+        message += "</blockquote>"
+    if upcoming:
+        day = upcoming["start_time"].date()
+        day_label = (
+            "сегодня"
+            if day == now.date()
+            else f"{DAYS_OF_WEEK[day.weekday()]} ~ {day.strftime('%d.%m')}"
+        )
+        message += f"<blockquote><b>Далее</b> ({day_label})\n"
+        message += format_lesson_line(upcoming)
+        message += "</blockquote>"
+    if not current and not upcoming:
+        message += "<blockquote>Занятий больше нет</blockquote>"
+    return message
+
+
+def get_user_group_or_default(user_id: int, db: Database) -> Tuple[int, str]:
+    """
+    Get the group chosen by a user, falling back to the default group
+
+    Args:
+        user_id (int): Telegram user ID
+        db (Database): Database instance
+
+    Returns:
+        Tuple[int, str]: Group ID and name
+    """
+    try:
+        cached = user_group_cache.get(db.db_path, user_id)
+    except Exception as e:
+        logger.warning(f"Error reading user group from storage: {e}")
+        cached = None
+    if cached:
+        return cached
+
+    user_group = db.get_user_group(user_id)
+    if user_group:
+        _cache_user_group(db, user_id, *user_group)
+        return user_group
+    return db.get_or_create_group(DEFAULT_GROUP, "Computer Science"), DEFAULT_GROUP
+
+
+async def get_user_group_or_default_async(
+    user_id: int, db: Database
+) -> Tuple[int, str]:
+    """
+    Get the group chosen by a user without blocking the event loop
+
+    The storage lookup and the database fallback run in a worker thread.
+
+    Args:
+        user_id (int): Telegram user ID
+        db (Database): Database instance
+
+    Returns:
+        Tuple[int, str]: Group ID and name
+    """
+    return await asyncio.to_thread(get_user_group_or_default, user_id, db)
+
+
+def _cache_user_group(db: Database, user_id: int, group_id: int, group_name: str):
+    try:
+        user_group_cache.set(db.db_path, user_id, group_id, group_name)
+    except Exception as e:
+        logger.warning(f"Error writing user group to storage: {e}")
+
+
+def set_user_group(user_id: int, group_id: int, db: Database):
+    """
+    Save the group chosen by a user in the database and the user group cache
+
+    Args:
+        user_id (int): Telegram user ID
+        group_id (int): ID of the group
+        db (Database): Database instance
+    """
+    db.set_user_group(user_id, group_id)
+    _cache_user_group(db, user_id, group_id, db.get_group_name(group_id))
+
+
+async def set_user_group_async(user_id: int, group_id: int, db: Database):
+    """
+    Save the group chosen by a user without blocking the event loop
+
+    Args:
+        user_id (int): Telegram user ID
+        group_id (int): ID of the group
+        db (Database): Database instance
+    """
+    await asyncio.to_thread(set_user_group, user_id, group_id, db)
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Coalescing of concurrent identical calls
+"""
+
+from utils.metrics import registry
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable
+import threading
+
+singleflight_calls = registry.counter(
+    "singleflight_calls",
+    "Calls run (leader) or served by a call in flight (coalesced)",
+    ("name", "result"),
+)
+
+
+class SingleFlight:
+    """
+    Runs a function once for all concurrent callers asking for the same key
+
+    The first caller of a key runs the function; callers arriving while it
+    runs wait for its result (or exception) instead of repeating the work.
+    Nothing is cached: once the call finishes the next caller runs it again.
+    Works across threads, so callers on the event loop should reach it
+    through asyncio.to_thread.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.coalesced = 0
+        self._in_flight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, func: Callable[[], Any]) -> Any:
+        """
+        Run func for a key, or wait for the run already in flight
+
+        Args:
+            key (Hashable): Identity of the call
+            func (Callable[[], Any]): Work to run
+
+        Returns:
+            Any: Result of func
+        """
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = Future()
+                self.calls += 1
+            else:
+                self.coalesced += 1
+        singleflight_calls.inc(self.name, "leader" if leader else "coalesced")
+        if not leader:
+            return future.result()
+
+        try:
+            result = func()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+    def __len__(self) -> int:
+        return len(self._in_flight)
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Cheap in-memory counters for watching the running bot (/stats)
+"""
+
+from collections import deque
+from typing import Deque, Dict, Optional
+import os
+import sys
+import time
+
+# Seconds covered by rate counters
+RATE_WINDOW = 60
+# Latest handler durations kept for percentiles
+LATENCY_SAMPLES = 1000
+
+
+class RateCounter:
+    """
+    Events per second over the last `window` seconds
+
+    Counts go into one slot per second of a ring, so adding is a couple of
+    integer operations and no lock is taken. Increments racing from worker
+    threads may rarely be lost, which is fine for a dashboard.
+    """
+
+    def __init__(self, window: int = RATE_WINDOW):
+        self.window = window
+        self._counts = [0] * window
+        self._seconds = [0] * window
+        self.total = 0
+
+    def add(self, amount: int = 1):
+        """Count events happening now"""
+        second = int(time.monotonic())
+        slot = second % self.window
+        if self._seconds[slot] != second:
+            self._seconds[slot] = second
+            self._counts[slot] = 0
+        self._counts[slot] += amount
+        self.total += amount
+
+    def rate(self) -> float:
+        """Average events per second over the complete seconds of the window"""
+        now = int(time.monotonic())
+        counted = sum(
+            count
+            for second, count in zip(self._seconds, self._counts)
+            if now - self.window < second < now
+        )
+        return counted / (self.window - 1)
+
+
+class LatencyWindow:
+    """Durations of the latest events, for percentiles"""
+
+    def __init__(self, size: int = LATENCY_SAMPLES):
+        self.samples: Deque[float] = deque(maxlen=size)
+        self.count = 0
+
+    def add(self, seconds: float):
+        """Record a duration"""
+        self.samples.append(seconds)
+        self.count += 1
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Get a percentile (0..1) of the kept durations"""
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+class LiveStats:
+    """Counters fed by StatsMiddleware, Database and the loop lag monitor"""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.updates = RateCounter()
+        self.db_queries = RateCounter()
+        self.handlers: Dict[str, LatencyWindow] = {}
+        self.handler_errors = 0
+        self.loop_lag = 0.0
+        self.max_loop_lag = 0.0
+
+    def record_handler(self, name: str, seconds: float):
+        """Record the duration of a handler"""
+        window = self.handlers.get(name)
+        if window is None:
+            window = self.handlers[name] = LatencyWindow()
+        window.add(seconds)
+
+    def record_loop_lag(self, seconds: float):
+        """Record a loop lag measurement"""
+        self.loop_lag = seconds
+        self.max_loop_lag = max(self.max_loop_lag, seconds)
+
+
+# Process-wide counters
+live_stats = LiveStats()
+
+
+def read_rss_bytes() -> Optional[int]:
+    """Get the resident set size of this process"""
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+
+        # Peak RSS: kilobytes on Linux, bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    except ImportError:
+        return None
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+In-memory per-group index of lesson times for "today" and "next lesson" lookups
+"""
+
+from bisect import bisect_left, bisect_right
+from datetime import datetime, date, timedelta
+from typing import Dict, List, Optional, Tuple
+from database.models import Database
+from utils.schedule_utils import get_semester_bounds
+import threading
+import time
+import weakref
+
+# Changes made by other processes are picked up after this many seconds
+INDEX_MAX_AGE = 300
+
+
+class GroupTimeline:
+    """
+    Lessons of one group sorted by start time, with parallel start/end arrays
+
+    max_ends[i] is the latest end among the first i + 1 lessons, as in
+    utils.room_index.RoomTimeline, so a lesson still running at a moment is
+    found however many shorter lessons started after it.
+    """
+
+    def __init__(self, lessons: List[dict], start: date, end: date):
+        lessons = sorted(lessons, key=lambda lesson: lesson["start_time"])
+        self.starts: List[datetime] = [lesson["start_time"] for lesson in lessons]
+        self.ends: List[datetime] = [lesson["end_time"] for lesson in lessons]
+        self.max_ends: List[datetime] = list(self.ends)
+        self.lessons: List[dict] = lessons
+        self._update_max_ends(0)
+        # Period covered by the timeline: [start, end)
+        self.start = start
+        self.end = end
+        self.loaded_at = time.monotonic()
+
+    def covers(self, moment: datetime) -> bool:
+        """Check whether a moment is inside the loaded period"""
+        return self.start <= moment.date() < self.end
+
+    def between(self, start: datetime, end: datetime) -> List[dict]:
+        """Get lessons starting in [start, end)"""
+        left = bisect_left(self.starts, start)
+        right = bisect_left(self.starts, end)
+        return self.lessons[left:right]
+
+    def current_and_next(
+        self, moment: datetime
+    ) -> Tuple[Optional[dict], Optional[dict]]:
+        """Get the lesson in progress at a moment and the first lesson after it"""
+        position = bisect_right(self.starts, moment)
+        current = None
+        # The latest-starting lesson still running; none once the running
+        # maximum of ends is not after the moment
+        index = position - 1
+        while index >= 0 and self.max_ends[index] > moment:
+            if self.ends[index] > moment:
+                current = self.lessons[index]
+                break
+            index -= 1
+        upcoming = self.lessons[position] if position < len(self.lessons) else None
+        return current, upcoming
+
+    def replace_range(self, start: datetime, end: datetime, lessons: List[dict]):
+        """Replace lessons starting in [start, end) with new ones"""
+        left = bisect_left(self.starts, start)
+        right = bisect_left(self.starts, end)
+        del self.starts[left:right]
+        del self.ends[left:right]
+        del self.max_ends[left:right]
+        del self.lessons[left:right]
+        for lesson in lessons:
+            position = bisect_right(self.starts, lesson["start_time"])
+            self.starts.insert(position, lesson["start_time"])
+            self.ends.insert(position, lesson["end_time"])
+            self.max_ends.insert(position, lesson["end_time"])
+            self.lessons.insert(position, lesson)
+        self._update_max_ends(left)
+
+    def _update_max_ends(self, position: int):
+        latest = self.max_ends[position - 1] if position else None
+        for index in range(position, len(self.starts)):
+            end = self.ends[index]
+            latest = end if latest is None or end > latest else latest
+            self.max_ends[index] = latest
+
+
+class LessonTimeIndex:
+    """
+    Sorted lesson timelines per group, answering "today" and "now/next" with
+    binary search instead of a week query and a full render
+
+    A group's timeline covers its current semester and is loaded on first use.
+    When a week changes through the same Database instance only that week is
+    reloaded; timelines older than INDEX_MAX_AGE are reloaded as a safety net
+    for writes from other processes.
+    """
+
+    def __init__(self, db: Database, max_age: float = INDEX_MAX_AGE):
+        self._db = weakref.ref(db)
+        self.max_age = max_age
+        self._timelines: Dict[int, GroupTimeline] = {}
+        # Lookups run in worker threads, loading and updates must not interleave
+        self._lock = threading.Lock()
+        db.add_change_listener(self._on_change)
+
+    def _load(self, group_id: int, moment: datetime) -> GroupTimeline:
+        start, end = get_semester_bounds(moment.date())
+        lessons = list(self._db().iter_lessons_for_period(group_id, start, end))
+        timeline = GroupTimeline(lessons, start, end)
+        self._timelines[group_id] = timeline
+        return timeline
+
+    def get_timeline(self, group_id: int, moment: datetime) -> GroupTimeline:
+        """Get the timeline of a group that covers a moment, loading it if needed"""
+        timeline = self._timelines.get(group_id)
+        if (
+            timeline is None
+            or not timeline.covers(moment)
+            or time.monotonic() - timeline.loaded_at > self.max_age
+        ):
+            timeline = self._load(group_id, moment)
+        return timeline
+
+    def lessons_on(self, group_id: int, day: date) -> List[dict]:
+        """
+        Get lessons of a group on a day
+
+        Args:
+            group_id (int): ID of the group
+            day (date): Day to look up
+
+        Returns:
+            List[dict]: Lessons sorted by start time
+        """
+        day_start = datetime.combine(day, datetime.min.time())
+        with self._lock:
+            timeline = self.get_timeline(group_id, day_start)
+            return timeline.between(day_start, day_start + timedelta(days=1))
+
+    def current_and_next(
+        self, group_id: int, moment: datetime
+    ) -> Tuple[Optional[dict], Optional[dict]]:
+        """
+        Get the lesson in progress and the next lesson of a group
+
+        Args:
+            group_id (int): ID of the group
+            moment (datetime): Moment to look up
+
+        Returns:
+            Tuple[Optional[dict], Optional[dict]]: Current and next lesson
+        """
+        with self._lock:
+            return self.get_timeline(group_id, moment).current_and_next(moment)
+
+    def _on_change(self, group_id: int, week_start: Optional[date]):
+        with self._lock:
+            self._apply_change(group_id, week_start)
+
+    def _apply_change(self, group_id: int, week_start: Optional[date]):
+        timeline = self._timelines.get(group_id)
+        if timeline is None:
+            return
+        if week_start is None:
+            self._timelines.pop(group_id, None)
+            return
+        # The first week of a semester may start before it
+        if not timeline.start - timedelta(days=6) <= week_start < timeline.end:
+            return
+
+        # Reload just the changed week, within the loaded period
+        period_start = datetime.combine(timeline.start, datetime.min.time())
+        period_end = datetime.combine(timeline.end, datetime.min.time())
+        week_begin = datetime.combine(week_start, datetime.min.time())
+        week_end = min(week_begin + timedelta(days=7), period_end)
+        week_begin = max(week_begin, period_start)
+        lessons = [
+            lesson
+            for lesson in self._db().get_schedule_for_week(group_id, week_start)
+            if period_start <= lesson["start_time"] < period_end
+        ]
+        timeline.replace_range(week_begin, week_end, lessons)
+
+    def __len__(self) -> int:
+        return len(self._timelines)
+
+
+_indexes: "weakref.WeakKeyDictionary[Database, LessonTimeIndex]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_time_index(db: Database) -> LessonTimeIndex:
+    """
+    Get the lesson time index of a database, creating it on first use
+
+    Args:
+        db (Database): Database instance
+
+    Returns:
+        LessonTimeIndex: Index bound to the database
+    """
+    index = _indexes.get(db)
+    if index is None:
+        index = LessonTimeIndex(db)
+        _indexes[db] = index
+    return index
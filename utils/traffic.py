@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Counting of schedule requests per group
+"""
+
+from collections import Counter
+from typing import Dict
+import threading
+
+
+class GroupTraffic:
+    """
+    Request counts per group collected in memory
+
+    Handlers only increment a counter; the counts are written to the
+    group_traffic table in batches by services.warmup.TrafficRecorder.
+    """
+
+    def __init__(self):
+        self._counts: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, group_id: int):
+        """Count one request for a group"""
+        with self._lock:
+            self._counts[group_id] += 1
+
+    def drain(self) -> Dict[int, int]:
+        """Return the counts collected so far and reset them"""
+        with self._lock:
+            counts, self._counts = self._counts, Counter()
+        return dict(counts)
+
+
+# Process-wide request counter
+group_traffic = GroupTraffic()